@@ -0,0 +1,138 @@
+'''
+Benchmark for content and title key decryption.
+
+- `AppDecryptor` block loads over a synthetic encrypted hashed content (random data and title key),
+  comparing the current cached key schedule against creating a new CBC cipher for every IV
+- `TitleKey.decrypt_many` against calling `TitleKey.decrypt` for every key;
+  requires the Wii U common key in keys.ini (see `--keys`), skipped otherwise
+
+Usage: python benchmarks/crypto.py [--groups N] [--titlekeys N] [--keys keys.ini]
+'''
+
+import io
+import os
+import sys
+import hashlib
+import timeit
+import argparse
+from typing import Any, Callable, List, Tuple
+
+from Crypto.Cipher import AES
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from nus_tools import ids, utils  # noqa: E402
+from nus_tools.config import Configuration  # noqa: E402
+from nus_tools.content.app import AppBlockReader, AppDecryptor  # noqa: E402
+from nus_tools.content.app.read import HASH_TABLES_SIZE, H1_GROUP_SIZE  # noqa: E402
+
+
+_DATA_SIZE = 0xfc00
+
+
+class _UncachedAppDecryptor(AppBlockReader):
+    # previous implementation, creating a new CBC cipher (incl. key expansion) for every IV
+    def __init__(self, titlekey_decrypted: bytes, content_index: int, *args: Any):
+        super().__init__(*args)
+        self._titlekey_decrypted = titlekey_decrypted
+        self._content_index = content_index
+
+    def _read(self, length: int, check_length: bool = True) -> bytes:
+        return self.__aes.decrypt(super()._read(length, check_length))
+
+    def _init_iv(self, iv: bytes) -> None:
+        self.__aes = AES.new(self._titlekey_decrypted, AES.MODE_CBC, iv)
+
+
+def _table(hashes: List[bytes]) -> bytes:
+    return b''.join(hashes).ljust(20 * 16, b'\0')
+
+
+def build_hashed_app(titlekey: bytes, num_blocks: int) -> Tuple[bytes, bytes, bytes]:
+    '''
+    Returns (encrypted app, h3 table, content hash) of a hashed content with random data
+    '''
+
+    datas = [os.urandom(_DATA_SIZE) for _ in range(num_blocks)]
+    h0 = [hashlib.sha1(d).digest() for d in datas]
+    h0_tables = [_table(h0[i:i + 16]) for i in range(0, num_blocks, 16)]
+    h1 = [hashlib.sha1(t).digest() for t in h0_tables]
+    h1_tables = [_table(h1[i:i + 16]) for i in range(0, len(h1), 16)]
+    h2 = [hashlib.sha1(t).digest() for t in h1_tables]
+    h2_tables = [_table(h2[i:i + 16]) for i in range(0, len(h2), 16)]
+    h3 = b''.join(hashlib.sha1(t).digest() for t in h2_tables)
+
+    blocks = []
+    for i, data in enumerate(datas):
+        tables = (h0_tables[i >> 4] + h1_tables[i >> 8] + h2_tables[i >> 12]).ljust(HASH_TABLES_SIZE, b'\0')
+        blocks.append(AES.new(titlekey, AES.MODE_CBC, bytes(16)).encrypt(tables))
+        blocks.append(AES.new(titlekey, AES.MODE_CBC, h0[i][:16]).encrypt(data))
+    return b''.join(blocks), h3, hashlib.sha1(h3).digest()
+
+
+def bench(name: str, func: Callable[[], Any], count: int, unit: str, repeat: int) -> float:
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    print(f'  {name:<40} {best * 1e3:8.2f} ms  {best / count * 1e6:8.2f} us/{unit}')
+    return best
+
+
+def bench_blocks(groups: int, repeat: int) -> None:
+    titlekey = os.urandom(16)
+    num_blocks = groups * H1_GROUP_SIZE
+    app, h3, content_hash = build_hashed_app(titlekey, num_blocks)
+    size = len(app)
+    print(f'AppDecryptor ({num_blocks} blocks, {size / 1024 / 1024:.1f} MiB):')
+
+    def load(cls: type, grouped: bool) -> Callable[[], None]:
+        def run() -> None:
+            reader = cls(titlekey, 0, h3, io.BytesIO(app), content_hash, size, size)
+            if grouped:
+                while reader.current_block < reader.num_blocks:
+                    reader.load_next_group()
+            else:
+                for i in range(reader.num_blocks):
+                    reader.load_block(i)
+        return run
+
+    bench('load_block, new cipher per IV', load(_UncachedAppDecryptor, False), num_blocks, 'block', repeat)
+    bench('load_block, cached key schedule', load(AppDecryptor, False), num_blocks, 'block', repeat)
+    bench('load_next_group, new cipher per IV', load(_UncachedAppDecryptor, True), num_blocks, 'block', repeat)
+    bench('load_next_group, cached key schedule', load(AppDecryptor, True), num_blocks, 'block', repeat)
+
+
+def bench_titlekeys(count: int, repeat: int) -> None:
+    print(f'TitleKey ({count} keys):')
+    try:
+        common_key = Configuration.keys.common_wiiu
+    except RuntimeError as e:
+        print(f'  skipped: {e}')
+        return
+
+    items = [(os.urandom(16), ids.TitleID(0x0005000010000000 + (i << 8))) for i in range(count)]
+
+    def uncached() -> None:
+        for key, title_id in items:
+            AES.new(common_key, AES.MODE_CBC, bytes(title_id) + bytes(8)).decrypt(key)
+
+    bench('new cipher per key', uncached, count, 'key', repeat)
+    bench('TitleKey.decrypt', lambda: [utils.crypto.TitleKey.decrypt(k, t) for k, t in items], count, 'key', repeat)
+    bench('TitleKey.decrypt_many', lambda: utils.crypto.TitleKey.decrypt_many(items), count, 'key', repeat)
+
+
+def main(args: List[str]) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--groups', type=int, default=64, help='number of H1 groups (16 blocks each)')
+    parser.add_argument('--titlekeys', type=int, default=10000)
+    parser.add_argument('--keys', help='path to keys.ini')
+    parser.add_argument('--repeat', type=int, default=5)
+    ns = parser.parse_args(args)
+
+    if ns.keys:
+        Configuration.keys_file = ns.keys
+
+    bench_blocks(ns.groups, ns.repeat)
+    bench_titlekeys(ns.titlekeys, ns.repeat)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,101 @@
+'''
+Benchmark for decrypting and parsing many IDBEs, as done by `IDBEFetcher.fetch_many`.
+
+Compares parsing synthetic Wii U IDBEs (random icon data) sequentially, in a thread pool
+(as the download threads of `fetch_many` do) and in a process pool (previous implementation,
+which sends each raw file to a worker and pickles the parsed container, incl. the icon, back).
+Requires the IDBE keys in keys.ini (see `--keys`)
+
+Usage: python benchmarks/idbe_parsing.py [--count N] [--workers N] [--keys keys.ini]
+'''
+
+import os
+import sys
+import pickle
+import struct
+import hashlib
+import timeit
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from Crypto.Cipher import AES
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from nus_tools import ids  # noqa: E402
+from nus_tools.config import Configuration  # noqa: E402
+from nus_tools.types.idbe import IDBE  # noqa: E402
+
+
+def build_idbe(title_id: ids.TitleID, key_index: int = 0) -> bytes:
+    name = 'Title'.encode('utf-16-be')
+    title_info = (name.ljust(0x80, b'\0') + name.ljust(0x100, b'\0') + name.ljust(0x80, b'\0')) * 16
+    icon = os.urandom(0x2c + 128 * 128 * 4) + bytes(4)
+    data = bytes(title_id) + struct.pack('>I', 0) + bytes(4) + struct.pack('>I', 0xffffffff) + bytes(0x1c) + title_info + icon
+
+    aes = AES.new(Configuration.keys.idbe_keys[key_index], AES.MODE_CBC, Configuration.keys.idbe_iv)
+    return bytes([0, key_index]) + aes.encrypt(hashlib.sha256(data).digest() + data)
+
+
+# previous implementation
+def _init_parse_worker(idbe_iv: bytes, idbe_keys: List[bytes]) -> None:
+    Configuration.keys.idbe_iv = idbe_iv
+    Configuration.keys.idbe_keys[:] = idbe_keys
+
+
+def _parse_worker(title_id: str, raw: bytes) -> Tuple[int, Any]:
+    idbe = IDBE(title_id).load_bytes(raw)
+    return idbe.key_index, idbe.data
+
+
+def parse_in_pool(raws: Dict[ids.TitleID, bytes], workers: Optional[int]) -> Dict[ids.TitleID, IDBE]:
+    keys = Configuration.keys
+    with ProcessPoolExecutor(workers, initializer=_init_parse_worker, initargs=(keys.idbe_iv, list(keys.idbe_keys))) as executor:
+        futures = {t: executor.submit(_parse_worker, str(t), raw) for t, raw in raws.items()}
+        return {t: IDBE._from_parsed(t, *f.result()) for t, f in futures.items()}
+
+
+def parse_in_threads(raws: Dict[ids.TitleID, bytes], workers: int) -> Dict[ids.TitleID, IDBE]:
+    with ThreadPoolExecutor(workers) as executor:
+        return dict(zip(raws.keys(), executor.map(lambda t: IDBE(t).load_bytes(raws[t]), raws.keys())))
+
+
+def bench(name: str, func: Callable[[], Any], count: int, repeat: int) -> float:
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    print(f'  {name:<40} {best * 1e3:8.2f} ms  {best / count * 1e3:8.2f} ms/IDBE')
+    return best
+
+
+def main(args: List[str]) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=8, help='number of threads (i.e. `IDBEFetcher.max_workers`)')
+    parser.add_argument('--keys', help='path to keys.ini')
+    parser.add_argument('--repeat', type=int, default=3)
+    ns = parser.parse_args(args)
+
+    if ns.keys:
+        Configuration.keys_file = ns.keys
+
+    try:
+        raws = {t: build_idbe(t) for t in (ids.TitleID(ids.TitleType.GAME_WIIU, 0x10000000 + i) for i in range(ns.count))}
+    except RuntimeError as e:
+        print(f'skipped: {e}')
+        return
+
+    raw = next(iter(raws.values()))
+    data = IDBE(next(iter(raws))).load_bytes(raw).data
+    print(
+        f'IDBE ({ns.count} files, {len(raw)} bytes each, '
+        f'{len(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))} bytes pickled; {os.cpu_count()} CPUs):'
+    )
+
+    bench('sequential', lambda: {t: IDBE(t).load_bytes(r) for t, r in raws.items()}, ns.count, ns.repeat)
+    bench(f'thread pool ({ns.workers})', lambda: parse_in_threads(raws, ns.workers), ns.count, ns.repeat)
+    bench('process pool (1)', lambda: parse_in_pool(raws, 1), ns.count, ns.repeat)
+    bench(f'process pool ({os.cpu_count()})', lambda: parse_in_pool(raws, None), ns.count, ns.repeat)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,159 @@
+'''
+Parse benchmark for samurai list responses.
+
+By default, the items of the fixtures in `fixtures/` are repeated to build pages of `--page-size` items
+(the server maximum is 200); recorded list responses can be used instead with `--titles`/`--movies`.
+Repeating the fixture items makes every rating/platform after the first one a parse cache hit; real pages
+mostly share these between titles as well, but recorded responses give more representative numbers.
+
+- `load_bytes` and `SamuraiListStream` over full pages
+- `tree only`: just building the element tree and touching every element, i.e. the lower bound for `load_bytes`
+- `--profile`: cProfile breakdown of `load_bytes`
+- `--baseline REV`: runs the same benchmark against `nus_tools` at the given git revision (e.g. the commit
+  before the tag dispatch tables) in a subprocess, for comparison with the current tree
+- the part of the per-item time spent on passing the collected values to the dataclass constructor,
+  compared against a positional (slots-based) value builder
+
+Usage: python benchmarks/samurai_parsing.py [--page-size N] [--repeat N] [--titles FILE] [--movies FILE] [--profile] [--baseline REV]
+'''
+
+import io
+import os
+import sys
+import copy
+import pstats
+import timeit
+import tarfile
+import argparse
+import cProfile
+import operator
+import tempfile
+import subprocess
+import dataclasses
+from typing import Any, Callable, Dict, List, Optional
+
+import lxml.etree
+import lxml.objectify
+
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def build_page(path: str, page_size: Optional[int]) -> bytes:
+    with open(path, 'rb') as f:
+        data = f.read()
+    if page_size is None:
+        return data
+
+    root = lxml.etree.fromstring(data)
+    contents = root[0]
+    items = list(contents)
+    for item in items:
+        contents.remove(item)
+    for i in range(page_size):
+        item = copy.deepcopy(items[i % len(items)])
+        item.set('index', str(i + 1))
+        contents.append(item)
+    contents.set('length', str(page_size))
+    contents.set('total', str(page_size))
+    return lxml.etree.tostring(root, xml_declaration=True, encoding='UTF-8')
+
+
+def bench(name: str, func: Callable[[], Any], items: int, repeat: int) -> float:
+    number = max(1, 2000 // items)
+    best = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+    print(f'  {name:<32} {best * 1e3:8.2f} ms/page  {best / items * 1e6:8.2f} us/item')
+    return best / items
+
+
+def bench_construct(name: str, cls: type, vals: Dict[str, Any], per_item: float, repeat: int) -> None:
+    # `cls(**vals)` (current) vs. a builder with one slot per field, read positionally
+    fields = [f.name for f in dataclasses.fields(cls)]
+    builder_cls = type('Builder', (), {'__slots__': fields})
+    builder = builder_cls()
+    for k in fields:
+        setattr(builder, k, vals[k])
+    getter = operator.attrgetter(*fields)
+
+    number = 20000
+    splat = min(timeit.repeat(lambda: cls(**vals), number=number, repeat=repeat)) / number
+    positional = min(timeit.repeat(lambda: cls(*getter(builder)), number=number, repeat=repeat)) / number
+    saved = splat - positional
+    print(
+        f'  {name:<32} dict+splat {splat * 1e6:.2f} us, builder {positional * 1e6:.2f} us, '
+        f'saved {saved * 1e6:.2f} us/item ({saved / per_item:.1%} of parse time)'
+    )
+
+
+def walk_tree(data: bytes) -> None:
+    parser = lxml.etree.XMLParser(remove_blank_text=True)
+    parser.set_element_class_lookup(lxml.etree.ElementDefaultClassLookup(element=lxml.objectify.ObjectifiedElement))
+    for el in lxml.etree.fromstring(data, parser).iter():
+        el.text
+
+
+def profile(func: Callable[[], Any], repeat: int) -> None:
+    profiler = cProfile.Profile()
+    profiler.enable()
+    for _ in range(repeat):
+        func()
+    profiler.disable()
+    pstats.Stats(profiler).sort_stats('tottime').print_stats(15)
+
+
+def run_baseline(rev: str, args: List[str]) -> None:
+    # extract the package at the given revision and run this script against it
+    archive = subprocess.run(['git', 'archive', rev, 'nus_tools'], cwd=ROOT, check=True, stdout=subprocess.PIPE).stdout
+    with tempfile.TemporaryDirectory() as tmp:
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            tar.extractall(tmp)
+        print(f'--- baseline ({rev}) ---', flush=True)
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--root', tmp, *args], check=True)
+
+
+def main(args: List[str]) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--page-size', type=int, default=200, help='page size when using the bundled fixtures')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--titles', help='recorded `titles` list response (used as-is)')
+    parser.add_argument('--movies', help='recorded `movies` list response (used as-is)')
+    parser.add_argument('--profile', action='store_true')
+    parser.add_argument('--baseline', metavar='REV', help='also run against `nus_tools` at this git revision')
+    parser.add_argument('--root', default=ROOT, help=argparse.SUPPRESS)
+    ns = parser.parse_args(args)
+
+    if ns.baseline:
+        run_baseline(ns.baseline, [a for a in args if a not in ('--baseline', ns.baseline)])
+        print('--- current ---', flush=True)
+
+    sys.path.insert(0, ns.root)
+    from nus_tools.types.samurai import common
+    from nus_tools.types.samurai.title_list import SamuraiTitlesList, SamuraiListTitle
+    from nus_tools.types.samurai.movie_list import SamuraiMoviesList, SamuraiListMovie
+
+    for title, path, list_type, item_type in (
+        ('titles', ns.titles or os.path.join(FIXTURES, 'samurai_titles.xml'), SamuraiTitlesList, SamuraiListTitle),
+        ('movies', ns.movies or os.path.join(FIXTURES, 'samurai_movies.xml'), SamuraiMoviesList, SamuraiListMovie)
+    ):
+        recorded = getattr(ns, title) is not None
+        data = build_page(path, None if recorded else ns.page_size)
+        item = list_type().load_bytes(data)
+        items = item.titles if title == 'titles' else item.movies
+        print(f'{title} ({len(items)} items, {len(data)} bytes, {"recorded" if recorded else "bundled fixture"}):')
+
+        per_item = bench('load_bytes', lambda: list_type().load_bytes(data), len(items), ns.repeat)
+        bench('tree only', lambda: walk_tree(data), len(items), ns.repeat)
+        # not available in older revisions
+        if hasattr(common, 'SamuraiListStream'):
+            bench('SamuraiListStream', lambda: list(common.SamuraiListStream(io.BytesIO(data), list_type._parse_content)), len(items), ns.repeat)
+
+        vals = {f.name: getattr(items[0], f.name) for f in dataclasses.fields(item_type)}
+        bench_construct('constructor', item_type, vals, per_item, ns.repeat)
+
+        if ns.profile:
+            profile(lambda: list_type().load_bytes(data), ns.repeat)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -9,12 +9,14 @@ class AppDecryptor(AppBlockReader):
         super().__init__(h3, app, content_hash, real_app_size, tmd_app_size, verify)
         self._titlekey_decrypted = titlekey_decrypted
         self._content_index = content_index
+        # IV changes for every block in hashed contents, reuse the key schedule
+        self.__aes = utils.crypto.CBCDecryptor(titlekey_decrypted)
 
     def _read(self, length: int, check_length: bool = True) -> bytes:
         return self.__aes.decrypt(super()._read(length, check_length))
 
     def _init_iv(self, iv: bytes) -> None:
-        self.__aes = utils.crypto.AES.cbc(self._titlekey_decrypted, iv)
+        self.__aes.reset(iv)
 
     def _init_iv_unhashed(self) -> None:
         self._init_iv(self._content_index.to_bytes(2, 'big') + bytes(14))
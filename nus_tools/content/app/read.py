@@ -7,6 +7,8 @@ from ... import utils
 
 
 HASH_TABLES_SIZE = 0x0400
+# number of blocks sharing the same H0 table
+H1_GROUP_SIZE = 16
 
 
 class EndOfInputError(Exception):
@@ -41,13 +43,23 @@ class AppBlockReader:
         Writes the entire .app file to the provided output stream
         '''
 
-        # calculate total number of blocks
-        num_blocks = math.ceil(self._real_app_size / self.block_size)
+        # read and write each block, one H1 group at a time
+        while self._curr_block < self.num_blocks:
+            for block in self.load_next_group():
+                for data in block:
+                    output.write(data)
 
-        # read and write each block
-        for _ in range(num_blocks - self._curr_block):
-            for data in self.load_next_block():
-                output.write(data)
+    @property
+    def num_blocks(self) -> int:
+        return math.ceil(self._real_app_size / self.block_size)
+
+    @property
+    def current_block(self) -> int:
+        '''
+        Index of the block loaded by the next `load_next_block`/`load_next_group` call
+        '''
+
+        return self._curr_block
 
     def load_block(self, block_index: int) -> Tuple[bytes, bytes]:
         '''
@@ -68,6 +80,36 @@ class AppBlockReader:
         else:
             return self.__load_next_block_unhashed()
 
+    def load_next_group(self) -> List[Tuple[bytes, bytes]]:
+        '''
+        Loads the remaining blocks of the current H1 group (up to 16 blocks),
+        verifying the hash tree once and all data blocks in a single batch
+        '''
+
+        if not self._is_hashed:
+            return [self.load_next_block()]
+
+        count = min(H1_GROUP_SIZE - (self._curr_block & 0xf), self.num_blocks - self._curr_block)
+        blocks = []  # type: List[Tuple[bytes, bytes]]
+        h0_hashes = []  # type: List[bytes]
+        group_tables = None  # type: Optional[bytes]
+        for _ in range(count):
+            # all blocks in a group contain the same hash tables, only verify tree if they differ from the first block's
+            hash_table_data, h0_table = self.__load_hash_tables(verify_tree=False)
+            if self._verify and hash_table_data[:20 * 16 * 3] != group_tables:
+                self.__verify_hash_tree(hash_table_data)
+                group_tables = hash_table_data[:20 * 16 * 3]
+
+            h0_hash = utils.misc.get_chunk(h0_table, self._curr_block & 0xf, 20)
+            self._init_iv(h0_hash[:16])
+            blocks.append((hash_table_data, self._read(self.data_size)))
+            h0_hashes.append(h0_hash)
+            self._curr_block += 1
+
+        if self._verify:
+            utils.crypto.verify_sha1_many([data for _, data in blocks], h0_hashes)
+        return blocks
+
     def _read(self, length: int, check_length: bool = True) -> bytes:
         data = self._app.read(length)
         if check_length:
@@ -86,22 +128,7 @@ class AppBlockReader:
         Internal function for loading the next block in a hashed .app file
         '''
 
-        # load hash tables
-        self._init_iv(bytes(16))
-        hash_table_data = self._read(HASH_TABLES_SIZE)
-        # split into tables
-        h0_table, h1_table, h2_table = utils.misc.chunk(hash_table_data[:20 * 16 * 3], 20 * 16)
-
-        # obtain current hashes from tables, verify tree
-        if self._verify:
-            h3_table = cast(bytes, self._h3_table)
-            h3_hash = utils.misc.get_chunk(h3_table, self._curr_block >> 12 & 0xf, 20)
-            h2_hash = utils.misc.get_chunk(h2_table, self._curr_block >> 8 & 0xf, 20)
-            h1_hash = utils.misc.get_chunk(h1_table, self._curr_block >> 4 & 0xf, 20)
-            utils.crypto.verify_sha1(h2_table, h3_hash)
-            utils.crypto.verify_sha1(h1_table, h2_hash)
-            utils.crypto.verify_sha1(h0_table, h1_hash)
-
+        hash_table_data, h0_table = self.__load_hash_tables(verify_tree=self._verify)
         h0_hash = utils.misc.get_chunk(h0_table, self._curr_block & 0xf, 20)
 
         # load content
@@ -112,6 +139,27 @@ class AppBlockReader:
         self._curr_block += 1
         return (hash_table_data, app_data)
 
+    def __load_hash_tables(self, verify_tree: bool) -> Tuple[bytes, bytes]:
+        # load hash tables
+        self._init_iv(bytes(16))
+        hash_table_data = self._read(HASH_TABLES_SIZE)
+        if verify_tree:
+            self.__verify_hash_tree(hash_table_data)
+        return hash_table_data, hash_table_data[:20 * 16]
+
+    def __verify_hash_tree(self, hash_table_data: bytes) -> None:
+        # split into tables
+        h0_table, h1_table, h2_table = utils.misc.chunk(hash_table_data[:20 * 16 * 3], 20 * 16)
+
+        # obtain current hashes from tables, verify tree
+        h3_table = cast(bytes, self._h3_table)
+        h3_hash = utils.misc.get_chunk(h3_table, self._curr_block >> 12 & 0xf, 20)
+        h2_hash = utils.misc.get_chunk(h2_table, self._curr_block >> 8 & 0xf, 20)
+        h1_hash = utils.misc.get_chunk(h1_table, self._curr_block >> 4 & 0xf, 20)
+        utils.crypto.verify_sha1(h2_table, h3_hash)
+        utils.crypto.verify_sha1(h1_table, h2_hash)
+        utils.crypto.verify_sha1(h0_table, h1_hash)
+
     def __load_next_block_unhashed(self) -> Tuple[bytes, bytes]:
         '''
         Internal function for loading the next block in an unhashed .app file (i.e. without a corresponding .h3 file)
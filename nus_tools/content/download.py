@@ -0,0 +1,291 @@
+import os
+import math
+import time
+import hashlib
+import logging
+import threading
+import concurrent.futures
+from typing import Any, Callable, List, NamedTuple, Optional
+import requests
+import urllib3
+from constructutils.checksum import ChecksumVerifyError
+
+from .app import AppBlockReader, AppDecryptor, EndOfInputError
+from .app.read import HASH_TABLES_SIZE, H1_GROUP_SIZE
+from .. import ids, utils
+from ..sources.contentcdn import _ContentServerBase
+
+
+_logger = logging.getLogger(__name__)
+
+# size of a block in hashed contents (hash tables + data)
+_HASHED_BLOCK_SIZE = HASH_TABLES_SIZE + 0xfc00
+# segments are aligned to H1 groups, which is the unit of hash tree verification
+_SEGMENT_ALIGNMENT = H1_GROUP_SIZE * _HASHED_BLOCK_SIZE
+_READ_SIZE = 0x100000
+
+# transient errors after which a segment is retried; body reads may fail with plain urllib3 errors.
+#  local I/O errors and TLS errors are not included, HTTP errors are only retried for 5xx responses (see `_is_retryable`)
+_RETRY_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    urllib3.exceptions.ProtocolError,
+    urllib3.exceptions.TimeoutError,
+    EndOfInputError,
+    ChecksumVerifyError
+)
+
+TProgressFunc = Callable[[int], None]
+
+
+class RangeNotSupportedError(Exception):
+    pass
+
+
+def _is_retryable(e: Exception) -> bool:
+    if isinstance(e, requests.HTTPError):
+        return e.response is not None and e.response.status_code >= 500
+    if isinstance(e, requests.exceptions.SSLError):
+        return False
+    return isinstance(e, _RETRY_ERRORS)
+
+
+class Segment(NamedTuple):
+    start: int
+    # `None` for the last segment, which extends to the end of the file
+    end: Optional[int]
+
+
+def split_segments(size: int, count: int, min_segment_size: int) -> List[Segment]:
+    '''
+    Splits `size` bytes into up to `count` segments of at least `min_segment_size` bytes (except for the last one),
+    aligned to H1 groups
+    '''
+
+    count = max(1, min(count, size // max(min_segment_size, 1)))
+    segment_size = max(1, math.ceil(size / count / _SEGMENT_ALIGNMENT)) * _SEGMENT_ALIGNMENT
+    segments = [Segment(start, start + segment_size) for start in range(0, size, segment_size)] or [Segment(0, None)]
+    segments[-1] = Segment(segments[-1].start, None)
+    return segments
+
+
+if hasattr(os, 'pwrite'):
+    def _pwrite(fd: int, data: bytes, offset: int) -> None:
+        view = memoryview(data)
+        while view:
+            written = os.pwrite(fd, view, offset)
+            view = view[written:]
+            offset += written
+else:
+    _pwrite_lock = threading.Lock()
+
+    def _pwrite(fd: int, data: bytes, offset: int) -> None:
+        # no positional writes on windows, serialize seek + write instead
+        with _pwrite_lock:
+            os.lseek(fd, offset, os.SEEK_SET)
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+
+
+def _preallocate(fd: int, size: int) -> None:
+    if hasattr(os, 'posix_fallocate'):
+        try:
+            os.posix_fallocate(fd, 0, size)
+            return
+        except OSError:  # not supported by filesystem
+            pass
+    os.ftruncate(fd, size)
+
+
+class SegmentedDownloader:
+    '''
+    Downloads contents using multiple parallel range requests (`segments`) per content,
+    writing the segments directly into a preallocated output file.
+
+    Hashed contents are verified per segment (i.e. per set of H1 groups) as soon as the segment was downloaded,
+    unhashed contents are verified using the SHA1 hash of the entire file afterwards.
+    Failed segments are resumed from where they stopped, up to `max_retries` times
+    '''
+
+    def __init__(
+        self,
+        ccs: _ContentServerBase,
+        *,
+        segments: int = 8,
+        min_segment_size: int = 16 * 1024 * 1024,
+        max_retries: int = 3,
+        retry_delay: float = 1.0
+    ):
+        self.ccs = ccs
+        self.segments = segments
+        self.min_segment_size = min_segment_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+    def download(
+        self,
+        title_id: ids.TTitleIDInput,
+        tmd_entry: Any,
+        path: str,
+        *,
+        h3: Optional[bytes] = None,
+        titlekey: Optional[bytes] = None,
+        verify: bool = True,
+        progress: Optional[TProgressFunc] = None
+    ) -> int:
+        '''
+        Downloads the content described by `tmd_entry` to `path`, returns the size of the file.
+
+        Verifying encrypted contents requires the decrypted `titlekey`; the h3 table of hashed contents
+        is requested from the server if not provided.
+        `progress` is called with the number of bytes written, from multiple threads;
+        if a segment has to be downloaded again, it is called with the (negative) number of discarded bytes
+        '''
+
+        title_id = ids.TitleID.get_inst(title_id)
+        if verify:
+            if tmd_entry.type.encrypted and titlekey is None:
+                raise ValueError('verifying encrypted contents requires a titlekey')
+            if tmd_entry.type.hashed and h3 is None:
+                with self.ccs.get_h3(title_id, tmd_entry.id).get_reader() as reader:
+                    h3 = reader.read()
+            if h3 is not None:
+                utils.crypto.verify_sha1(h3, tmd_entry.sha1)
+
+        segments = split_segments(tmd_entry.size, self.segments, self.min_segment_size)
+        _logger.debug(f'downloading {title_id}/{tmd_entry.id:08X} ({tmd_entry.size} bytes) in {len(segments)} segment(s)')
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o666)
+        try:
+            _preallocate(fd, tmd_entry.size)
+            stop = threading.Event()
+            with concurrent.futures.ThreadPoolExecutor(len(segments), thread_name_prefix='segment') as executor:
+                futures = [
+                    executor.submit(self.__download_segment, title_id, tmd_entry, path, fd, segment, h3 if verify else None, titlekey, stop, progress)
+                    for segment in segments
+                ]
+                concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_EXCEPTION)
+                # stop remaining segments if one of them failed
+                stop.set()
+                ends = [f.result() for f in futures]
+
+            # the actual file may be larger than the size in the TMD
+            size = ends[-1]
+            os.ftruncate(fd, size)
+        finally:
+            os.close(fd)
+
+        if verify and not tmd_entry.type.hashed:
+            self.__verify_unhashed(tmd_entry, path, titlekey)
+        return size
+
+    def __download_segment(
+        self,
+        title_id: ids.TitleID,
+        tmd_entry: Any,
+        path: str,
+        fd: int,
+        segment: Segment,
+        h3: Optional[bytes],
+        titlekey: Optional[bytes],
+        stop: threading.Event,
+        progress: Optional[TProgressFunc]
+    ) -> int:
+        offset = segment.start
+        attempt = 0
+        redownloaded = False
+        while True:
+            try:
+                with self.ccs.get_app_range(title_id, tmd_entry.id, offset, segment.end).get_reader() as reader:
+                    self.__check_range(tmd_entry, segment, offset, reader.size)
+                    while not stop.is_set():
+                        data = reader.read(_READ_SIZE if segment.end is None else min(_READ_SIZE, segment.end - offset))
+                        if not data:
+                            break
+                        _pwrite(fd, data, offset)
+                        offset += len(data)
+                        if progress is not None:
+                            progress(len(data))
+
+                if stop.is_set():
+                    return offset
+                if segment.end is not None and offset != segment.end:
+                    raise EndOfInputError(offset)
+                if h3 is not None:
+                    self.__verify_hashed(tmd_entry, path, segment, h3, titlekey)
+                return offset
+            except Exception as e:
+                if not _is_retryable(e):
+                    raise
+                attempt += 1
+                if attempt > self.max_retries or stop.is_set():
+                    raise
+                if isinstance(e, ChecksumVerifyError):
+                    # corrupted somewhere in the segment, start over once;
+                    #  repeated mismatches are most likely caused by a wrong titlekey
+                    if redownloaded:
+                        raise
+                    redownloaded = True
+                    if progress is not None:
+                        progress(segment.start - offset)
+                    offset = segment.start
+                # otherwise, continue where the previous attempt stopped
+                _logger.warning(f'segment {segment.start}-{segment.end} of {tmd_entry.id:08X} failed at {offset} ({e}), retrying ({attempt}/{self.max_retries})')
+                time.sleep(self.retry_delay)
+
+    @staticmethod
+    def __check_range(tmd_entry: Any, segment: Segment, offset: int, size: Optional[int]) -> None:
+        # servers ignoring the range header return the entire file
+        if size is None:
+            return
+        if segment.end is not None:
+            ignored = size != segment.end - offset
+        else:
+            ignored = offset > 0 and size >= tmd_entry.size
+        if ignored:
+            raise RangeNotSupportedError(f'server does not support range requests (requested offset {offset}, got {size} bytes)')
+
+    @staticmethod
+    def __get_block_reader(tmd_entry: Any, app: Any, h3: Optional[bytes], titlekey: Optional[bytes]) -> AppBlockReader:
+        if tmd_entry.type.encrypted:
+            assert titlekey is not None
+            return AppDecryptor(titlekey, tmd_entry.index, h3, app, tmd_entry.sha1, tmd_entry.size, tmd_entry.size)
+        return AppBlockReader(h3, app, tmd_entry.sha1, tmd_entry.size, tmd_entry.size)
+
+    def __verify_hashed(self, tmd_entry: Any, path: str, segment: Segment, h3: bytes, titlekey: Optional[bytes]) -> None:
+        # reads back the blocks of the segment (most likely still in the page cache) and verifies them group by group
+        with open(path, 'rb') as app:
+            reader = self.__get_block_reader(tmd_entry, app, h3, titlekey)
+            first_block = segment.start // _HASHED_BLOCK_SIZE
+            end_block = reader.num_blocks if segment.end is None else min(reader.num_blocks, segment.end // _HASHED_BLOCK_SIZE)
+            if first_block >= end_block:
+                return
+            reader.load_block(first_block)
+            while reader.current_block < end_block:
+                reader.load_next_group()
+
+    @staticmethod
+    def __verify_unhashed(tmd_entry: Any, path: str, titlekey: Optional[bytes]) -> None:
+        # streamed instead of using `AppBlockReader`, which loads unhashed contents into memory
+        decryptor = None
+        if tmd_entry.type.encrypted:
+            assert titlekey is not None
+            decryptor = utils.crypto.CBCDecryptor(titlekey, tmd_entry.index.to_bytes(2, 'big') + bytes(14))
+
+        sha1 = hashlib.sha1()
+        left = tmd_entry.size
+        with open(path, 'rb') as app:
+            while left > 0:
+                data = app.read(_READ_SIZE)
+                if not data:
+                    raise EndOfInputError(tmd_entry.size - left)
+                if decryptor is not None:
+                    data = decryptor.decrypt(data)
+                sha1.update(data[:left])
+                left -= len(data)
+
+        digest = sha1.digest()
+        if digest != tmd_entry.sha1:
+            raise ChecksumVerifyError('hash mismatch', tmd_entry.sha1, digest)
@@ -0,0 +1,133 @@
+import sqlite3
+import logging
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .. import ids, utils
+from ..types.contentcdn import Ticket
+
+
+_logger = logging.getLogger(__name__)
+
+
+class TitleKeyDatabase:
+    '''
+    Local SQLite store of encrypted and decrypted title keys, keyed by title ID.
+
+    Title IDs are stored as integer primary keys, lookups are B-tree searches on the rowid
+    '''
+
+    def __init__(self, path: str = ':memory:'):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS titlekeys (
+                    title_id INTEGER PRIMARY KEY,
+                    title_version INTEGER,
+                    titlekey_encrypted BLOB NOT NULL,
+                    titlekey_decrypted BLOB
+                )
+            ''')
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> 'TitleKeyDatabase':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    # ingestion
+
+    def add_ticket(self, ticket: Ticket) -> None:
+        self.add_tickets([ticket])
+
+    def add_tickets(self, tickets: Iterable[Ticket]) -> int:
+        return self.add_keys(
+            (t.data.title_id, t.data.titlekey_encrypted, t.data.title_version)
+            for t in tickets
+        )
+
+    def add_keys(self, keys: Iterable[Tuple[ids.TTitleIDInput, bytes, Optional[int]]]) -> int:
+        '''
+        Adds (title ID, encrypted title key, title version) entries, replacing existing ones.
+
+        Keys are decrypted in bulk if the required common keys are available,
+        otherwise only the encrypted keys are stored
+        '''
+
+        entries = [(ids.TitleID.get_inst(title_id), bytes(key), version) for title_id, key, version in keys]
+        decrypted = self.__decrypt_many([(key, title_id) for title_id, key, _ in entries])
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO titlekeys VALUES (?, ?, ?, ?)',
+                (
+                    (int(str(title_id), 16), version, key, dec)
+                    for (title_id, key, version), dec in zip(entries, decrypted)
+                )
+            )
+        _logger.debug(f'added {len(entries)} title keys')
+        return len(entries)
+
+    @staticmethod
+    def __decrypt_many(items: List[Tuple[bytes, ids.TitleID]]) -> List[Optional[bytes]]:
+        results = [None] * len(items)  # type: List[Optional[bytes]]
+        # decrypt each platform separately, since common keys may be missing or unsupported for some platforms
+        for platform, group_it in utils.misc.groupby_sorted(enumerate(items), key=lambda x: x[1][1].type.platform):
+            group = list(group_it)
+            try:
+                keys = utils.crypto.TitleKey.decrypt_many(item for _, item in group)
+            except (RuntimeError, NotImplementedError) as e:
+                _logger.warning(f'unable to decrypt title keys for platform {platform.name}, only storing encrypted keys ({e})')
+                continue
+            for (i, _), key in zip(group, keys):
+                results[i] = key
+        return results
+
+    # lookup
+
+    def __get_row(self, title_id: ids.TTitleIDInput) -> Optional[Tuple[bytes, Optional[bytes]]]:
+        with self._lock:
+            return self._conn.execute(
+                'SELECT titlekey_encrypted, titlekey_decrypted FROM titlekeys WHERE title_id = ?',
+                (int(ids.TitleID.get_str(title_id), 16),)
+            ).fetchone()
+
+    def get_encrypted(self, title_id: ids.TTitleIDInput) -> Optional[bytes]:
+        row = self.__get_row(title_id)
+        return row[0] if row else None
+
+    def get_decrypted(self, title_id: ids.TTitleIDInput) -> Optional[bytes]:
+        row = self.__get_row(title_id)
+        if row is None:
+            return None
+        encrypted, decrypted = row
+        if decrypted is None:
+            # common key might not have been available when the key was added
+            decrypted = utils.crypto.TitleKey.decrypt(encrypted, title_id)
+            with self._lock, self._conn:
+                self._conn.execute(
+                    'UPDATE titlekeys SET titlekey_decrypted = ? WHERE title_id = ?',
+                    (decrypted, int(ids.TitleID.get_str(title_id), 16))
+                )
+        return decrypted
+
+    def __contains__(self, title_id: ids.TTitleIDInput) -> bool:
+        return self.__get_row(title_id) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM titlekeys').fetchone()[0]
+
+    def __iter__(self) -> Iterator[ids.TitleID]:
+        with self._lock:
+            rows = self._conn.execute('SELECT title_id FROM titlekeys ORDER BY title_id').fetchall()
+        return (ids.TitleID(title_id) for title_id, in rows)
+
+    def to_dict(self) -> Dict[ids.TitleID, Optional[bytes]]:
+        with self._lock:
+            rows = self._conn.execute('SELECT title_id, titlekey_decrypted FROM titlekeys').fetchall()
+        return {ids.TitleID(title_id): key for title_id, key in rows}
@@ -7,6 +7,8 @@ from reqcli.source import UnloadableType
 from reqcli.type import TypeLoadConfig
 
 from .app import AppDataReader, AppDecryptor, AppBlockReader, FSTProcessor
+from .download import SegmentedDownloader, TProgressFunc
+from .titlekeys import TitleKeyDatabase
 from .. import ids
 from ..sources.contentcdn import _ContentServerBase
 from ..types.contentcdn import TMD
@@ -21,11 +23,13 @@ class BaseContentUtil:
         *,
         verify: bool,
         config: Optional[TypeLoadConfig],
+        titlekeys: Optional[TitleKeyDatabase] = None,
     ):
         self._title_id = ids.TitleID.get_inst(title_id)
         self._decrypted_titlekey = decrypted_titlekey
         self._verify = verify
         self._config = config
+        self._titlekeys = titlekeys
 
     @abstractmethod
     def get_h3(self, entry_id: int) -> ContextManager[BinaryIO]:
@@ -39,6 +43,12 @@ class BaseContentUtil:
     def _get_tmd_raw(self) -> bytes:
         pass
 
+    def _get_decrypted_titlekey(self) -> Optional[bytes]:
+        # fall back to title key database if no key was provided explicitly
+        if self._decrypted_titlekey is None and self._titlekeys is not None:
+            self._decrypted_titlekey = self._titlekeys.get_decrypted(self._title_id)
+        return self._decrypted_titlekey
+
     @contextlib.contextmanager
     def get_reader(self, tmd_entry: Any) -> Iterator[AppDataReader]:
         h3: Optional[bytes]
@@ -53,9 +63,10 @@ class BaseContentUtil:
             block_reader: AppBlockReader
 
             if tmd_entry.type.encrypted:
-                assert self._decrypted_titlekey
+                titlekey = self._get_decrypted_titlekey()
+                assert titlekey
                 block_reader = AppDecryptor(
-                    self._decrypted_titlekey,
+                    titlekey,
                     tmd_entry.index,
                     h3,
                     app,
@@ -97,15 +108,25 @@ class DownloadContentUtil(BaseContentUtil):
         decrypted_titlekey: Optional[bytes],
         *,
         verify: bool = True,
+        titlekeys: Optional[TitleKeyDatabase] = None,
     ):
         super().__init__(
             title_id,
             decrypted_titlekey,
             verify=verify,
             config=ccs._config.type_load_config,
+            titlekeys=titlekeys,
         )
         self._ccs = ccs
 
+    def _get_decrypted_titlekey(self) -> Optional[bytes]:
+        titlekey = super()._get_decrypted_titlekey()
+        if titlekey is None and self._titlekeys is not None:
+            # not in database yet, fetch ticket once and store its key
+            self._titlekeys.add_ticket(self._ccs.get_cetk(self._title_id))
+            titlekey = super()._get_decrypted_titlekey()
+        return titlekey
+
     @contextlib.contextmanager
     def get_h3(self, entry_id: int) -> Iterator[BinaryIO]:
         with self._ccs.get_h3(self._title_id, entry_id).get_reader() as reader:
@@ -117,6 +138,27 @@ class DownloadContentUtil(BaseContentUtil):
             assert reader.size is not None, 'app stream does not have a size'
             yield reader, reader.size
 
+    def download_app(self, tmd_entry: Any, path: str, *, segments: int = 8, progress: Optional[TProgressFunc] = None) -> int:
+        '''
+        Downloads the (encrypted) app file to `path` using parallel range requests, see `SegmentedDownloader`
+        '''
+
+        h3: Optional[bytes] = None
+        if self._verify and tmd_entry.type.hashed:
+            with self.get_h3(tmd_entry.id) as reader:
+                h3 = reader.read()
+        titlekey = self._get_decrypted_titlekey() if self._verify and tmd_entry.type.encrypted else None
+
+        return SegmentedDownloader(self._ccs, segments=segments).download(
+            self._title_id,
+            tmd_entry,
+            path,
+            h3=h3,
+            titlekey=titlekey,
+            verify=self._verify,
+            progress=progress
+        )
+
     def _get_tmd_raw(self) -> bytes:
         with cast(UnloadableType, self._ccs.get_tmd(self._title_id, force_unloadable=True)).get_reader() as tmd_reader:
             return tmd_reader.read()
@@ -131,8 +173,9 @@ class LocalDirectoryContentUtil(BaseContentUtil):
         *,
         verify: bool = True,
         config: Optional[TypeLoadConfig] = None,
+        titlekeys: Optional[TitleKeyDatabase] = None,
     ):
-        super().__init__(title_id, decrypted_titlekey, verify=verify, config=config)
+        super().__init__(title_id, decrypted_titlekey, verify=verify, config=config, titlekeys=titlekeys)
         self._directory = Path(directory)
 
     def get_h3(self, entry_id: int) -> ContextManager[BinaryIO]:
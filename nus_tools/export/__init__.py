@@ -0,0 +1 @@
+from .samurai import SamuraiCatalogueColumns
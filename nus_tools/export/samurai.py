@@ -0,0 +1,257 @@
+import csv
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # type: ignore
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None  # type: ignore
+
+from .. import ids
+from ..types.samurai import SamuraiDlcPrices, SamuraiDlcSizes
+from ..types.samurai.common import SamuraiPrice
+from ..types.samurai.dlc import SamuraiDlc3DS, SamuraiDlcWiiU
+from ..types.samurai.title import SamuraiTitleElement
+from ..types.samurai.title_list import SamuraiListTitle
+
+
+TAnyTitle = Union[SamuraiListTitle, SamuraiTitleElement]
+TAnyDlc = Union[SamuraiDlcWiiU, SamuraiDlc3DS]
+
+# (name, type, nullable)
+_TSchema = Sequence[Tuple[str, str, bool]]
+
+_numpy_types = {'str': 'O', 'int': 'i8', 'float': 'f8', 'bool': '?'}
+_arrow_types = {'str': 'string', 'int': 'int64', 'float': 'float64', 'bool': 'bool_'}
+
+
+class _ColumnTable:
+    def __init__(self, schema: _TSchema):
+        self.schema = schema
+        self.columns = [[] for _ in schema]  # type: List[List[Any]]
+
+    def append(self, *values: Any) -> None:
+        assert len(values) == len(self.columns)
+        for column, value in zip(self.columns, values):
+            column.append(value)
+
+    def __len__(self) -> int:
+        return len(self.columns[0])
+
+    def to_dict(self) -> Dict[str, List[Any]]:
+        return {name: column for (name, _, _), column in zip(self.schema, self.columns)}
+
+    def to_numpy(self) -> 'numpy.ndarray':
+        if numpy is None:
+            raise RuntimeError('numpy is not installed')
+        # nullable non-float columns can't be represented by native numpy types
+        dtype = [
+            (name, 'O' if nullable and type != 'float' else _numpy_types[type])
+            for name, type, nullable in self.schema
+        ]
+        arr = numpy.empty(len(self), dtype=dtype)
+        for (name, type, _), column in zip(self.schema, self.columns):
+            if type == 'float':
+                column = [numpy.nan if v is None else v for v in column]
+            arr[name] = column
+        return arr
+
+    def to_arrow(self) -> 'pyarrow.Table':
+        if pyarrow is None:
+            raise RuntimeError('pyarrow is not installed')
+        return pyarrow.table({
+            name: pyarrow.array(column, type=getattr(pyarrow, _arrow_types[type])())
+            for (name, type, _), column in zip(self.schema, self.columns)
+        })
+
+    def write_csv(self, path: Path) -> None:
+        with path.open('w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(name for name, _, _ in self.schema)
+            writer.writerows(zip(*self.columns))
+
+
+class SamuraiCatalogueColumns:
+    '''
+    Flattens titles, prices, ratings, star ratings and DLCs into typed column tables in a single pass.
+
+    Tables can be exported as Arrow tables/Parquet files (requires `pyarrow`),
+    NumPy structured arrays (requires `numpy`), plain lists per column, or CSV files
+    '''
+
+    def __init__(self):
+        self.tables = {
+            'titles': _ColumnTable([
+                ('content_id', 'str', False),
+                ('product_code', 'str', False),
+                ('name', 'str', False),
+                ('formal_name', 'str', True),
+                ('is_new', 'bool', False),
+                ('platform_id', 'int', False),
+                ('platform_name', 'str', False),
+                ('publisher_id', 'int', False),
+                ('publisher_name', 'str', False),
+                ('genre', 'str', False),
+                ('sales_retail', 'bool', False),
+                ('sales_eshop', 'bool', False),
+                ('has_demo', 'bool', False),
+                ('release_date_eshop', 'str', True),
+                ('release_date_retail', 'str', True),
+                ('size', 'int', True),
+                ('num_players_min', 'int', True),
+                ('num_players_max', 'int', True)
+            ]),
+            'prices': _ColumnTable([
+                ('content_id', 'str', False),
+                ('kind', 'str', False),
+                ('price_id', 'str', True),
+                ('status', 'str', True),
+                ('amount', 'float', True),
+                ('currency', 'str', False),
+                # 3DS DLCs don't have content IDs, `content_id` is the title's content ID for these
+                ('dlc_name', 'str', True)
+            ]),
+            'ratings': _ColumnTable([
+                ('content_id', 'str', False),
+                ('system_id', 'int', False),
+                ('system_name', 'str', False),
+                ('rating_id', 'int', False),
+                ('name', 'str', False),
+                ('age', 'str', False)
+            ]),
+            'stars': _ColumnTable([
+                ('content_id', 'str', False),
+                ('score', 'float', False),
+                ('total_votes', 'int', False),
+                *((f'star{i}', 'int', False) for i in range(1, 6))
+            ]),
+            'dlcs': _ColumnTable([
+                # `content_id`/`is_new`/`release_date`/`size` are only available for Wii U DLCs
+                ('content_id', 'str', True),
+                ('title_content_id', 'str', False),
+                ('name', 'str', False),
+                ('is_new', 'bool', True),
+                ('release_date', 'str', True),
+                ('size', 'int', True)
+            ])
+        }
+
+    def add_titles(self, titles: Iterable[TAnyTitle]) -> 'SamuraiCatalogueColumns':
+        for title in titles:
+            self.add_title(title)
+        return self
+
+    def add_title(self, title: TAnyTitle) -> None:
+        content_id = str(title.content_id)
+        # only available in detailed title elements
+        detail = title if isinstance(title, SamuraiTitleElement) else None
+        num_players = detail.num_players if detail else None
+
+        self.tables['titles'].append(
+            content_id,
+            title.product_code,
+            title.name,
+            detail.formal_name if detail else None,
+            title.is_new,
+            title.platform.id,
+            title.platform.name,
+            title.publisher.id,
+            title.publisher.name,
+            title.genre,
+            title.sales_retail,
+            title.sales_eshop,
+            title.has_demo,
+            title.release_date_eshop,
+            title.release_date_retail,
+            detail.size if detail else None,
+            num_players[0] if num_players else None,
+            num_players[1] if num_players else None
+        )
+
+        if title.price_retail is not None:
+            self._add_price(content_id, 'retail', None, None, title.price_retail)
+
+        if title.rating_info is not None:
+            rating = title.rating_info
+            self.tables['ratings'].append(
+                content_id,
+                rating.system.id,
+                rating.system.name,
+                rating.id,
+                rating.name,
+                rating.age
+            )
+
+        if title.rating_stars is not None:
+            stars = title.rating_stars
+            self.tables['stars'].append(
+                content_id,
+                stars.score,
+                stars.total_votes,
+                *(stars.stars[i] for i in range(1, 6))
+            )
+
+    def add_dlcs(self, title_content_id: ids.TContentIDInput, dlcs: Iterable[TAnyDlc], sizes: Optional[SamuraiDlcSizes] = None) -> None:
+        '''
+        Adds Wii U or 3DS DLCs of a title. Prices of 3DS DLCs are part of the DLC list and added as well,
+        prices of Wii U DLCs have to be added separately using `add_dlc_prices`
+        '''
+
+        title_content_id = ids.ContentID.get_str(title_content_id)
+        for dlc in dlcs:
+            if isinstance(dlc, SamuraiDlc3DS):
+                self.tables['dlcs'].append(None, title_content_id, dlc.name, None, None, None)
+                self._add_price(title_content_id, 'dlc', None, None, dlc.price, dlc.name)
+                continue
+
+            self.tables['dlcs'].append(
+                str(dlc.content_id),
+                title_content_id,
+                dlc.name,
+                dlc.is_new,
+                dlc.release_date,
+                sizes.sizes.get(dlc.content_id) if sizes else None
+            )
+
+    def add_dlc_prices(self, prices: SamuraiDlcPrices) -> None:
+        for content_id, price in prices.prices.items():
+            self._add_price(str(content_id), 'dlc', price.price_id, price.eshop_status, price.price)
+
+    def _add_price(self, content_id: str, kind: str, price_id: Optional[str], status: Optional[str], price: SamuraiPrice, dlc_name: Optional[str] = None) -> None:
+        self.tables['prices'].append(
+            content_id,
+            kind,
+            price_id,
+            status,
+            price.amount,
+            str(price.currency),
+            dlc_name
+        )
+
+    # exports
+
+    def to_columns(self) -> Dict[str, Dict[str, List[Any]]]:
+        return {name: table.to_dict() for name, table in self.tables.items()}
+
+    def to_numpy(self) -> Dict[str, 'numpy.ndarray']:
+        return {name: table.to_numpy() for name, table in self.tables.items()}
+
+    def to_arrow(self) -> Dict[str, 'pyarrow.Table']:
+        return {name: table.to_arrow() for name, table in self.tables.items()}
+
+    def write_parquet(self, directory: str, **kwargs: Any) -> None:
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        for name, table in self.to_arrow().items():
+            pyarrow.parquet.write_table(table, str(path / f'{name}.parquet'), **kwargs)
+
+    def write_csv(self, directory: str) -> None:
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        for name, table in self.tables.items():
+            table.write_csv(path / f'{name}.csv')
@@ -0,0 +1,132 @@
+import zlib
+import struct
+import numpy
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Union
+
+from . import ids, utils
+from .types.idbe import IDBE, IDBEView
+
+
+# decoding of IDBE icons into RGBA arrays, and PNG encoding
+
+
+#####
+# wii u: 32bpp TGA
+#####
+
+def decode_tga(data: Union[bytes, memoryview]) -> numpy.ndarray:
+    '''
+    Decodes an uncompressed 32bpp TGA image into an RGBA array of shape (height, width, 4)
+    '''
+
+    id_length, colormap_type, image_type = struct.unpack_from('<BBB', data, 0)
+    width, height, bpp, descriptor = struct.unpack_from('<HHBB', data, 12)
+    if colormap_type != 0 or image_type != 2 or bpp != 32:
+        raise ValueError(f'unsupported TGA format (colormap type {colormap_type}, image type {image_type}, {bpp}bpp)')
+
+    offset = 18 + id_length
+    pixels = numpy.frombuffer(data, dtype=numpy.uint8, count=width * height * 4, offset=offset)
+    # BGRA -> RGBA
+    image = pixels.reshape(height, width, 4)[:, :, [2, 1, 0, 3]]
+    # origin is bottom left unless bit 5 is set
+    if not descriptor & 0x20:
+        image = image[::-1]
+    return numpy.ascontiguousarray(image)
+
+
+#####
+# 3ds: tiled RGB565
+#####
+
+@utils.misc.cache
+def _get_tile_order(size: int) -> numpy.ndarray:
+    # maps linear input index -> output pixel index;
+    #  pixels are stored in 8x8 tiles (row-major), pixels within tiles are in morton (z-)order
+    i = numpy.arange(size * size)
+    tile, p = i // 64, i % 64
+    x = (p & 1) | ((p >> 1) & 2) | ((p >> 2) & 4)
+    y = ((p >> 1) & 1) | ((p >> 2) & 2) | ((p >> 3) & 4)
+    tx, ty = tile % (size // 8), tile // (size // 8)
+    return (ty * 8 + y) * size + (tx * 8 + x)
+
+
+def decode_rgb565_tiled(data: Union[bytes, memoryview], size: int) -> numpy.ndarray:
+    '''
+    Decodes tiled little-endian RGB565 data into an RGBA array of shape (size, size, 4)
+    '''
+
+    values = numpy.frombuffer(data, dtype='<u2', count=size * size).astype(numpy.uint16)
+    rgba = numpy.empty((size * size, 4), dtype=numpy.uint8)
+    # expand 5/6 bit channels to 8 bits
+    rgba[_get_tile_order(size), 0] = (((values >> 11) & 0x1f) * 255 + 15) // 31
+    rgba[_get_tile_order(size), 1] = (((values >> 5) & 0x3f) * 255 + 31) // 63
+    rgba[_get_tile_order(size), 2] = ((values & 0x1f) * 255 + 15) // 31
+    rgba[:, 3] = 0xff
+    return rgba.reshape(size, size, 4)
+
+
+#####
+# idbe
+#####
+
+def decode_icon_data(icon_data: Union[bytes, memoryview], platform: ids.AnyPlatform) -> Dict[str, numpy.ndarray]:
+    '''
+    Decodes the raw icon region of an IDBE file (see `IDBEView.icon_data`),
+    returns a dict of size -> RGBA array (same keys as in `structs.idbe`)
+    '''
+
+    if platform in (ids.TitlePlatform.WIIU, ids.ContentPlatform.WIIU):
+        return {'128': decode_tga(icon_data)}
+    else:
+        return {
+            '24': decode_rgb565_tiled(icon_data[:24 * 24 * 2], 24),
+            '48': decode_rgb565_tiled(icon_data[24 * 24 * 2:], 48)
+        }
+
+
+def decode_idbe_icons(idbe: Union[IDBE, IDBEView], platform: Optional[ids.AnyPlatform] = None) -> Dict[str, numpy.ndarray]:
+    if isinstance(idbe, IDBEView):
+        assert platform is not None, 'platform is required for `IDBEView` objects'
+        return decode_icon_data(idbe.icon_data, platform)
+
+    if 'icons_tga' in idbe.data:
+        return {size: decode_tga(data) for size, data in idbe.data.icons_tga.items() if not size.startswith('_')}
+    return {
+        size: decode_rgb565_tiled(data, int(size))
+        for size, data in idbe.data.icons_raw.items() if not size.startswith('_')
+    }
+
+
+#####
+# png
+#####
+
+def _png_chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+
+def encode_png(image: numpy.ndarray, compression_level: int = 6) -> bytes:
+    '''
+    Encodes an RGBA array of shape (height, width, 4) as PNG
+    '''
+
+    height, width, channels = image.shape
+    assert channels == 4 and image.dtype == numpy.uint8
+
+    # prepend filter type 0 (none) to each row
+    rows = numpy.zeros((height, width * 4 + 1), dtype=numpy.uint8)
+    rows[:, 1:] = image.reshape(height, width * 4)
+
+    return b''.join((
+        b'\x89PNG\r\n\x1a\n',
+        _png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)),
+        _png_chunk(b'IDAT', zlib.compress(rows.tobytes(), compression_level)),
+        _png_chunk(b'IEND', b'')
+    ))
+
+
+def encode_png_many(images: Iterable[numpy.ndarray], compression_level: int = 6, max_workers: Optional[int] = None) -> List[bytes]:
+    # zlib releases the GIL while compressing, threads are sufficient here
+    with ThreadPoolExecutor(max_workers) as executor:
+        return list(executor.map(lambda image: encode_png(image, compression_level), images))
@@ -0,0 +1,199 @@
+import numpy
+from typing import Dict, Iterable, Iterator, List, Tuple, Union, overload
+
+from . import ids
+from .types.tagaya import UpdateList
+
+
+# vectorized operations on title IDs, see `ids.TitleID` for the scalar equivalents
+
+_GAME_TYPES = [t.value for t in (ids.TitleType.GAME_DISC_WII, ids.TitleType.GAME_DL_WII, ids.TitleType.GAME_3DS, ids.TitleType.GAME_WIIU)]
+_UPDATE_TYPES = [t.value for t in (ids.TitleType.UPDATE_3DS, ids.TitleType.UPDATE_WIIU)]
+_DLC_TYPES = [t.value for t in (ids.TitleType.DLC_WII, ids.TitleType.DLC_3DS, ids.TitleType.DLC_WIIU)]
+_ALL_TYPES = numpy.array([t.value for t in ids.TitleType], dtype=numpy.uint32)
+
+_DLC_CATEGORIES = {
+    ids.TitlePlatform.WII: 0x0005,
+    ids.TitlePlatform._3DS: 0x008c,
+    ids.TitlePlatform.WIIU: 0x000c
+}
+
+TTitleIDArrayInput = Union['TitleIDArray', numpy.ndarray, Iterable[Union[ids.TitleID, int, str]]]
+
+
+class TitleIDArray:
+    '''
+    Set of title IDs stored as a NumPy `uint64` array
+    '''
+
+    def __init__(self, values: TTitleIDArrayInput):
+        if isinstance(values, TitleIDArray):
+            arr = values.values
+        elif isinstance(values, numpy.ndarray):
+            arr = values.astype(numpy.uint64, copy=False)
+        else:
+            arr = numpy.fromiter(
+                (int(v, 16) if isinstance(v, str) else int(v) for v in values),
+                dtype=numpy.uint64
+            )
+        self.values = arr  # type: numpy.ndarray
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'TitleIDArray':
+        # concatenated 8-byte big-endian values
+        return cls(numpy.frombuffer(data, dtype='>u8').astype(numpy.uint64))
+
+    def to_titles(self) -> List[ids.TitleID]:
+        return ids.TitleID.from_ints(self.values.tolist())
+
+    # components
+
+    @property
+    def type_values(self) -> numpy.ndarray:
+        return (self.values >> numpy.uint64(32)).astype(numpy.uint32)
+
+    @property
+    def platform(self) -> numpy.ndarray:
+        return (self.values >> numpy.uint64(48)).astype(numpy.uint16)
+
+    @property
+    def category(self) -> numpy.ndarray:
+        return ((self.values >> numpy.uint64(32)) & numpy.uint64(0xffff)).astype(numpy.uint16)
+
+    @property
+    def uid(self) -> numpy.ndarray:
+        return (self.values & numpy.uint64(0xffffffff)).astype(numpy.uint32)
+
+    # masks
+
+    @property
+    def is_game(self) -> numpy.ndarray:
+        return numpy.isin(self.type_values, _GAME_TYPES)
+
+    @property
+    def is_update(self) -> numpy.ndarray:
+        return numpy.isin(self.type_values, _UPDATE_TYPES)
+
+    @property
+    def is_dlc(self) -> numpy.ndarray:
+        return numpy.isin(self.type_values, _DLC_TYPES)
+
+    @property
+    def is_valid(self) -> numpy.ndarray:
+        return numpy.isin(self.type_values, _ALL_TYPES)
+
+    # relations
+
+    def game(self) -> 'TitleIDArray':
+        return self.__with_category(numpy.zeros(len(self), dtype=numpy.uint64), 'game')
+
+    def update(self) -> 'TitleIDArray':
+        return self.__with_category(numpy.full(len(self), 0x000e, dtype=numpy.uint64), 'update')
+
+    def dlc(self) -> 'TitleIDArray':
+        platform = self.platform
+        categories = numpy.zeros(len(self), dtype=numpy.uint64)
+        for p, category in _DLC_CATEGORIES.items():
+            categories[platform == p.value] = category
+        return self.__with_category(categories, 'dlc')
+
+    def __with_category(self, categories: numpy.ndarray, name: str) -> 'TitleIDArray':
+        # same restrictions as the scalar properties, only games/updates/dlcs can be mapped
+        mappable = self.is_game | self.is_update | self.is_dlc
+        if not mappable.all():
+            raise RuntimeError(f'unimplemented: {name} title ID for {self[int(numpy.argmin(mappable))]}')
+
+        platform = self.platform.astype(numpy.uint64)
+        result = TitleIDArray(
+            (platform << numpy.uint64(48)) | (categories << numpy.uint64(32)) | self.uid.astype(numpy.uint64)
+        )
+        valid = result.is_valid
+        if not valid.all():
+            raise ValueError(f'no valid {name} title type for {self[int(numpy.argmin(valid))]}')
+        return result
+
+    # set operations/joins
+
+    def isin(self, other: TTitleIDArrayInput) -> numpy.ndarray:
+        return numpy.isin(self.values, TitleIDArray(other).values)
+
+    def unique(self) -> 'TitleIDArray':
+        return TitleIDArray(numpy.unique(self.values))
+
+    def latest_update_versions(self, updatelist: UpdateList) -> numpy.ndarray:
+        '''
+        Returns the latest version in the update list of each title's update title, or -1 if not listed
+        '''
+
+        update_ids, versions = updatelist_arrays(updatelist)
+        if len(update_ids) == 0:
+            return numpy.full(len(self), -1, dtype=numpy.int32)
+
+        # `updatelist_arrays` returns sorted, unique IDs
+        targets = self.update().values
+        idx = numpy.searchsorted(update_ids.values, targets)
+        idx[idx >= len(update_ids)] = 0
+        found = update_ids.values[idx] == targets
+        return numpy.where(found, versions[idx], -1).astype(numpy.int32)
+
+    # container protocol
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @overload
+    def __getitem__(self, index: int) -> ids.TitleID:
+        ...
+
+    @overload
+    def __getitem__(self, index: Union[slice, numpy.ndarray]) -> 'TitleIDArray':
+        ...
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, numpy.integer)):
+            return ids.TitleID(int(self.values[index]))
+        return TitleIDArray(self.values[index])
+
+    def __iter__(self) -> Iterator[ids.TitleID]:
+        return iter(self.to_titles())
+
+    def __contains__(self, title_id: Union[ids.TitleID, int, str]) -> bool:
+        value = int(title_id, 16) if isinstance(title_id, str) else int(title_id)
+        return bool((self.values == numpy.uint64(value)).any())
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}[{len(self)} titles]'
+
+
+def updatelist_arrays(updatelist: UpdateList) -> Tuple[TitleIDArray, numpy.ndarray]:
+    '''
+    Converts the entries of an update list into sorted, unique title IDs and their respective latest versions
+    '''
+
+    if not updatelist.updates:
+        return TitleIDArray(numpy.empty(0, dtype=numpy.uint64)), numpy.empty(0, dtype=numpy.uint32)
+
+    title_ids = TitleIDArray(title_id for title_id, _ in updatelist.updates).values
+    versions = numpy.fromiter((version for _, version in updatelist.updates), dtype=numpy.uint32, count=len(updatelist.updates))
+
+    # sort by ID, then version; the last entry of each ID has the highest version
+    order = numpy.lexsort((versions, title_ids))
+    title_ids, versions = title_ids[order], versions[order]
+    last = numpy.append(title_ids[1:] != title_ids[:-1], True)
+    return TitleIDArray(title_ids[last]), versions[last]
+
+
+def group_by_game(titles: TTitleIDArrayInput) -> Dict[ids.TitleID, TitleIDArray]:
+    '''
+    Groups games, updates and DLCs by their respective game title ID
+    '''
+
+    arr = TitleIDArray(titles)
+    games = arr.game().values
+    order = numpy.argsort(games, kind='stable')
+    games_sorted, values_sorted = games[order], arr.values[order]
+    unique, starts = numpy.unique(games_sorted, return_index=True)
+    return {
+        ids.TitleID(int(game)): TitleIDArray(group)
+        for game, group in zip(unique.tolist(), numpy.split(values_sorted, starts[1:]))
+    }
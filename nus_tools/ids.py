@@ -1,5 +1,6 @@
+import struct
 from enum import IntEnum
-from typing import Union, overload
+from typing import Dict, Iterable, List, Union, overload
 
 
 # ref: https://www.3dbrew.org/wiki/Titles
@@ -54,34 +55,89 @@ class TitleType(IntEnum):
         return self.value & 0xffff
 
 
+# avoid going through the enum machinery for each ID
+_title_types = {t.value: t for t in TitleType}
+_title_id_struct = struct.Struct('>Q')
+
+
 class TitleID:
-    type: TitleType
-    uid: int
+    # integer-backed and interned, i.e. constructing the same ID twice returns the same (immutable) instance;
+    #  interned IDs are never evicted, the number of distinct IDs is bounded by the size of the catalogue.
+    #  since instances are shared, setting/deleting attributes raises an `AttributeError`
+    __slots__ = ('_value',)
+    _cache = {}  # type: Dict[int, TitleID]
+
+    _value: int
 
     @overload
-    def __init__(self, type: TitleType, uid: int):
+    def __new__(cls, type: TitleType, uid: int) -> 'TitleID':
         ...
 
     @overload
-    def __init__(self, title_id: Union[str, int, bytes]):
+    def __new__(cls, title_id: Union[str, int, bytes]) -> 'TitleID':
         ...
 
-    def __init__(self, type=None, uid=None, title_id=None):
+    def __new__(cls, type=None, uid=None, title_id=None):
         # first overload
         if isinstance(type, TitleType):
             assert isinstance(uid, int)
-            self.type = type
-            self.uid = uid
+            if not 0 <= uid <= 0xffffffff:
+                raise ValueError(f'uid {uid:#x} is out of range')
+            return cls._from_int((type.value << 32) | uid)
         # second overload
-        else:
-            if title_id is None:
-                title_id = type  # positional parameter
-            if isinstance(title_id, bytes):
-                title_id = int.from_bytes(title_id, 'big')
-            elif isinstance(title_id, str):
-                title_id = int(title_id, 16)
-            self.type = TitleType(title_id >> 32)
-            self.uid = title_id & 0xffffffff
+        if title_id is None:
+            title_id = type  # positional parameter
+        if isinstance(title_id, bytes):
+            title_id = int.from_bytes(title_id, 'big')
+        elif isinstance(title_id, str):
+            title_id = int(title_id, 16)
+        return cls._from_int(title_id)
+
+    @classmethod
+    def _from_int(cls, value: int) -> 'TitleID':
+        inst = cls._cache.get(value)
+        if inst is None:
+            if (value >> 32) not in _title_types:
+                raise ValueError(f'{value >> 32:#010x} is not a valid {TitleType.__name__}')
+            inst = object.__new__(cls)
+            object.__setattr__(inst, '_value', value)
+            cls._cache[value] = inst
+        return inst
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    @classmethod
+    def from_ints(cls, values: Iterable[int]) -> List['TitleID']:
+        '''
+        Creates title IDs from integers.
+
+        Note that all created IDs are added to the (unbounded) class-level intern cache,
+        this should not be used with arbitrary/untrusted input
+        '''
+        from_int = cls._from_int
+        return [from_int(int(v)) for v in values]
+
+    @classmethod
+    def from_bytes_array(cls, data: bytes) -> List['TitleID']:
+        '''
+        Creates title IDs from concatenated 8-byte big-endian values.
+
+        Same as `from_ints`, all created IDs are added to the (unbounded) intern cache
+        '''
+        from_int = cls._from_int
+        return [from_int(v) for v, in _title_id_struct.iter_unpack(data)]
+
+    @property
+    def type(self) -> TitleType:
+        return _title_types[self._value >> 32]
+
+    @property
+    def uid(self) -> int:
+        return self._value & 0xffffffff
 
     @property
     def is_game(self):
@@ -124,20 +180,33 @@ class TitleID:
                 return TitleID(TitleType.from_platform_category(self.type.platform, 0x000c), self.uid)
         raise RuntimeError(f'unimplemented: dlc title ID for {self}')
 
-    def __bytes__(self) -> bytes:
-        return bytes.fromhex(str(self))
+    def to_bytes(self) -> bytes:
+        return self._value.to_bytes(8, 'big')
+
+    __bytes__ = to_bytes
+
+    def __int__(self) -> int:
+        return self._value
 
     def __str__(self):
-        return f'{self.type.value:08X}{self.uid:08X}'
+        return f'{self._value:016X}'
 
     def __repr__(self):
         return f'{type(self).__name__}[0x{str(self)}, {self.type.name}]'
 
     def __hash__(self):
-        return hash((self.type, self.uid))
+        return hash(self._value)
 
     def __eq__(self, other):
-        return (self.type, self.uid) == (other.type, other.uid)
+        if not isinstance(other, TitleID):
+            return NotImplemented
+        return self._value == other._value
+
+    def __lt__(self, other: 'TitleID') -> bool:
+        return self._value < other._value
+
+    def __reduce__(self):
+        return (TitleID, (self._value,))
 
     @staticmethod
     def get_str(val: TTitleIDInput) -> str:
@@ -176,45 +245,98 @@ class ContentType(IntEnum):
         return self.value % 100  # lower two digits
 
 
+_content_types = {t.value: t for t in ContentType}
+# content IDs consist of a 4-digit type and a 10-digit uid
+_CONTENT_UID_FACTOR = 10 ** 10
+
+
 class ContentID:
-    type: ContentType
-    uid: int
+    # see `TitleID`
+    __slots__ = ('_value',)
+    _cache = {}  # type: Dict[int, ContentID]
+
+    _value: int
 
     @overload
-    def __init__(self, type: ContentType, uid: int):
+    def __new__(cls, type: ContentType, uid: int) -> 'ContentID':
         ...
 
     @overload
-    def __init__(self, content_id: Union[str, int]):
+    def __new__(cls, content_id: Union[str, int]) -> 'ContentID':
         ...
 
-    def __init__(self, type=None, uid=None, content_id=None):
+    def __new__(cls, type=None, uid=None, content_id=None):
         # first overload
         if isinstance(type, ContentType):
             assert isinstance(uid, int)
-            self.type = type
-            self.uid = uid
+            if not 0 <= uid < _CONTENT_UID_FACTOR:
+                raise ValueError(f'uid {uid} is out of range')
+            return cls._from_int(type.value * _CONTENT_UID_FACTOR + uid)
         # second overload
-        else:
-            if content_id is None:
-                content_id = type  # positional parameter
-            if isinstance(content_id, int):
-                content_id = str(content_id)
+        if content_id is None:
+            content_id = type  # positional parameter
+        if isinstance(content_id, str):
             assert len(content_id) == 14
-            self.type = ContentType(int(content_id[:4]))
-            self.uid = int(content_id[4:])
+            content_id = int(content_id)
+        else:
+            assert _CONTENT_UID_FACTOR * 1000 <= content_id < _CONTENT_UID_FACTOR * 10000  # 14 digits
+        return cls._from_int(content_id)
+
+    @classmethod
+    def _from_int(cls, value: int) -> 'ContentID':
+        inst = cls._cache.get(value)
+        if inst is None:
+            if value // _CONTENT_UID_FACTOR not in _content_types:
+                raise ValueError(f'{value // _CONTENT_UID_FACTOR} is not a valid {ContentType.__name__}')
+            inst = object.__new__(cls)
+            object.__setattr__(inst, '_value', value)
+            cls._cache[value] = inst
+        return inst
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    @classmethod
+    def from_ints(cls, values: Iterable[int]) -> List['ContentID']:
+        '''
+        Creates content IDs from integers; see `TitleID.from_ints` regarding the intern cache
+        '''
+        from_int = cls._from_int
+        return [from_int(int(v)) for v in values]
+
+    @property
+    def type(self) -> ContentType:
+        return _content_types[self._value // _CONTENT_UID_FACTOR]
+
+    @property
+    def uid(self) -> int:
+        return self._value % _CONTENT_UID_FACTOR
+
+    def __int__(self) -> int:
+        return self._value
 
     def __str__(self):
-        return f'{self.type.value:04d}{self.uid:010d}'
+        return f'{self._value:014d}'
 
     def __repr__(self):
         return f'{type(self).__name__}[{str(self)}, {self.type.name}]'
 
     def __hash__(self):
-        return hash((self.type, self.uid))
+        return hash(self._value)
 
     def __eq__(self, other):
-        return (self.type, self.uid) == (other.type, other.uid)
+        if not isinstance(other, ContentID):
+            return NotImplemented
+        return self._value == other._value
+
+    def __lt__(self, other: 'ContentID') -> bool:
+        return self._value < other._value
+
+    def __reduce__(self):
+        return (ContentID, (self._value,))
 
     @staticmethod
     def get_str(val: TContentIDInput) -> str:
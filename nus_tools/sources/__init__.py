@@ -1,3 +1,7 @@
+from .base import NUSBaseSource
+from .limits import RequestLimiter, TokenBucket, AIMDController
+from .coalesce import SingleFlight, AsyncSingleFlight
+from .cache import ResponseCache, CacheStats, IMMUTABLE
 from .samurai import Samurai
 from .ninja import Ninja, CertType
 from .contentcdn import \
@@ -0,0 +1,10 @@
+# async counterparts of the sources in `nus_tools.sources`, requires `aiohttp`
+from .base import AsyncClient, AsyncBaseSource, AsyncUnloadableType
+from .pool import ConnectionStats, FingerprintMismatchError
+from .samurai import AsyncSamurai
+from .ninja import AsyncNinja
+from .contentcdn import \
+    AsyncContentServerWiiUCDN, AsyncContentServerWiiUNoCDN, \
+    AsyncContentServer3DSCDN, AsyncContentServer3DSNoCDN
+from .idbe import AsyncIDBEServer
+from .tagaya import AsyncTagayaCDN, AsyncTagayaNoCDN
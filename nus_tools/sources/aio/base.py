@@ -0,0 +1,257 @@
+import ssl
+import asyncio
+import logging
+import contextlib
+import aiohttp
+from urllib.parse import urlsplit
+from typing import Any, AsyncIterator, Dict, Optional, TypeVar
+from reqcli.source import SourceConfig, ReqData, CertType
+from reqcli.type import BaseTypeLoadable
+
+from ..cache import ResponseCache, TCacheTTLs, get_cache_key, get_ttl
+from ..coalesce import AsyncSingleFlight, get_request_key
+from ..limits import RequestLimiter
+from .pool import ConnectionStats, create_client_context, get_cert_key, parse_fingerprint
+
+
+_logger = logging.getLogger(__name__)
+
+_TLoadable = TypeVar('_TLoadable', bound=BaseTypeLoadable)
+
+class AsyncClient:
+    '''
+    Connection pool shared between async sources.
+
+    Connections are kept alive and reused across requests (and across sources using the same client),
+    the number of in-flight requests is bounded by `max_concurrency` (and `host_limits` for individual hosts).
+    TLS sessions are cached per host and resumed on new connections if `tls_session_reuse` is set.
+
+    Connection/handshake counts are collected in `stats`
+    '''
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = 100,
+        max_connections: int = 100,
+        max_connections_per_host: int = 0,
+        host_limits: Optional[Dict[str, int]] = None,
+        keepalive_timeout: float = 30.0,
+        tls_session_reuse: bool = True,
+        timeout: Optional[float] = 60.0
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.host_limits = dict(host_limits or {})
+        self.keepalive_timeout = keepalive_timeout
+        self.tls_session_reuse = tls_session_reuse
+        self.timeout = timeout
+        self.stats = ConnectionStats()
+
+        # these are bound to the running event loop, create them lazily
+        self.__session = None  # type: Optional[aiohttp.ClientSession]
+        self.__semaphore = None  # type: Optional[asyncio.Semaphore]
+        self.__host_semaphores = {}  # type: Dict[str, asyncio.Semaphore]
+        self.__ssl_contexts = {}  # type: Dict[Any, ssl.SSLContext]
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self.__session is None or self.__session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self.__session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                raise_for_status=True,
+                trace_configs=[self.__create_trace_config()]
+            )
+            self.__semaphore = asyncio.Semaphore(self.max_concurrency)
+            self.__host_semaphores = {host: asyncio.Semaphore(limit) for host, limit in self.host_limits.items()}
+        return self.__session
+
+    def __create_trace_config(self) -> aiohttp.TraceConfig:
+        stats = self.stats
+
+        async def on_request_start(*args: Any) -> None:
+            stats.requests += 1
+
+        async def on_connection_create_end(*args: Any) -> None:
+            stats.connections_created += 1
+
+        async def on_connection_reuseconn(*args: Any) -> None:
+            stats.connections_reused += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    def _get_ssl_context(self, cert: Optional[CertType], *, verify_tls: bool, fingerprint: Optional[bytes]) -> ssl.SSLContext:
+        # contexts are reused for all requests (also across sources with the same TLS options),
+        #  which allows aiohttp to reuse pooled connections (and the context to resume cached TLS sessions)
+        key = (get_cert_key(cert), verify_tls, fingerprint)
+        context = self.__ssl_contexts.get(key)
+        if context is None:
+            context = self.__ssl_contexts[key] = create_client_context(
+                cert,
+                verify_tls=verify_tls,
+                fingerprint=fingerprint,
+                session_reuse=self.tls_session_reuse,
+                stats=self.stats
+            )
+        return context
+
+    @contextlib.asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[aiohttp.ClientResponse]:
+        '''
+        Sends a request and yields the response once the headers were received,
+        the concurrency slot is held until the body was consumed (i.e. the context was exited)
+        '''
+
+        session = self._get_session()
+        assert self.__semaphore is not None
+        host_semaphore = self.__host_semaphores.get(urlsplit(url).hostname or '')
+        async with contextlib.AsyncExitStack() as stack:
+            if host_semaphore is not None:
+                await stack.enter_async_context(host_semaphore)
+            await stack.enter_async_context(self.__semaphore)
+            yield await stack.enter_async_context(session.request(method, url, **kwargs))
+
+    async def close(self) -> None:
+        if self.__session is not None:
+            await self.__session.close()
+            self.__session = None
+
+    async def __aenter__(self) -> 'AsyncClient':
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+
+class AsyncUnloadableType:
+    '''
+    Async counterpart of `reqcli.source.UnloadableType`, provides access to the raw (streamed) response body
+    '''
+
+    def __init__(self, source: 'AsyncBaseSource', data: ReqData, kwargs: Dict[str, Any]):
+        self._source = source
+        self._data = data
+        self._kwargs = kwargs
+
+    @contextlib.asynccontextmanager
+    async def get_reader(self) -> AsyncIterator[aiohttp.StreamReader]:
+        async with self._source._request(self._data, **self._kwargs) as response:
+            yield response.content
+
+    async def read(self) -> bytes:
+        async with self.get_reader() as reader:
+            return await reader.read()
+
+
+class AsyncBaseSource:
+    '''
+    Async counterpart of `reqcli.source.BaseSource`, using `aiohttp`.
+
+    Takes the same base request data/TLS options, requests are sent using the given `AsyncClient`
+    (or a new one owned by this source if not specified).
+    Same as with `NUSBaseSource`, identical concurrent requests are coalesced if `coalesce_requests` is set,
+    requests go through `limiter` if set, and responses of loadable types are stored in `cache` if set
+    '''
+
+    limiter = None  # type: Optional[RequestLimiter]
+    coalesce_requests = True
+    cache = None  # type: Optional[ResponseCache]
+    cache_ttls = ()  # type: TCacheTTLs
+
+    def __init__(
+        self,
+        base_data: ReqData,
+        config: Optional[SourceConfig] = None,
+        *,
+        verify_tls: bool = True,
+        require_fingerprint: Optional[str] = None,
+        client: Optional[AsyncClient] = None
+    ):
+        self._base_data = base_data
+        self._host = urlsplit(base_data.path).hostname or ''
+        self._single_flight = AsyncSingleFlight()
+        self._config = config or SourceConfig()
+        self._verify_tls = verify_tls
+        self._fingerprint = parse_fingerprint(require_fingerprint) if require_fingerprint else None
+
+        self._owns_client = client is None
+        self._client = client or AsyncClient()
+
+    async def close(self) -> None:
+        # shared clients have to be closed by their owner
+        if self._owns_client:
+            await self._client.close()
+
+    async def __aenter__(self) -> 'AsyncBaseSource':
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    # request handling
+
+    def _get_ssl_context(self, cert: Optional[CertType]) -> ssl.SSLContext:
+        return self._client._get_ssl_context(cert, verify_tls=self._verify_tls, fingerprint=self._fingerprint)
+
+    @contextlib.asynccontextmanager
+    async def _request(self, data: ReqData, **kwargs: Any) -> AsyncIterator[aiohttp.ClientResponse]:
+        base = self._base_data
+        url = base.path + data.path
+        cert = data.cert if data.cert is not None else base.cert
+
+        async with contextlib.AsyncExitStack() as stack:
+            limiter = self.limiter
+            sample = None
+            if limiter is not None:
+                sample = await stack.enter_async_context(limiter.limit_async(self._host))
+            response = await stack.enter_async_context(self._client.request(
+                'GET',
+                url,
+                params={**(base.params or {}), **(data.params or {})},
+                headers={**(base.headers or {}), **(data.headers or {})},
+                ssl=self._get_ssl_context(cert),
+                **kwargs
+            ))
+            # latency is measured until the headers were received, not including the (possibly large) body;
+            #  the concurrency slot is still held until the body was consumed
+            if sample is not None:
+                sample.done()
+            yield response
+
+    async def _create_type(self, data: ReqData, loadable: _TLoadable, **kwargs: Any) -> _TLoadable:
+        key = get_request_key(data, loadable, kwargs) if self.coalesce_requests else None
+        if key is None:
+            return await self.__load(data, loadable, **kwargs)
+        return await self._single_flight.do(key, lambda: self.__load(data, loadable, **kwargs))
+
+    async def __load(self, data: ReqData, loadable: _TLoadable, **kwargs: Any) -> _TLoadable:
+        cache = self.cache
+        ttl = get_ttl(self.cache_ttls, data.path) if cache is not None else None
+        if ttl is None:
+            raw = await self.__read(data, **kwargs)
+        else:
+            assert cache is not None
+            cache_key = get_cache_key(self._base_data.path + data.path, {**(self._base_data.params or {}), **(data.params or {})})
+            raw = await cache.get_async(cache_key)
+            if raw is None:
+                raw = await self.__read(data, **kwargs)
+                await cache.put_async(cache_key, raw, ttl)
+        return loadable.load_bytes(raw, self._config.type_load_config)
+
+    async def __read(self, data: ReqData, **kwargs: Any) -> bytes:
+        async with self._request(data, **kwargs) as response:
+            return await response.read()
+
+    def _create_unloadable(self, data: ReqData, **kwargs: Any) -> AsyncUnloadableType:
+        # nothing is requested until the reader is used
+        return AsyncUnloadableType(self, data, kwargs)
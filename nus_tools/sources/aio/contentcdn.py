@@ -0,0 +1,98 @@
+from typing import Any, Optional
+from reqcli.source import SourceConfig, ReqData, CertType
+
+from ... import ids
+from ...types.contentcdn import Ticket, TMD
+from ..contentcdn import _WIIU_CDN_PATH, _WIIU_NOCDN_PATH, _3DS_CDN_PATH, _3DS_NOCDN_PATH, _3DS_NOCDN_FINGERPRINT, _CACHE_TTLS
+from .base import AsyncBaseSource, AsyncClient, AsyncUnloadableType
+
+
+class _AsyncContentServerBase(AsyncBaseSource):
+    cache_ttls = _CACHE_TTLS
+
+    # /<title id>/cetk
+    async def get_cetk(self, title_id: ids.TTitleIDInput, **kwargs: Any) -> Ticket:
+        return await self._create_type(
+            ReqData(path=f'{ids.TitleID.get_str(title_id)}/cetk'),
+            Ticket(title_id),
+            **kwargs
+        )
+
+    # /<title id>/tmd[.<version>]
+    async def get_tmd(self, title_id: ids.TTitleIDInput, version: Optional[int] = None, **kwargs: Any) -> TMD:
+        return await self._create_type(
+            ReqData(path=f'{ids.TitleID.get_str(title_id)}/tmd' + (f'.{version}' if version is not None else '')),
+            TMD(title_id),
+            **kwargs
+        )
+
+    # /<title id>/<special id>
+    async def get_tmd_special(self, title_id: ids.TTitleIDInput, content_id: int, **kwargs: Any) -> TMD:
+        assert (content_id >> 16) == 0xfffe
+        return await self._create_type(
+            ReqData(path=f'{ids.TitleID.get_str(title_id)}/{content_id:08X}'),
+            TMD(title_id),
+            **kwargs
+        )
+
+    # /<title id>/<content id>
+    def get_app(self, title_id: ids.TTitleIDInput, content_id: int, **kwargs: Any) -> AsyncUnloadableType:
+        return self._create_unloadable(
+            ReqData(path=f'{ids.TitleID.get_str(title_id)}/{content_id:08X}'),
+            **kwargs
+        )
+
+    # /<title id>/<content id>, bytes [start, end) or [start, <end of file>)
+    def get_app_range(self, title_id: ids.TTitleIDInput, content_id: int, start: int, end: Optional[int] = None, **kwargs: Any) -> AsyncUnloadableType:
+        return self._create_unloadable(
+            ReqData(
+                path=f'{ids.TitleID.get_str(title_id)}/{content_id:08X}',
+                headers={'Range': f'bytes={start}-' + (f'{end - 1}' if end is not None else '')}
+            ),
+            **kwargs
+        )
+
+    # /<title id>/<content id>.h3
+    def get_h3(self, title_id: ids.TTitleIDInput, content_id: int, **kwargs: Any) -> AsyncUnloadableType:
+        return self._create_unloadable(
+            ReqData(path=f'{ids.TitleID.get_str(title_id)}/{content_id:08X}.h3'),
+            **kwargs
+        )
+
+
+class AsyncContentServerWiiUCDN(_AsyncContentServerBase):
+    def __init__(self, config: Optional[SourceConfig] = None, *, client: Optional[AsyncClient] = None):
+        super().__init__(
+            ReqData(path=_WIIU_CDN_PATH),
+            config,
+            client=client
+        )
+
+
+class AsyncContentServerWiiUNoCDN(_AsyncContentServerBase):
+    def __init__(self, config: Optional[SourceConfig] = None, *, client: Optional[AsyncClient] = None):
+        super().__init__(
+            ReqData(path=_WIIU_NOCDN_PATH),
+            config,
+            client=client
+        )
+
+
+class AsyncContentServer3DSCDN(_AsyncContentServerBase):
+    def __init__(self, config: Optional[SourceConfig] = None, *, client: Optional[AsyncClient] = None):
+        super().__init__(
+            ReqData(path=_3DS_CDN_PATH),
+            config,
+            client=client
+        )
+
+
+class AsyncContentServer3DSNoCDN(_AsyncContentServerBase):
+    def __init__(self, cert: CertType, config: Optional[SourceConfig] = None, *, client: Optional[AsyncClient] = None):
+        super().__init__(
+            ReqData(path=_3DS_NOCDN_PATH, cert=cert),
+            config,
+            verify_tls=False,
+            require_fingerprint=_3DS_NOCDN_FINGERPRINT,
+            client=client
+        )
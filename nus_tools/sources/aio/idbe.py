@@ -0,0 +1,29 @@
+from typing import Any, Optional
+from reqcli.source import SourceConfig, ReqData
+
+from ... import ids
+from ...types.idbe import IDBE
+from ..idbe import _FINGERPRINT, _get_base_path, _get_idbe_path, _CACHE_TTLS
+from .base import AsyncBaseSource, AsyncClient
+
+
+class AsyncIDBEServer(AsyncBaseSource):
+    cache_ttls = _CACHE_TTLS
+
+    def __init__(self, platform: str, config: Optional[SourceConfig] = None, *, client: Optional[AsyncClient] = None):
+        super().__init__(
+            ReqData(path=_get_base_path(platform)),
+            config,
+            verify_tls=False,
+            require_fingerprint=_FINGERPRINT,
+            client=client
+        )
+        self.platform = platform
+
+    # /<id>/<title id>.idbe
+    async def get_idbe(self, title_id: ids.TTitleIDInput, version: Optional[int] = None, **kwargs: Any) -> IDBE:
+        return await self._create_type(
+            ReqData(path=_get_idbe_path(title_id, version)),
+            IDBE(title_id),
+            **kwargs
+        )
@@ -0,0 +1,54 @@
+from typing import Any, Optional, Union, cast
+from reqcli.source import SourceConfig, CertType, ReqData
+
+from ... import ids
+from ...region import Region
+from ...types.ninja import NinjaEcInfo, NinjaIDPair
+from ..ninja import _PATH, _FINGERPRINT, _CACHE_TTLS
+from .base import AsyncBaseSource, AsyncClient
+
+
+class AsyncNinja(AsyncBaseSource):
+    cache_ttls = _CACHE_TTLS
+
+    def __init__(self, region: Union[str, Region], cert: CertType, config: Optional[SourceConfig] = None, *, client: Optional[AsyncClient] = None):
+        super().__init__(
+            ReqData(
+                path=_PATH,
+                cert=cert
+            ),
+            config,
+            verify_tls=False,
+            require_fingerprint=_FINGERPRINT,
+            client=client
+        )
+
+        self.region = region.country_code if isinstance(region, Region) else region
+
+    # /<region>/title/<id>/ec_info
+    async def get_ec_info(self, content_id: ids.TContentIDInput, **kwargs: Any) -> NinjaEcInfo:
+        return await self._create_type(
+            ReqData(path=f'{self.region}/title/{ids.ContentID.get_str(content_id)}/ec_info'),
+            NinjaEcInfo(),
+            **kwargs
+        )
+
+    # /titles/id_pair
+    async def get_id_pair(self, *, content_id: Optional[ids.TContentIDInput] = None, title_id: Optional[ids.TTitleIDInput] = None, **kwargs: Any) -> NinjaIDPair:
+        if (content_id is None) == (title_id is None):
+            raise ValueError('Exactly one of `content_id`/`title_id` must be set')
+
+        return await self._create_type(
+            ReqData(
+                path='titles/id_pair',
+                params={'title_id[]': ids.TitleID.get_str(title_id)} if title_id else {'ns_uid[]': ids.ContentID.get_str(cast(ids.TContentIDInput, content_id))}
+            ),
+            NinjaIDPair(),
+            **kwargs
+        )
+
+    async def get_content_id(self, title_id: ids.TTitleIDInput, **kwargs: Any) -> ids.ContentID:
+        return (await self.get_id_pair(title_id=title_id, **kwargs)).content_id
+
+    async def get_title_id(self, content_id: ids.TContentIDInput, **kwargs: Any) -> ids.TitleID:
+        return (await self.get_id_pair(content_id=content_id, **kwargs)).title_id
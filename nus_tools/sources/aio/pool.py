@@ -0,0 +1,139 @@
+import ssl
+import hashlib
+import threading
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Optional
+from reqcli.source import CertType
+
+
+_fingerprint_hashes = {
+    16: hashlib.md5,
+    20: hashlib.sha1,
+    32: hashlib.sha256
+}
+
+
+class FingerprintMismatchError(ssl.SSLError):
+    # raised during the handshake, i.e. surfaces as the cause of an `aiohttp.ClientConnectorSSLError`
+    pass
+
+
+@dataclass
+class ConnectionStats:
+    requests: int = 0
+    # new connections vs. requests sent on pooled keep-alive connections
+    connections_created: int = 0
+    connections_reused: int = 0
+    # full TLS handshakes vs. abbreviated handshakes using a cached session
+    tls_handshakes: int = 0
+    tls_resumed: int = 0
+    fingerprint_checks: int = 0
+
+    def reset(self) -> None:
+        for f in fields(self):
+            setattr(self, f.name, 0)
+
+    @property
+    def connection_reuse_ratio(self) -> float:
+        total = self.connections_created + self.connections_reused
+        return self.connections_reused / total if total else 0.0
+
+
+class _ClientSSLObject(ssl.SSLObject):
+    context: '_ClientSSLContext'
+
+    def do_handshake(self) -> None:
+        super().do_handshake()
+        self.context._on_handshake(self)
+
+
+class _ClientSSLContext(ssl.SSLContext):
+    '''
+    Client context that caches TLS sessions per host for resumption,
+    and verifies the server certificate fingerprint once per connection, right after the handshake
+    '''
+
+    sslobject_class = _ClientSSLObject
+
+    fingerprint: Optional[bytes]
+    session_reuse: bool
+    stats: ConnectionStats
+
+    def _init(self, fingerprint: Optional[bytes], session_reuse: bool, stats: ConnectionStats) -> None:
+        self.fingerprint = fingerprint
+        self.session_reuse = session_reuse
+        self.stats = stats
+        self._sessions = {}  # type: Dict[Optional[str], ssl.SSLSession]
+        # with TLS 1.3, session tickets are only sent after the handshake,
+        #  the session is therefore taken from the latest connection when the next one is established
+        self._last_connections = {}  # type: Dict[Optional[str], ssl.SSLObject]
+        self._sessions_lock = threading.Lock()
+
+    def wrap_bio(self, incoming: ssl.MemoryBIO, outgoing: ssl.MemoryBIO, server_side: bool = False, server_hostname: Optional[str] = None, session: Optional[ssl.SSLSession] = None) -> ssl.SSLObject:
+        if session is None and self.session_reuse:
+            session = self.__get_session(server_hostname)
+        return super().wrap_bio(incoming, outgoing, server_side, server_hostname, session)
+
+    def __get_session(self, hostname: Optional[str]) -> Optional[ssl.SSLSession]:
+        with self._sessions_lock:
+            last = self._last_connections.get(hostname)
+            if last is not None:
+                session = last.session
+                if session is not None and session.has_ticket:
+                    self._sessions[hostname] = session
+            return self._sessions.get(hostname)
+
+    def _on_handshake(self, sslobj: ssl.SSLObject) -> None:
+        if sslobj.session_reused:
+            self.stats.tls_resumed += 1
+        else:
+            self.stats.tls_handshakes += 1
+
+        if self.fingerprint is not None:
+            self.stats.fingerprint_checks += 1
+            # the certificate is available in binary form regardless of the verification mode
+            digest = _fingerprint_hashes[len(self.fingerprint)](sslobj.getpeercert(binary_form=True)).digest()
+            if digest != self.fingerprint:
+                raise FingerprintMismatchError(f'certificate fingerprint mismatch for {sslobj.server_hostname}: expected {self.fingerprint.hex()}, got {digest.hex()}')
+
+        if self.session_reuse:
+            with self._sessions_lock:
+                self._last_connections[sslobj.server_hostname] = sslobj
+
+
+def parse_fingerprint(fingerprint: str) -> bytes:
+    # same format as `require_fingerprint` of the sync sources, i.e. colon-separated hex
+    value = bytes.fromhex(fingerprint.replace(':', ''))
+    if len(value) not in _fingerprint_hashes:
+        raise ValueError(f'unsupported fingerprint length: {len(value)}')
+    return value
+
+
+def create_client_context(
+    cert: Optional[CertType],
+    *,
+    verify_tls: bool,
+    fingerprint: Optional[bytes],
+    session_reuse: bool,
+    stats: ConnectionStats
+) -> ssl.SSLContext:
+    # same settings as `ssl.create_default_context`
+    context = _ClientSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context._init(fingerprint, session_reuse, stats)
+    if verify_tls:
+        context.load_default_certs()
+    else:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+
+    if cert is not None:
+        if isinstance(cert, str):
+            context.load_cert_chain(cert)
+        else:
+            context.load_cert_chain(*cert)
+    return context
+
+
+def get_cert_key(cert: Optional[CertType]) -> Any:
+    # certs may be given as lists, which aren't hashable
+    return tuple(cert) if isinstance(cert, list) else cert
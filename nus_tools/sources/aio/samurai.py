@@ -0,0 +1,255 @@
+import asyncio
+import itertools
+import contextlib
+import collections
+import lxml.objectify
+from typing import Any, AsyncContextManager, AsyncIterator, Awaitable, Callable, Deque, List, Optional, Type, TypeVar, Union
+from typing_extensions import Protocol
+from reqcli.source import SourceConfig, ReqData
+from reqcli.utils.typing import RequestDict
+
+from ... import ids
+from ...region import Region
+from ...types.samurai import \
+    SamuraiContentsList, \
+    SamuraiMovie, SamuraiMoviesList, \
+    SamuraiTitle, SamuraiTitlesList, \
+    SamuraiDlcWiiU, SamuraiDlcsWiiU, SamuraiTitleDlcsWiiU, SamuraiTitleDlcs3DS, SamuraiDlcSizes, SamuraiDlcPrices, \
+    SamuraiDemo, \
+    SamuraiNews, SamuraiTelops
+from ...types.samurai.common import SamuraiListBaseType, AsyncSamuraiListStream
+from ...types.samurai.movie_list import SamuraiListMovie
+from ...types.samurai.title_list import SamuraiListTitle
+from ...types.samurai.title import SamuraiTitleElement
+from ..samurai import _HOSTS, _check_dlc_ids_wiiu, _get_title_dlcs_request, _get_dlc_ids_param, _CACHE_TTLS
+from .base import AsyncBaseSource, AsyncClient
+
+
+_TList = TypeVar('_TList', bound=SamuraiListBaseType, covariant=True)
+
+
+class AsyncListFunc(Protocol[_TList]):
+    def __call__(self, offset: int, limit: int = 200, other_params: RequestDict = {}, **kwargs: Any) -> Awaitable[_TList]:
+        ...
+
+
+_TItem = TypeVar('_TItem')
+
+
+class AsyncListStreamFunc(Protocol[_TItem]):
+    def __call__(self, offset: int, limit: int = 200, other_params: RequestDict = {}, **kwargs: Any) -> AsyncContextManager[AsyncSamuraiListStream[_TItem]]:
+        ...
+
+
+class AsyncSamurai(AsyncBaseSource):
+    cache_ttls = _CACHE_TTLS
+
+    def __init__(self, region: Union[str, Region], shop_id: int, *, lang: Optional[str] = None, cdn: Optional[bool] = False, config: Optional[SourceConfig] = None, client: Optional[AsyncClient] = None):
+        params: RequestDict = {'shop_id': shop_id}
+        if lang:
+            params['lang'] = lang
+
+        region = region.country_code if isinstance(region, Region) else region
+
+        host, fingerprint = _HOSTS[bool(cdn)]
+        super().__init__(
+            ReqData(
+                path=f'https://{host}/samurai/ws/{region}/',
+                params=params
+            ),
+            config,
+            verify_tls=False,
+            require_fingerprint=fingerprint,
+            client=client
+        )
+
+        self.region = region
+        self.shop_id = shop_id
+        self.lang = lang
+
+    # /contents
+    async def get_content_count(self, other_params: RequestDict = {}, **kwargs: Any) -> int:
+        return await self._get_list_total(self.get_content_list, other_params, **kwargs)
+
+    async def get_content_list(self, offset: int, limit: int = 200, other_params: RequestDict = {}, **kwargs: Any) -> SamuraiContentsList:
+        return await self._get_list(SamuraiContentsList, 'contents', offset, limit, other_params, **kwargs)
+
+    def get_all_content_lists(self, max_page_size: int = 200, other_params: RequestDict = {}, **kwargs: Any) -> AsyncIterator[SamuraiContentsList]:
+        return self._get_all_lists(self.get_content_list, max_page_size, other_params, **kwargs)
+
+    def stream_content_list(self, offset: int, limit: int = 200, other_params: RequestDict = {}, **kwargs: Any) -> AsyncContextManager[AsyncSamuraiListStream[Union[SamuraiListTitle, SamuraiListMovie]]]:
+        return self._stream_list(SamuraiContentsList._parse_content, 'contents', offset, limit, other_params, **kwargs)
+
+    def iter_all_contents(self, max_page_size: int = 200, other_params: RequestDict = {}, **kwargs: Any) -> AsyncIterator[Union[SamuraiListTitle, SamuraiListMovie]]:
+        return self._iter_all_list_items(self.stream_content_list, max_page_size, other_params, **kwargs)
+
+    # /title/<id>
+    async def get_title(self, content_id: ids.TContentIDInput, **kwargs: Any) -> SamuraiTitle:
+        return await self._create_type(
+            ReqData(path=f'title/{ids.ContentID.get_str(content_id)}'),
+            SamuraiTitle(),
+            **kwargs
+        )
+
+    # /titles
+    async def get_title_count(self, other_params: RequestDict = {}, **kwargs: Any) -> int:
+        return await self._get_list_total(self.get_title_list, other_params, **kwargs)
+
+    async def get_title_list(self, offset: int, limit: int = 200, other_params: RequestDict = {}, **kwargs: Any) -> SamuraiTitlesList:
+        return await self._get_list(SamuraiTitlesList, 'titles', offset, limit, other_params, **kwargs)
+
+    def get_all_title_lists(self, max_page_size: int = 200, other_params: RequestDict = {}, **kwargs: Any) -> AsyncIterator[SamuraiTitlesList]:
+        return self._get_all_lists(self.get_title_list, max_page_size, other_params, **kwargs)
+
+    def stream_title_list(self, offset: int, limit: int = 200, other_params: RequestDict = {}, **kwargs: Any) -> AsyncContextManager[AsyncSamuraiListStream[SamuraiListTitle]]:
+        return self._stream_list(SamuraiTitlesList._parse_content, 'titles', offset, limit, other_params, **kwargs)
+
+    def iter_all_titles(self, max_page_size: int = 200, other_params: RequestDict = {}, **kwargs: Any) -> AsyncIterator[SamuraiListTitle]:
+        return self._iter_all_list_items(self.stream_title_list, max_page_size, other_params, **kwargs)
+
+    # movies
+    async def get_movie(self, content_id: ids.TContentIDInput, **kwargs: Any) -> SamuraiMovie:
+        return await self._create_type(
+            ReqData(path=f'movie/{ids.ContentID.get_str(content_id)}'),
+            SamuraiMovie(),
+            **kwargs
+        )
+
+    async def get_movie_count(self, other_params: RequestDict = {}, **kwargs: Any) -> int:
+        return await self._get_list_total(self.get_movie_list, other_params, **kwargs)
+
+    async def get_movie_list(self, offset: int, limit: int = 200, other_params: RequestDict = {}, **kwargs: Any) -> SamuraiMoviesList:
+        return await self._get_list(SamuraiMoviesList, 'movies', offset, limit, other_params, **kwargs)
+
+    def get_all_movie_lists(self, max_page_size: int = 200, other_params: RequestDict = {}, **kwargs: Any) -> AsyncIterator[SamuraiMoviesList]:
+        return self._get_all_lists(self.get_movie_list, max_page_size, other_params, **kwargs)
+
+    def stream_movie_list(self, offset: int, limit: int = 200, other_params: RequestDict = {}, **kwargs: Any) -> AsyncContextManager[AsyncSamuraiListStream[SamuraiListMovie]]:
+        return self._stream_list(SamuraiMoviesList._parse_content, 'movies', offset, limit, other_params, **kwargs)
+
+    def iter_all_movies(self, max_page_size: int = 200, other_params: RequestDict = {}, **kwargs: Any) -> AsyncIterator[SamuraiListMovie]:
+        return self._iter_all_list_items(self.stream_movie_list, max_page_size, other_params, **kwargs)
+
+    # /aocs
+    # WiiU only since 3DS DLCs don't have their own content IDs
+    async def get_dlcs_wiiu(self, *dlc_ids: ids.TContentIDInput, **kwargs: Any) -> SamuraiDlcsWiiU:
+        _check_dlc_ids_wiiu(dlc_ids)
+        return await self._create_type(
+            ReqData(
+                path='aocs',
+                params={'aoc[]': ','.join(ids.ContentID.get_str(i) for i in dlc_ids)}
+            ),
+            SamuraiDlcsWiiU(),
+            **kwargs
+        )
+
+    async def get_dlcs_for_title(self, title: Union[ids.TContentIDInput, SamuraiListTitle, SamuraiTitleElement], **kwargs: Any) -> Union[SamuraiTitleDlcsWiiU, SamuraiTitleDlcs3DS]:
+        return await self._create_type(
+            *_get_title_dlcs_request(title),
+            **kwargs
+        )
+
+    async def get_dlc_sizes(self, *dlcs: Union[ids.TContentIDInput, SamuraiDlcWiiU], **kwargs: Any) -> SamuraiDlcSizes:
+        return await self._create_type(
+            ReqData(
+                path='aocs/size',
+                params={'aoc[]': _get_dlc_ids_param(dlcs)}
+            ),
+            SamuraiDlcSizes(),
+            **kwargs
+        )
+
+    async def get_dlc_prices(self, *dlcs: Union[ids.TContentIDInput, SamuraiDlcWiiU], **kwargs: Any) -> SamuraiDlcPrices:
+        return await self._create_type(
+            ReqData(
+                path='aocs/prices',
+                params={'aoc[]': _get_dlc_ids_param(dlcs)}
+            ),
+            SamuraiDlcPrices(),
+            **kwargs
+        )
+
+    # /demo/<id>
+    async def get_demo(self, content_id: ids.TContentIDInput, **kwargs: Any) -> SamuraiDemo:
+        return await self._create_type(
+            ReqData(path=f'demo/{ids.ContentID.get_str(content_id)}'),
+            SamuraiDemo(),
+            **kwargs
+        )
+
+    async def get_demos(self, title: SamuraiTitleElement, **kwargs: Any) -> List[SamuraiDemo]:
+        if not title.demos:
+            return []
+        return list(await asyncio.gather(*(self.get_demo(demo.content_id, **kwargs) for demo in title.demos)))
+
+    # misc
+    # /news
+    async def get_news(self, **kwargs: Any) -> SamuraiNews:
+        return await self._create_type(
+            ReqData(path='news'),
+            SamuraiNews(),
+            **kwargs
+        )
+
+    # /telops
+    async def get_telops(self, **kwargs: Any) -> SamuraiTelops:
+        return await self._create_type(
+            ReqData(path='telops'),
+            SamuraiTelops(),
+            **kwargs
+        )
+
+    # generic list funcs
+    async def _get_list(self, list_type: Type[_TList], path: str, offset: int, limit: int, other_params: RequestDict, **kwargs: Any) -> _TList:
+        return await self._create_type(
+            ReqData(path=path, params={'offset': offset, 'limit': limit, **other_params}),
+            list_type(),
+            **kwargs
+        )
+
+    async def _get_list_total(self, get_list_func: AsyncListFunc[_TList], other_params: RequestDict, **kwargs: Any) -> int:
+        return (await get_list_func(0, 1, other_params, **kwargs)).total
+
+    async def _get_all_lists(self, get_list_func: AsyncListFunc[_TList], max_page_size: int, other_params: RequestDict, **kwargs: Any) -> AsyncIterator[_TList]:
+        first_page = await get_list_func(0, max_page_size, other_params, **kwargs)
+        yield first_page
+
+        # remaining pages are requested concurrently, but yielded in order;
+        #  only up to `max_concurrency` pages are scheduled ahead of the consumer
+        offsets = iter(range(max_page_size, first_page.total, max_page_size))
+        tasks = collections.deque()  # type: Deque[asyncio.Future[_TList]]
+
+        def schedule() -> None:
+            for offset in itertools.islice(offsets, self._client.max_concurrency - len(tasks)):
+                tasks.append(asyncio.ensure_future(get_list_func(offset, max_page_size, other_params, **kwargs)))
+
+        try:
+            schedule()
+            while tasks:
+                page = await tasks.popleft()
+                schedule()
+                yield page
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    # generic streaming list funcs
+    @contextlib.asynccontextmanager
+    async def _stream_list(self, parse_content: Callable[[lxml.objectify.ObjectifiedElement], _TItem], path: str, offset: int, limit: int, other_params: RequestDict, **kwargs: Any) -> AsyncIterator[AsyncSamuraiListStream[_TItem]]:
+        unloadable = self._create_unloadable(
+            ReqData(path=path, params={'offset': offset, 'limit': limit, **other_params}),
+            **kwargs
+        )
+        async with unloadable.get_reader() as reader:
+            yield AsyncSamuraiListStream(reader, parse_content)  # type: ignore
+
+    async def _iter_all_list_items(self, stream_list_func: AsyncListStreamFunc[_TItem], max_page_size: int, other_params: RequestDict, **kwargs: Any) -> AsyncIterator[_TItem]:
+        offset = 0
+        while True:
+            async with stream_list_func(offset, max_page_size, other_params, **kwargs) as stream:
+                async for item in stream:
+                    yield item
+                total = stream.total
+            offset += max_page_size
+            if total is None or offset >= total:
+                break
@@ -0,0 +1,48 @@
+from typing import Any, Optional
+from reqcli.source import SourceConfig, ReqData
+
+from ...types.tagaya import UpdateListVersion, UpdateList
+from ..tagaya import _CDN_PATH, _CDN_FINGERPRINT, _NOCDN_PATH, _NOCDN_FINGERPRINT, _CACHE_TTLS
+from .base import AsyncBaseSource, AsyncClient
+
+
+class _AsyncTagayaBase(AsyncBaseSource):
+    cache_ttls = _CACHE_TTLS
+
+    # /latest_version
+    async def get_latest_updatelist_version(self, **kwargs: Any) -> UpdateListVersion:
+        return await self._create_type(
+            ReqData(path='latest_version'),
+            UpdateListVersion(),
+            **kwargs
+        )
+
+    # /list/<version>.versionlist
+    async def get_updatelist(self, version: int, **kwargs: Any) -> UpdateList:
+        return await self._create_type(
+            ReqData(path=f'list/{version}.versionlist'),
+            UpdateList(),
+            **kwargs
+        )
+
+
+class AsyncTagayaCDN(_AsyncTagayaBase):
+    def __init__(self, config: Optional[SourceConfig] = None, *, client: Optional[AsyncClient] = None):
+        super().__init__(
+            ReqData(path=_CDN_PATH),
+            config,
+            verify_tls=False,
+            require_fingerprint=_CDN_FINGERPRINT,
+            client=client
+        )
+
+
+class AsyncTagayaNoCDN(_AsyncTagayaBase):
+    def __init__(self, config: Optional[SourceConfig] = None, *, client: Optional[AsyncClient] = None):
+        super().__init__(
+            ReqData(path=_NOCDN_PATH),
+            config,
+            verify_tls=False,
+            require_fingerprint=_NOCDN_FINGERPRINT,
+            client=client
+        )
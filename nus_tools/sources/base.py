@@ -0,0 +1,65 @@
+from urllib.parse import urlsplit
+from typing import Any, Optional
+from reqcli.source import BaseSource, SourceConfig, ReqData
+
+from .cache import ResponseCache, CachedUnloadableType, TCacheTTLs, get_cache_key, get_ttl
+from .coalesce import SingleFlight, get_request_key
+from .limits import RequestLimiter
+
+
+class NUSBaseSource(BaseSource):
+    '''
+    Common base class of all sources.
+
+    Identical concurrent requests (same endpoint, parameters and result type) are coalesced if `coalesce_requests` is set,
+    only one request is sent and all callers receive the same object.
+
+    Requests go through `limiter` if set; it can be set on an instance, or on this class to apply to all sources.
+
+    Responses are stored in `cache` if set (same as `limiter`), using the TTL of the first pattern in `cache_ttls`
+    matching the request path; requests not matching any pattern (or using `skip_cache`) aren't cached
+    '''
+
+    limiter = None  # type: Optional[RequestLimiter]
+    coalesce_requests = True
+    cache = None  # type: Optional[ResponseCache]
+    cache_ttls = ()  # type: TCacheTTLs
+
+    def __init__(self, base_data: ReqData, config: Optional[SourceConfig] = None, **kwargs: Any):
+        super().__init__(base_data, config, **kwargs)
+        self._host = urlsplit(base_data.path).hostname or ''
+        self._single_flight = SingleFlight()
+        self.__base_data = base_data
+
+    def _create_type(self, data: ReqData, loadable: Any = None, **kwargs: Any) -> Any:
+        key = get_request_key(data, loadable, kwargs) if self.coalesce_requests else None
+        if key is None:
+            return self.__create_type_cached(data, loadable, **kwargs)
+        return self._single_flight.do(key, lambda: self.__create_type_cached(data, loadable, **kwargs))
+
+    def __create_type_cached(self, data: ReqData, loadable: Any, **kwargs: Any) -> Any:
+        cache = self.cache
+        ttl = get_ttl(self.cache_ttls, data.path) if cache is not None and not kwargs.get('skip_cache') else None
+        if ttl is None:
+            return self.__create_type_limited(data, loadable, **kwargs)
+        assert cache is not None
+
+        cache_key = get_cache_key(self.__base_data.path + data.path, {**(self.__base_data.params or {}), **(data.params or {})})
+        raw = cache.get(cache_key)
+        if raw is None:
+            unloadable = self.__create_type_limited(data, loadable, **{**kwargs, 'force_unloadable': True})
+            with unloadable.get_reader() as reader:
+                raw = reader.read()
+            cache.put(cache_key, raw, ttl)
+
+        if loadable is None or kwargs.get('force_unloadable'):
+            return CachedUnloadableType(raw)
+        return loadable.load_bytes(raw, self._config.type_load_config)
+
+    def __create_type_limited(self, data: ReqData, loadable: Any, **kwargs: Any) -> Any:
+        limiter = self.limiter
+        if limiter is None:
+            return super()._create_type(data, loadable, **kwargs)
+        # note: for unloadable types, this only covers the request itself, not reading the body
+        with limiter.limit(self._host):
+            return super()._create_type(data, loadable, **kwargs)
@@ -0,0 +1,280 @@
+import io
+import os
+import re
+import asyncio
+import math
+import time
+import zlib
+import struct
+import hashlib
+import logging
+import threading
+import contextlib
+import collections
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import urlencode
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Sequence, Tuple
+
+
+_logger = logging.getLogger(__name__)
+
+# TTL for responses that never change (e.g. versioned TMDs)
+IMMUTABLE = math.inf
+
+# sequence of (path regex, ttl); `None` disables caching for matching paths
+TCacheTTLs = Sequence[Tuple[str, Optional[float]]]
+
+# expiration timestamp, compressed flag
+_disk_header = struct.Struct('>d?')
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    expired: int = 0
+
+
+class ResponseCache:
+    '''
+    Two-tiered cache for raw responses: in-memory LRU, backed by an (optional) on-disk store.
+
+    Entries expire after the TTL given when storing them; both tiers evict least recently used entries
+    once their size limit is exceeded. Data on disk is zlib-compressed if that reduces its size
+    (encrypted data, for instance, is stored as-is)
+    '''
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        *,
+        memory_size: int = 64 * 1024 * 1024,
+        disk_size: int = 1024 * 1024 * 1024,
+        compression_level: int = 6
+    ):
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+        self.compression_level = compression_level
+        self.stats = CacheStats()
+
+        self._lock = threading.RLock()
+        self._memory = collections.OrderedDict()  # type: collections.OrderedDict[str, Tuple[float, bytes]]
+        self._memory_total = 0
+
+        self._directory = Path(directory) if directory is not None else None
+        self._disk = collections.OrderedDict()  # type: collections.OrderedDict[str, int]
+        self._disk_total = 0
+        if self._directory is not None:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            self.__load_disk_index()
+
+    def get(self, key: str) -> Optional[bytes]:
+        found, data = self.__get_memory(key)
+        if found:
+            return data
+        return self.__get_disk(key)
+
+    async def get_async(self, key: str) -> Optional[bytes]:
+        '''
+        Same as `get`, but runs disk reads/decompression in the default executor instead of blocking the event loop
+        '''
+
+        found, data = self.__get_memory(key)
+        if found:
+            return data
+        if self._directory is None:
+            # nothing to read, only updates stats
+            return self.__get_disk(key)
+        return await asyncio.get_running_loop().run_in_executor(None, self.__get_disk, key)
+
+    def put(self, key: str, data: bytes, ttl: float) -> None:
+        expires = time.time() + ttl
+        with self._lock:
+            self.__put_memory(key, expires, data)
+        self.__put_disk(key, expires, data)
+
+    async def put_async(self, key: str, data: bytes, ttl: float) -> None:
+        '''
+        Same as `put`, but runs compression/disk writes in the default executor instead of blocking the event loop
+        '''
+
+        expires = time.time() + ttl
+        with self._lock:
+            self.__put_memory(key, expires, data)
+        if self._directory is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.__put_disk, key, expires, data)
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            self.__remove_memory(key)
+            self.__remove_disk(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._memory):
+                self.__remove_memory(key)
+            for name in list(self._disk):
+                self.__remove_disk_file(name)
+
+    # memory
+
+    def __get_memory(self, key: str) -> Tuple[bool, Optional[bytes]]:
+        # returns (found, data); expired entries are found, but without data
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return False, None
+            if entry[0] > now:
+                self._memory.move_to_end(key)
+                self.stats.memory_hits += 1
+                return True, entry[1]
+            # both tiers share the expiration time
+            self.stats.expired += 1
+            self.stats.misses += 1
+            self.remove(key)
+            return True, None
+
+    def __put_memory(self, key: str, expires: float, data: bytes) -> None:
+        self.__remove_memory(key)
+        # don't let single large entries flush the entire cache
+        if len(data) > self.memory_size // 4:
+            return
+        self._memory[key] = (expires, data)
+        self._memory_total += len(data)
+        while self._memory_total > self.memory_size:
+            self.__remove_memory(next(iter(self._memory)))
+
+    def __remove_memory(self, key: str) -> None:
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_total -= len(entry[1])
+
+    # disk
+
+    @staticmethod
+    def __get_name(key: str) -> str:
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def __load_disk_index(self) -> None:
+        assert self._directory is not None
+        files = []
+        for path in self._directory.glob('*.cache'):
+            st = path.stat()
+            files.append((st.st_mtime, path.stem, st.st_size))
+        # least recently used first
+        for _, name, size in sorted(files):
+            self._disk[name] = size
+            self._disk_total += size
+        self.__evict_disk()
+
+    def __get_disk(self, key: str) -> Optional[bytes]:
+        # file I/O happens without holding the lock, which may be acquired by the event loop thread
+        name = self.__get_name(key)
+        with self._lock:
+            if self._directory is None or name not in self._disk:
+                self.stats.misses += 1
+                return None
+        path = self._directory / f'{name}.cache'
+
+        try:
+            with path.open('rb') as f:
+                expires, compressed = _disk_header.unpack(f.read(_disk_header.size))
+                data = f.read() if expires > time.time() else None
+            if data is not None:
+                if compressed:
+                    data = zlib.decompress(data)
+                os.utime(path)  # keep LRU order across runs
+        except FileNotFoundError:
+            # removed concurrently
+            data = expires = None
+        except (OSError, struct.error, zlib.error) as e:
+            _logger.warning(f'failed to read cache entry {name}: {e}')
+            with self._lock:
+                self.stats.misses += 1
+                self.__remove_disk_file(name)
+            return None
+
+        with self._lock:
+            if data is None:
+                if expires is not None:
+                    self.stats.expired += 1
+                    self.__remove_disk_file(name)
+                self.stats.misses += 1
+                return None
+            if name in self._disk:
+                self._disk.move_to_end(name)
+            self.stats.disk_hits += 1
+            # promote to memory
+            self.__put_memory(key, expires, data)
+        return data
+
+    def __put_disk(self, key: str, expires: float, data: bytes) -> None:
+        if self._directory is None:
+            return
+        name = self.__get_name(key)
+        compressed = zlib.compress(data, self.compression_level)
+        is_compressed = len(compressed) < len(data)
+
+        path = self._directory / f'{name}.cache'
+        # unique per thread, in case the same key is written concurrently
+        tmp_path = path.with_name(f'{path.name}.{threading.get_ident()}.tmp')
+        with tmp_path.open('wb') as f:
+            f.write(_disk_header.pack(expires, is_compressed))
+            f.write(compressed if is_compressed else data)
+        os.replace(tmp_path, path)
+        size = path.stat().st_size
+
+        with self._lock:
+            self.__remove_disk_index(name)
+            self._disk[name] = size
+            self._disk_total += size
+            self.__evict_disk()
+
+    def __evict_disk(self) -> None:
+        while self._disk_total > self.disk_size and self._disk:
+            self.__remove_disk_file(next(iter(self._disk)))
+
+    def __remove_disk(self, key: str) -> None:
+        if self._directory is not None:
+            name = self.__get_name(key)
+            if name in self._disk:
+                self.__remove_disk_file(name)
+
+    def __remove_disk_file(self, name: str) -> None:
+        assert self._directory is not None
+        self.__remove_disk_index(name)
+        with contextlib.suppress(FileNotFoundError):
+            (self._directory / f'{name}.cache').unlink()
+
+    def __remove_disk_index(self, name: str) -> None:
+        size = self._disk.pop(name, None)
+        if size is not None:
+            self._disk_total -= size
+
+
+class CachedUnloadableType:
+    '''
+    Stand-in for `reqcli.source.UnloadableType` for responses served from a `ResponseCache`
+    '''
+
+    def __init__(self, data: bytes):
+        self._data = data
+
+    @contextlib.contextmanager
+    def get_reader(self) -> Iterator[BinaryIO]:
+        yield io.BytesIO(self._data)
+
+
+def get_ttl(ttls: TCacheTTLs, path: str) -> Optional[float]:
+    # first match wins; compiled patterns are cached by `re`
+    for pattern, ttl in ttls:
+        if re.fullmatch(pattern, path):
+            return ttl
+    return None
+
+
+def get_cache_key(url: str, params: Dict[str, Any]) -> str:
+    return url + '?' + urlencode(sorted((k, str(v)) for k, v in params.items()))
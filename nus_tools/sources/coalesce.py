@@ -0,0 +1,101 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+from reqcli.source import ReqData
+
+
+_T = TypeVar('_T')
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None  # type: Any
+        self.exception = None  # type: Optional[BaseException]
+
+
+class SingleFlight:
+    '''
+    De-duplicates concurrent calls (from multiple threads) with the same key;
+    only the first call is executed, all others wait for it and receive the same result (or exception)
+    '''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # type: Dict[Hashable, _Call]
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, func: Callable[[], _T]) -> _T:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+                self.executed += 1
+            else:
+                leader = False
+                self.shared += 1
+
+        if not leader:
+            call.event.wait()
+            if call.exception is not None:
+                raise call.exception
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.exception = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    '''
+    Same as `SingleFlight`, for coroutines running in the same event loop.
+
+    The call runs in a separate task, i.e. cancelling one of the callers does not affect the others
+    '''
+
+    def __init__(self):
+        self._tasks = {}  # type: Dict[Hashable, asyncio.Future]
+        self.executed = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[_T]]) -> _T:
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(func())
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+            self.executed += 1
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+
+def get_request_key(data: ReqData, loadable: Any, kwargs: Dict[str, Any]) -> Optional[Hashable]:
+    '''
+    Returns a key identifying a request and its result type, or `None` if the request can't be coalesced
+    '''
+
+    # raw responses are streamed, they can't be shared
+    if loadable is None or kwargs.get('force_unloadable'):
+        return None
+    try:
+        key = (
+            type(loadable),
+            data.path,
+            frozenset((data.params or {}).items()),
+            frozenset((data.headers or {}).items()),
+            data.cert if not isinstance(data.cert, list) else tuple(data.cert),
+            frozenset(kwargs.items())
+        )
+        hash(key)
+    except TypeError:  # unhashable values
+        return None
+    return key
@@ -1,11 +1,25 @@
 from typing import Any, Optional
-from reqcli.source import UnloadableType, BaseSource, SourceConfig, ReqData, CertType
+from reqcli.source import UnloadableType, SourceConfig, ReqData, CertType
 
 from .. import ids
 from ..types.contentcdn import Ticket, TMD
+from .base import NUSBaseSource
+from .cache import IMMUTABLE
 
+# (path pattern, ttl) for `NUSBaseSource.cache`;
+#  apps may be several GB in size and are never cached, the latest TMD may change with title updates
+_CACHE_TTLS = (
+    (r'[0-9A-F]{16}/tmd\.\d+', IMMUTABLE),
+    (r'[0-9A-F]{16}/FFFE[0-9A-F]{4}', IMMUTABLE),
+    (r'[0-9A-F]{16}/[0-9A-F]{8}\.h3', IMMUTABLE),
+    (r'[0-9A-F]{16}/tmd', 10 * 60.0),
+    (r'[0-9A-F]{16}/cetk', 24 * 60 * 60.0)
+)
+
+
+class _ContentServerBase(NUSBaseSource):
+    cache_ttls = _CACHE_TTLS
 
-class _ContentServerBase(BaseSource):
     # /<title id>/cetk
     def get_cetk(self, title_id: ids.TTitleIDInput, **kwargs: Any) -> Ticket:
         return self._create_type(
@@ -40,6 +54,17 @@ class _ContentServerBase(BaseSource):
             **kwargs
         )
 
+    # /<title id>/<content id>, bytes [start, end) or [start, <end of file>)
+    def get_app_range(self, title_id: ids.TTitleIDInput, content_id: int, start: int, end: Optional[int] = None, *, skip_cache: bool = True, **kwargs: Any) -> UnloadableType:
+        return self._create_type(
+            ReqData(
+                path=f'{ids.TitleID.get_str(title_id)}/{content_id:08X}',
+                headers={'Range': f'bytes={start}-' + (f'{end - 1}' if end is not None else '')}
+            ),
+            skip_cache=skip_cache,
+            **kwargs
+        )
+
     # /<title id>/<content id>.h3
     def get_h3(self, title_id: ids.TTitleIDInput, content_id: int, **kwargs: Any) -> UnloadableType:
         return self._create_type(
@@ -65,10 +90,17 @@ class _ContentServerBase(BaseSource):
 #   - nus.wup.shop.nintendo.net (unavailable)
 #   - ccs.wup.shop.nintendo.net (WiiU: 'UncachedContentPrefixURL'/'SystemUncachedContentPrefixURL')
 
+_WIIU_CDN_PATH = 'http://ccs.cdn.wup.shop.nintendo.net/ccs/download/'
+_WIIU_NOCDN_PATH = 'http://ccs.wup.shop.nintendo.net/ccs/download/'
+_3DS_CDN_PATH = 'http://ccs.cdn.c.shop.nintendowifi.net/ccs/download/'
+_3DS_NOCDN_PATH = 'https://ccs.c.shop.nintendowifi.net/ccs/download/'
+_3DS_NOCDN_FINGERPRINT = 'E9:74:4D:71:E3:06:6A:84:80:1D:0B:52:5E:26:8E:80:70:41:F4:20'
+
+
 class ContentServerWiiUCDN(_ContentServerBase):
     def __init__(self, config: Optional[SourceConfig] = None):
         super().__init__(
-            ReqData(path='http://ccs.cdn.wup.shop.nintendo.net/ccs/download/'),
+            ReqData(path=_WIIU_CDN_PATH),
             config
         )
 
@@ -76,7 +108,7 @@ class ContentServerWiiUCDN(_ContentServerBase):
 class ContentServerWiiUNoCDN(_ContentServerBase):
     def __init__(self, config: Optional[SourceConfig] = None):
         super().__init__(
-            ReqData(path='http://ccs.wup.shop.nintendo.net/ccs/download/'),
+            ReqData(path=_WIIU_NOCDN_PATH),
             config
         )
 
@@ -84,7 +116,7 @@ class ContentServerWiiUNoCDN(_ContentServerBase):
 class ContentServer3DSCDN(_ContentServerBase):
     def __init__(self, config: Optional[SourceConfig] = None):
         super().__init__(
-            ReqData(path='http://ccs.cdn.c.shop.nintendowifi.net/ccs/download/'),
+            ReqData(path=_3DS_CDN_PATH),
             config
         )
 
@@ -92,8 +124,8 @@ class ContentServer3DSCDN(_ContentServerBase):
 class ContentServer3DSNoCDN(_ContentServerBase):
     def __init__(self, cert: CertType, config: Optional[SourceConfig] = None):
         super().__init__(
-            ReqData(path='https://ccs.c.shop.nintendowifi.net/ccs/download/', cert=cert),
+            ReqData(path=_3DS_NOCDN_PATH, cert=cert),
             config,
             verify_tls=False,
-            require_fingerprint='E9:74:4D:71:E3:06:6A:84:80:1D:0B:52:5E:26:8E:80:70:41:F4:20'
+            require_fingerprint=_3DS_NOCDN_FINGERPRINT
         )
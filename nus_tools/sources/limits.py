@@ -0,0 +1,316 @@
+import ssl
+import time
+import asyncio
+import logging
+import threading
+import contextlib
+import collections
+import requests
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, Dict, Iterator, Optional, Tuple, Type, Union
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None  # type: ignore
+
+
+_logger = logging.getLogger(__name__)
+
+# status codes indicating that the server is overloaded/throttling
+_OVERLOAD_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    '''
+    Thread-safe token bucket, allowing `rate` acquisitions per second on average with bursts of up to `burst`
+    '''
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float) -> float:
+        # takes tokens (possibly going into debt), returns the time until they are available;
+        #  callers are served in order of their reservations
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1.0) -> None:
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class AIMDController:
+    '''
+    Adaptive concurrency limit, using additive increase/multiplicative decrease.
+
+    The limit grows by `increase` per `limit` successful requests, and is multiplied by `decrease`
+    on errors indicating overload (or if the latency exceeds `latency_target`), at most once per `decrease_interval`.
+    Can be used from threads and event loops at the same time
+    '''
+
+    def __init__(
+        self,
+        initial: int = 8,
+        *,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_target: Optional[float] = None,
+        decrease_interval: float = 1.0
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.decrease_interval = decrease_interval
+
+        self._limit = float(initial)
+        self._inflight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._async_waiters = collections.deque()  # type: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    # slots
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._inflight >= self.limit:
+                self._cond.wait()
+            self._inflight += 1
+
+    async def acquire_async(self) -> None:
+        with self._cond:
+            if self._inflight < self.limit:
+                self._inflight += 1
+                return
+            loop = asyncio.get_running_loop()
+            fut = loop.create_future()
+            self._async_waiters.append((loop, fut))
+
+        try:
+            # slot is transferred by `__wake`
+            await fut
+        except asyncio.CancelledError:
+            with self._cond:
+                if (loop, fut) in self._async_waiters:
+                    self._async_waiters.remove((loop, fut))
+                elif fut.done() and not fut.cancelled():
+                    # slot was already transferred
+                    self.__release()
+            raise
+
+    def release(self) -> None:
+        with self._cond:
+            self.__release()
+
+    def __release(self) -> None:
+        self._inflight -= 1
+        self.__wake()
+
+    def __wake(self) -> None:
+        # lock must be held
+        while self._async_waiters and self._inflight < self.limit:
+            loop, fut = self._async_waiters.popleft()
+            self._inflight += 1
+            loop.call_soon_threadsafe(self.__resolve, fut)
+        if self._inflight < self.limit:
+            self._cond.notify_all()
+
+    def __resolve(self, fut: asyncio.Future) -> None:
+        if fut.cancelled():
+            self.release()
+        else:
+            fut.set_result(None)
+
+    # feedback
+
+    def on_success(self, latency: float) -> None:
+        if self.latency_target is not None and latency > self.latency_target:
+            self.on_overload()
+            return
+        with self._cond:
+            self._limit = min(float(self.max_limit), self._limit + self.increase / self._limit)
+            self.__wake()
+
+    def on_overload(self) -> None:
+        with self._cond:
+            now = time.monotonic()
+            # requests that were already in flight will likely fail as well, only decrease once
+            if now - self._last_decrease < self.decrease_interval:
+                return
+            self._last_decrease = now
+            self._limit = max(float(self.min_limit), self._limit * self.decrease)
+        _logger.debug(f'decreased concurrency limit to {self.limit}')
+
+
+# connection errors/timeouts indicating that the server is overloaded;
+#  note that e.g. `requests.RequestException` is an `IOError`, so this can't just check for `OSError`
+_OVERLOAD_ERRORS = (requests.ConnectionError, requests.Timeout, asyncio.TimeoutError)  # type: Tuple[Type[BaseException], ...]
+# TLS errors (including certificate/fingerprint mismatches) are subclasses of connection errors, but unrelated to load
+_TLS_ERRORS = (ssl.SSLError, ssl.CertificateError, requests.exceptions.SSLError)  # type: Tuple[Type[BaseException], ...]
+if aiohttp is not None:
+    _OVERLOAD_ERRORS += (aiohttp.ClientConnectionError,)
+    _TLS_ERRORS += (aiohttp.ClientSSLError, aiohttp.ServerFingerprintMismatch)
+
+
+def is_overload_error(e: BaseException) -> bool:
+    # works for both `requests` and `aiohttp` exceptions
+    response = getattr(e, 'response', None)
+    status = getattr(response, 'status_code', None) if response is not None else getattr(e, 'status', None)
+    if status is not None:
+        return status in _OVERLOAD_STATUS
+    return isinstance(e, _OVERLOAD_ERRORS) and not isinstance(e, _TLS_ERRORS)
+
+
+@dataclass
+class _HostState:
+    bucket: Optional[TokenBucket]
+    controller: Optional[AIMDController]
+
+
+class RequestLimiter:
+    '''
+    Per-host request rate limiting and adaptive concurrency control, shared between any number of sources.
+
+    `rate`/`burst` apply to hosts not listed in `host_rates` (which maps hosts to a rate or a (rate, burst) tuple),
+    `None` disables rate limiting. If `adaptive` is set, each host gets its own `AIMDController`
+    created using `controller_kwargs`
+    '''
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        *,
+        host_rates: Dict[str, Union[float, Tuple[float, Optional[float]]]] = {},
+        adaptive: bool = True,
+        **controller_kwargs: float
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.host_rates = dict(host_rates)
+        self.adaptive = adaptive
+        self.controller_kwargs = controller_kwargs
+
+        self._hosts = {}  # type: Dict[str, _HostState]
+        self._lock = threading.Lock()
+
+    def get_host(self, host: str) -> _HostState:
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                rate = self.host_rates.get(host, (self.rate, self.burst))
+                if not isinstance(rate, tuple):
+                    rate = (rate, None)
+                state = self._hosts[host] = _HostState(
+                    TokenBucket(*rate) if rate[0] is not None else None,
+                    AIMDController(**self.controller_kwargs) if self.adaptive else None  # type: ignore
+                )
+            return state
+
+    def get_limits(self) -> Dict[str, int]:
+        # current concurrency limit per host
+        with self._lock:
+            return {host: state.controller.limit for host, state in self._hosts.items() if state.controller is not None}
+
+    @contextlib.contextmanager
+    def limit(self, host: str) -> Iterator['LatencySample']:
+        '''
+        Holds a concurrency slot (if adaptive) and a rate limit token of `host` for the duration of the request.
+
+        The latency sample covers the entire context, unless `LatencySample.done` is called before exiting,
+        e.g. once the response headers were received
+        '''
+
+        state = self.get_host(host)
+        if state.controller is None:
+            if state.bucket is not None:
+                state.bucket.acquire()
+            yield LatencySample()
+            return
+
+        # wait for a slot first, tokens are only taken when the request can actually be sent
+        state.controller.acquire()
+        try:
+            if state.bucket is not None:
+                state.bucket.acquire()
+            with self.__measure(state.controller) as sample:
+                yield sample
+        finally:
+            state.controller.release()
+
+    @contextlib.asynccontextmanager
+    async def limit_async(self, host: str) -> AsyncIterator['LatencySample']:
+        '''
+        Async version of `limit`
+        '''
+
+        state = self.get_host(host)
+        if state.controller is None:
+            if state.bucket is not None:
+                await state.bucket.acquire_async()
+            yield LatencySample()
+            return
+
+        await state.controller.acquire_async()
+        try:
+            if state.bucket is not None:
+                await state.bucket.acquire_async()
+            with self.__measure(state.controller) as sample:
+                yield sample
+        finally:
+            state.controller.release()
+
+    @staticmethod
+    @contextlib.contextmanager
+    def __measure(controller: AIMDController) -> Iterator['LatencySample']:
+        sample = LatencySample()
+        try:
+            yield sample
+        except Exception as e:
+            if is_overload_error(e):
+                controller.on_overload()
+            else:
+                # e.g. 404, still a valid latency sample
+                controller.on_success(sample.done())
+            raise
+        controller.on_success(sample.done())
+
+
+class LatencySample:
+    def __init__(self):
+        self._start = time.monotonic()
+        self._latency = None  # type: Optional[float]
+
+    def done(self) -> float:
+        # only the first call counts
+        if self._latency is None:
+            self._latency = time.monotonic() - self._start
+        return self._latency
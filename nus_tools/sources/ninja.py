@@ -1,21 +1,34 @@
 from typing import Any, Optional, Union, cast
-from reqcli.source import BaseSource, SourceConfig, CertType, ReqData
+from reqcli.source import SourceConfig, CertType, ReqData
 
 from .. import ids
 from ..region import Region
 from ..types.ninja import NinjaEcInfo, NinjaIDPair
+from .base import NUSBaseSource
 
 
-class Ninja(BaseSource):
+_PATH = 'https://ninja.wup.shop.nintendo.net/ninja/ws/'
+_FINGERPRINT = 'C6:6E:7D:66:D0:73:62:2F:A3:28:7F:A6:2F:F5:73:5C:71:EE:EB:3D:93:AC:B3:14:7A:8F:85:B4:07:D4:CE:ED'
+
+# (path pattern, ttl) for `NUSBaseSource.cache`
+_CACHE_TTLS = (
+    (r'.+/ec_info', 24 * 60 * 60.0),
+    (r'titles/id_pair', 24 * 60 * 60.0)
+)
+
+
+class Ninja(NUSBaseSource):
+    cache_ttls = _CACHE_TTLS
+
     def __init__(self, region: Union[str, Region], cert: CertType, config: Optional[SourceConfig] = None):
         super().__init__(
             ReqData(
-                path='https://ninja.wup.shop.nintendo.net/ninja/ws/',
+                path=_PATH,
                 cert=cert
             ),
             config,
             verify_tls=False,
-            require_fingerprint='C6:6E:7D:66:D0:73:62:2F:A3:28:7F:A6:2F:F5:73:5C:71:EE:EB:3D:93:AC:B3:14:7A:8F:85:B4:07:D4:CE:ED'
+            require_fingerprint=_FINGERPRINT
         )
 
         self.region = region.country_code if isinstance(region, Region) else region
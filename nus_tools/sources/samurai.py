@@ -1,6 +1,8 @@
-from typing import Any, Iterator, Optional, Type, TypeVar, Union, List, Tuple
+import contextlib
+import lxml.objectify
+from typing import Any, Callable, ContextManager, Iterator, Optional, Type, TypeVar, Union, List, Tuple
 from typing_extensions import Protocol
-from reqcli.source import BaseSource, SourceConfig, ReqData
+from reqcli.source import SourceConfig, ReqData, UnloadableType
 from reqcli.utils.typing import RequestDict
 
 from .. import ids
@@ -12,9 +14,28 @@ from ..types.samurai import \
     SamuraiDlcWiiU, SamuraiDlcsWiiU, SamuraiTitleDlcsWiiU, SamuraiTitleDlcs3DS, SamuraiDlcSizes, SamuraiDlcPrices, \
     SamuraiDemo, \
     SamuraiNews, SamuraiTelops
-from ..types.samurai.common import SamuraiListBaseType
+from ..types.samurai.common import SamuraiListBaseType, SamuraiListStream
+from ..types.samurai.movie_list import SamuraiListMovie
 from ..types.samurai.title_list import SamuraiListTitle
 from ..types.samurai.title import SamuraiTitleElement
+from .base import NUSBaseSource
+
+
+# host, fingerprint
+_HOSTS = {
+    True: ('samurai-wup.cdn.nintendo.net', '43:8D:A9:4A:60:CB:00:DF:F2:B3:EB:17:A7:A2:1C:98:BD:11:FC:4A:A6:49:62:C1:2C:EF:41:BB:1F:28:88:95'),
+    False: ('samurai.wup.shop.nintendo.net', 'C6:6E:7D:66:D0:73:62:2F:A3:28:7F:A6:2F:F5:73:5C:71:EE:EB:3D:93:AC:B3:14:7A:8F:85:B4:07:D4:CE:ED')
+}
+
+# (path pattern, ttl) for `NUSBaseSource.cache`
+# only endpoints returning loadable types; streamed lists bypass the cache
+_CACHE_TTLS = (
+    (r'(title|movie|demo)/\d{14}', 6 * 60 * 60.0),
+    (r'title/\d{14}/aocs', 6 * 60 * 60.0),
+    (r'aocs(/size|/prices)?', 6 * 60 * 60.0),
+    (r'news|telops', 6 * 60 * 60.0),
+    (r'contents|titles|movies', 6 * 60 * 60.0)
+)
 
 
 _TList = TypeVar('_TList', bound=SamuraiListBaseType, covariant=True)
@@ -25,7 +46,17 @@ class ListFunc(Protocol[_TList]):
         ...
 
 
-class Samurai(BaseSource):
+_TItem = TypeVar('_TItem')
+
+
+class ListStreamFunc(Protocol[_TItem]):
+    def __call__(self, offset: int, limit: int = 200, other_params: RequestDict = {}, **kwargs: Any) -> ContextManager[SamuraiListStream[_TItem]]:
+        ...
+
+
+class Samurai(NUSBaseSource):
+    cache_ttls = _CACHE_TTLS
+
     def __init__(self, region: Union[str, Region], shop_id: int, *, lang: Optional[str] = None, cdn: Optional[bool] = False, config: Optional[SourceConfig] = None):
         params: RequestDict = {'shop_id': shop_id}
         if lang:
@@ -33,12 +64,7 @@ class Samurai(BaseSource):
 
         region = region.country_code if isinstance(region, Region) else region
 
-        if cdn:
-            host = 'samurai-wup.cdn.nintendo.net'
-            fingerprint = '43:8D:A9:4A:60:CB:00:DF:F2:B3:EB:17:A7:A2:1C:98:BD:11:FC:4A:A6:49:62:C1:2C:EF:41:BB:1F:28:88:95'
-        else:
-            host = 'samurai.wup.shop.nintendo.net'
-            fingerprint = 'C6:6E:7D:66:D0:73:62:2F:A3:28:7F:A6:2F:F5:73:5C:71:EE:EB:3D:93:AC:B3:14:7A:8F:85:B4:07:D4:CE:ED'
+        host, fingerprint = _HOSTS[bool(cdn)]
         super().__init__(
             ReqData(
                 path=f'https://{host}/samurai/ws/{region}/',
@@ -65,6 +91,12 @@ class Samurai(BaseSource):
     def get_all_content_lists(self, max_page_size: int = 200, other_params: RequestDict = {}, **kwargs: Any) -> Iterator[SamuraiContentsList]:
         return self._get_all_lists(self.get_content_list, max_page_size, other_params, **kwargs)
 
+    def stream_content_list(self, offset: int, limit: int = 200, other_params: RequestDict = {}, **kwargs: Any) -> ContextManager[SamuraiListStream[Union[SamuraiListTitle, SamuraiListMovie]]]:
+        return self._stream_list(SamuraiContentsList._parse_content, 'contents', offset, limit, other_params, **kwargs)
+
+    def iter_all_contents(self, max_page_size: int = 200, other_params: RequestDict = {}, **kwargs: Any) -> Iterator[Union[SamuraiListTitle, SamuraiListMovie]]:
+        return self._iter_all_list_items(self.stream_content_list, max_page_size, other_params, **kwargs)
+
     # /title/<id>
     def get_title(self, content_id: ids.TContentIDInput, **kwargs: Any) -> SamuraiTitle:
         return self._create_type(
@@ -83,6 +115,12 @@ class Samurai(BaseSource):
     def get_all_title_lists(self, max_page_size: int = 200, other_params: RequestDict = {}, **kwargs: Any) -> Iterator[SamuraiTitlesList]:
         return self._get_all_lists(self.get_title_list, max_page_size, other_params, **kwargs)
 
+    def stream_title_list(self, offset: int, limit: int = 200, other_params: RequestDict = {}, **kwargs: Any) -> ContextManager[SamuraiListStream[SamuraiListTitle]]:
+        return self._stream_list(SamuraiTitlesList._parse_content, 'titles', offset, limit, other_params, **kwargs)
+
+    def iter_all_titles(self, max_page_size: int = 200, other_params: RequestDict = {}, **kwargs: Any) -> Iterator[SamuraiListTitle]:
+        return self._iter_all_list_items(self.stream_title_list, max_page_size, other_params, **kwargs)
+
     # movies
     def get_movie(self, content_id: ids.TContentIDInput, **kwargs: Any) -> SamuraiMovie:
         return self._create_type(
@@ -100,14 +138,16 @@ class Samurai(BaseSource):
     def get_all_movie_lists(self, max_page_size: int = 200, other_params: RequestDict = {}, **kwargs: Any) -> Iterator[SamuraiMoviesList]:
         return self._get_all_lists(self.get_movie_list, max_page_size, other_params, **kwargs)
 
+    def stream_movie_list(self, offset: int, limit: int = 200, other_params: RequestDict = {}, **kwargs: Any) -> ContextManager[SamuraiListStream[SamuraiListMovie]]:
+        return self._stream_list(SamuraiMoviesList._parse_content, 'movies', offset, limit, other_params, **kwargs)
+
+    def iter_all_movies(self, max_page_size: int = 200, other_params: RequestDict = {}, **kwargs: Any) -> Iterator[SamuraiListMovie]:
+        return self._iter_all_list_items(self.stream_movie_list, max_page_size, other_params, **kwargs)
+
     # /aocs
     # WiiU only since 3DS DLCs don't have their own content IDs
     def get_dlcs_wiiu(self, *dlc_ids: ids.TContentIDInput, **kwargs: Any) -> SamuraiDlcsWiiU:
-        for dlc_id in dlc_ids:
-            dlc_id = ids.ContentID.get_inst(dlc_id)
-            if dlc_id.type.platform != ids.ContentPlatform.WIIU:
-                raise ValueError(f'content ID {dlc_id} is not a WiiU title')
-
+        _check_dlc_ids_wiiu(dlc_ids)
         return self._create_type(
             ReqData(
                 path='aocs',
@@ -120,24 +160,8 @@ class Samurai(BaseSource):
     def get_dlcs_for_title(self, title: Union[ids.TContentIDInput, SamuraiListTitle, SamuraiTitleElement], **kwargs: Any) -> Union[SamuraiTitleDlcsWiiU, SamuraiTitleDlcs3DS]:
         # note: this endpoint doesn't seem to be reliable for all titles,
         #        some titles have aoc/iap but this response is empty
-        if isinstance(title, (SamuraiListTitle, SamuraiTitleElement)):
-            content_id = title.content_id
-        else:
-            content_id = ids.ContentID.get_inst(title)
-
-        dlcs_type: Union[SamuraiTitleDlcs3DS, SamuraiTitleDlcsWiiU]
-        if content_id.type.platform == ids.ContentPlatform._3DS:
-            dlcs_type = SamuraiTitleDlcs3DS()
-            params = {}  # 3DS DLC results aren't paginated
-        elif content_id.type.platform == ids.ContentPlatform.WIIU:
-            dlcs_type = SamuraiTitleDlcsWiiU()
-            params = {'limit': 200}  # assuming a maximum of 200 DLCs per title, seems reasonable
-        else:
-            assert False  # unhandled, should never happen
-
         return self._create_type(
-            ReqData(path=f'title/{ids.ContentID.get_str(content_id)}/aocs', params=params),
-            dlcs_type,
+            *_get_title_dlcs_request(title),
             **kwargs
         )
 
@@ -145,7 +169,7 @@ class Samurai(BaseSource):
         return self._create_type(
             ReqData(
                 path='aocs/size',
-                params={'aoc[]': ','.join(ids.ContentID.get_str(i) for i in self.__get_dlc_ids(dlcs))}
+                params={'aoc[]': _get_dlc_ids_param(dlcs)}
             ),
             SamuraiDlcSizes(),
             **kwargs
@@ -155,17 +179,12 @@ class Samurai(BaseSource):
         return self._create_type(
             ReqData(
                 path='aocs/prices',
-                params={'aoc[]': ','.join(ids.ContentID.get_str(i) for i in self.__get_dlc_ids(dlcs))}
+                params={'aoc[]': _get_dlc_ids_param(dlcs)}
             ),
             SamuraiDlcPrices(),
             **kwargs
         )
 
-    def __get_dlc_ids(self, dlcs: Tuple[Union[ids.TContentIDInput, SamuraiDlcWiiU], ...]) -> List[ids.TContentIDInput]:
-        if len(dlcs) == 0:
-            raise RuntimeError('no DLC content ID provided')
-        return [d.content_id if isinstance(d, SamuraiDlcWiiU) else d for d in dlcs]
-
     # /demo/<id>
     def get_demo(self, content_id: ids.TContentIDInput, **kwargs: Any) -> SamuraiDemo:
         return self._create_type(
@@ -212,3 +231,59 @@ class Samurai(BaseSource):
         yield first_page
         for offset in range(max_page_size, first_page.total, max_page_size):
             yield get_list_func(offset, max_page_size, other_params, **kwargs)
+
+    # generic streaming list funcs
+    @contextlib.contextmanager
+    def _stream_list(self, parse_content: Callable[[lxml.objectify.ObjectifiedElement], _TItem], path: str, offset: int, limit: int, other_params: RequestDict, *, skip_cache: bool = True, **kwargs: Any) -> Iterator[SamuraiListStream[_TItem]]:
+        # same path as the loadable lists, but the body shouldn't be buffered for caching
+        unloadable: UnloadableType = self._create_type(
+            ReqData(path=path, params={'offset': offset, 'limit': limit, **other_params}),
+            skip_cache=skip_cache,
+            **kwargs
+        )
+        with unloadable.get_reader() as reader:
+            yield SamuraiListStream(reader, parse_content)
+
+    def _iter_all_list_items(self, stream_list_func: ListStreamFunc[_TItem], max_page_size: int, other_params: RequestDict, **kwargs: Any) -> Iterator[_TItem]:
+        offset = 0
+        while True:
+            with stream_list_func(offset, max_page_size, other_params, **kwargs) as stream:
+                yield from stream
+                total = stream.total
+            offset += max_page_size
+            if total is None or offset >= total:
+                break
+
+
+# shared with `aio.AsyncSamurai`
+
+def _check_dlc_ids_wiiu(dlc_ids: Tuple[ids.TContentIDInput, ...]) -> None:
+    for dlc_id in dlc_ids:
+        dlc_id = ids.ContentID.get_inst(dlc_id)
+        if dlc_id.type.platform != ids.ContentPlatform.WIIU:
+            raise ValueError(f'content ID {dlc_id} is not a WiiU title')
+
+
+def _get_title_dlcs_request(title: Union[ids.TContentIDInput, SamuraiListTitle, SamuraiTitleElement]) -> Tuple[ReqData, Union[SamuraiTitleDlcsWiiU, SamuraiTitleDlcs3DS]]:
+    if isinstance(title, (SamuraiListTitle, SamuraiTitleElement)):
+        content_id = title.content_id
+    else:
+        content_id = ids.ContentID.get_inst(title)
+
+    dlcs_type: Union[SamuraiTitleDlcs3DS, SamuraiTitleDlcsWiiU]
+    if content_id.type.platform == ids.ContentPlatform._3DS:
+        dlcs_type = SamuraiTitleDlcs3DS()
+        params = {}  # 3DS DLC results aren't paginated
+    elif content_id.type.platform == ids.ContentPlatform.WIIU:
+        dlcs_type = SamuraiTitleDlcsWiiU()
+        params = {'limit': 200}  # assuming a maximum of 200 DLCs per title, seems reasonable
+    else:
+        assert False  # unhandled, should never happen
+
+    return ReqData(path=f'title/{ids.ContentID.get_str(content_id)}/aocs', params=params), dlcs_type
+
+
+def _get_dlc_ids_param(dlcs: Tuple[Union[ids.TContentIDInput, SamuraiDlcWiiU], ...]) -> str:
+    if len(dlcs) == 0:
+        raise RuntimeError('no DLC content ID provided')
+    return ','.join(ids.ContentID.get_str(d.content_id if isinstance(d, SamuraiDlcWiiU) else d) for d in dlcs)
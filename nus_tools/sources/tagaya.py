@@ -1,10 +1,27 @@
 from typing import Any, Optional
-from reqcli.source import BaseSource, SourceConfig, ReqData
+from reqcli.source import SourceConfig, ReqData
 
 from ..types.tagaya import UpdateListVersion, UpdateList
+from .base import NUSBaseSource
+from .cache import IMMUTABLE
 
 
-class _TagayaBase(BaseSource):
+# region does not matter, lists are identical
+_CDN_PATH = 'https://tagaya-wup.cdn.nintendo.net/tagaya/versionlist/EUR/GB/'
+_CDN_FINGERPRINT = '43:8D:A9:4A:60:CB:00:DF:F2:B3:EB:17:A7:A2:1C:98:BD:11:FC:4A:A6:49:62:C1:2C:EF:41:BB:1F:28:88:95'
+_NOCDN_PATH = 'https://tagaya.wup.shop.nintendo.net/tagaya/versionlist/EUR/GB/'
+_NOCDN_FINGERPRINT = 'C6:6E:7D:66:D0:73:62:2F:A3:28:7F:A6:2F:F5:73:5C:71:EE:EB:3D:93:AC:B3:14:7A:8F:85:B4:07:D4:CE:ED'
+
+# (path pattern, ttl) for `NUSBaseSource.cache`
+_CACHE_TTLS = (
+    (r'latest_version', 60.0),
+    (r'list/\d+\.versionlist', IMMUTABLE)
+)
+
+
+class _TagayaBase(NUSBaseSource):
+    cache_ttls = _CACHE_TTLS
+
     # /latest_version
     def get_latest_updatelist_version(self, *, skip_cache_read: bool = True, **kwargs: Any) -> UpdateListVersion:
         return self._create_type(
@@ -23,27 +40,21 @@ class _TagayaBase(BaseSource):
         )
 
 
-# region does not matter, lists are identical
-
 class TagayaCDN(_TagayaBase):
     def __init__(self, config: Optional[SourceConfig] = None):
         super().__init__(
-            ReqData(
-                path='https://tagaya-wup.cdn.nintendo.net/tagaya/versionlist/EUR/GB/'
-            ),
+            ReqData(path=_CDN_PATH),
             config,
             verify_tls=False,
-            require_fingerprint='43:8D:A9:4A:60:CB:00:DF:F2:B3:EB:17:A7:A2:1C:98:BD:11:FC:4A:A6:49:62:C1:2C:EF:41:BB:1F:28:88:95'
+            require_fingerprint=_CDN_FINGERPRINT
         )
 
 
 class TagayaNoCDN(_TagayaBase):
     def __init__(self, config: Optional[SourceConfig] = None):
         super().__init__(
-            ReqData(
-                path='https://tagaya.wup.shop.nintendo.net/tagaya/versionlist/EUR/GB/'
-            ),
+            ReqData(path=_NOCDN_PATH),
             config,
             verify_tls=False,
-            require_fingerprint='C6:6E:7D:66:D0:73:62:2F:A3:28:7F:A6:2F:F5:73:5C:71:EE:EB:3D:93:AC:B3:14:7A:8F:85:B4:07:D4:CE:ED'
+            require_fingerprint=_NOCDN_FINGERPRINT
         )
@@ -0,0 +1,4 @@
+from .samurai import SamuraiCatalogueSync, SamuraiCatalogueEntry, SamuraiCatalogueDiff
+from .tmd import TMDVersionCrawler, TMDVersionHistory
+from .tagaya import UpdateListTracker, TitleVersionUpdate
+from .idbe import IDBEFetcher, IDBECache, IDBECacheEntry
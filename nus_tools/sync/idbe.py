@@ -0,0 +1,207 @@
+import os
+import pickle
+import logging
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping, NamedTuple, Optional, cast
+from reqcli.source import UnloadableType
+
+from .. import ids
+from ..sources.idbe import IDBEServer
+from ..types.idbe import IDBE, IDBEView
+
+
+_logger = logging.getLogger(__name__)
+
+
+def _download_raw(server: IDBEServer, title_id: ids.TitleID, version: Optional[int], **kwargs: Any) -> Optional[bytes]:
+    try:
+        with cast(UnloadableType, server.get_idbe(title_id, version, force_unloadable=True, **kwargs)).get_reader() as reader:
+            return reader.read()
+    except requests.HTTPError as e:
+        if e.response is not None and e.response.status_code in (403, 404):
+            _logger.debug(f'no IDBE for {title_id}' + (f' (version {version})' if version is not None else ''))
+            return None
+        raise
+
+
+class IDBEFetcher:
+    '''
+    Fetches IDBEs of many titles concurrently.
+
+    Raw (encrypted) files are downloaded using a thread pool and stored in `directory`,
+    each file is decrypted and parsed by the thread that downloaded it.
+    Parsing takes ~1.5ms per IDBE, so it is negligible compared to the download and
+    a process pool only adds overhead (see `benchmarks/idbe_parsing.py`)
+    '''
+
+    def __init__(self, server: IDBEServer, directory: str, *, max_workers: int = 8):
+        self.server = server
+        self.max_workers = max_workers
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+
+    def _get_path(self, title_id: ids.TitleID, version: Optional[int]) -> Path:
+        return self._directory / (f'{title_id}' + (f'-{version}' if version is not None else '') + '.idbe')
+
+    def load_raw(self, title_id: ids.TTitleIDInput, version: Optional[int] = None) -> Optional[bytes]:
+        path = self._get_path(ids.TitleID.get_inst(title_id), version)
+        return path.read_bytes() if path.exists() else None
+
+    def fetch_raw(self, title_id: ids.TTitleIDInput, version: Optional[int] = None, **kwargs: Any) -> Optional[bytes]:
+        '''
+        Downloads and stores the raw IDBE file, returns `None` if it does not exist
+        '''
+
+        title_id = ids.TitleID.get_inst(title_id)
+        raw = _download_raw(self.server, title_id, version, **kwargs)
+        if raw is not None:
+            self._get_path(title_id, version).write_bytes(raw)
+        return raw
+
+    def fetch_many(self, title_ids: Iterable[ids.TTitleIDInput], version: Optional[int] = None, *, refresh: bool = False, **kwargs: Any) -> Dict[ids.TitleID, Optional[IDBE]]:
+        '''
+        Fetches (or loads from disk, unless `refresh` is set) and parses the IDBEs of all given titles.
+
+        Titles without an IDBE map to `None`
+        '''
+
+        title_id_list = [ids.TitleID.get_inst(t) for t in title_ids]
+        config = self.server._config.type_load_config
+
+        def fetch(title_id: ids.TitleID) -> Optional[IDBE]:
+            raw = None if refresh else self.load_raw(title_id, version)
+            if raw is None:
+                raw = self.fetch_raw(title_id, version, **kwargs)
+            return IDBE(title_id).load_bytes(raw, config) if raw is not None else None
+
+        with ThreadPoolExecutor(self.max_workers) as executor:
+            results = dict(zip(title_id_list, executor.map(fetch, title_id_list)))
+
+        _logger.info(f'fetched {sum(r is not None for r in results.values())} of {len(results)} IDBEs')
+        return results
+
+
+class IDBECacheEntry(NamedTuple):
+    version: int
+    # SHA256 embedded in the IDBE file
+    checksum: bytes
+
+
+class IDBECache:
+    '''
+    Persistent IDBE cache, keyed by title ID.
+
+    Stores the version and embedded checksum of each title's IDBE in an index,
+    along with the raw and parsed data. IDBEs are only downloaded if a newer version is requested
+    (e.g. based on update list/TMD versions), and only parsed if the checksum changed
+    '''
+
+    _INDEX_VERSION = 1
+
+    def __init__(self, server: IDBEServer, directory: str, *, max_workers: int = 8):
+        self.server = server
+        self.max_workers = max_workers
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._index_path = self._directory / 'index.pickle'
+        self.entries = self.__load()
+        self._parsed = {}  # type: Dict[ids.TitleID, IDBE]
+
+    def __contains__(self, title_id: ids.TTitleIDInput) -> bool:
+        return ids.TitleID.get_inst(title_id) in self.entries
+
+    def get_version(self, title_id: ids.TTitleIDInput) -> Optional[int]:
+        entry = self.entries.get(ids.TitleID.get_inst(title_id))
+        return entry.version if entry is not None else None
+
+    def load_raw(self, title_id: ids.TTitleIDInput) -> Optional[bytes]:
+        path = self.__get_path(ids.TitleID.get_inst(title_id), 'idbe')
+        return path.read_bytes() if path.exists() else None
+
+    def get(self, title_id: ids.TTitleIDInput) -> Optional[IDBE]:
+        '''
+        Returns the cached IDBE without making any requests, or `None` if not cached
+        '''
+
+        title_id = ids.TitleID.get_inst(title_id)
+        idbe = self._parsed.get(title_id)
+        if idbe is None and title_id in self.entries:
+            with self.__get_path(title_id, 'pickle').open('rb') as f:
+                key_index, data = pickle.load(f)
+            idbe = self._parsed[title_id] = IDBE._from_parsed(title_id, key_index, data)
+        return idbe
+
+    def update(self, title_id: ids.TTitleIDInput, version: Optional[int] = None, **kwargs: Any) -> Optional[IDBE]:
+        '''
+        Returns the IDBE of the title, fetching it only if it's not cached or the cached version is older than `version`.
+
+        If `version` is `None`, the latest IDBE is always fetched
+        '''
+
+        idbe = self._update(ids.TitleID.get_inst(title_id), version, **kwargs)
+        self.save()
+        return idbe
+
+    def update_many(self, versions: Mapping[ids.TTitleIDInput, Optional[int]], **kwargs: Any) -> Dict[ids.TitleID, Optional[IDBE]]:
+        '''
+        Same as `update`, for many titles concurrently; maps title IDs to their (minimum) required version
+        '''
+
+        title_versions = {ids.TitleID.get_inst(t): v for t, v in versions.items()}
+        with ThreadPoolExecutor(self.max_workers) as executor:
+            results = dict(zip(
+                title_versions.keys(),
+                executor.map(lambda item: self._update(*item, **kwargs), title_versions.items())
+            ))
+        self.save()
+        return results
+
+    def _update(self, title_id: ids.TitleID, version: Optional[int], **kwargs: Any) -> Optional[IDBE]:
+        entry = self.entries.get(title_id)
+        if entry is not None and version is not None and entry.version >= version:
+            return self.get(title_id)
+
+        raw = _download_raw(self.server, title_id, version, **kwargs)
+        if raw is None:
+            # keep serving the cached (older) IDBE, if any
+            return self.get(title_id)
+
+        # only decrypt the header to compare checksums
+        view = IDBEView(raw, title_id.type.platform)
+        new_entry = IDBECacheEntry(view.version, view.checksum)
+        if entry is not None and entry.checksum == new_entry.checksum:
+            _logger.debug(f'IDBE of {title_id} unchanged')
+            if entry != new_entry:
+                self.entries[title_id] = new_entry
+            return self.get(title_id)
+
+        _logger.debug(f'IDBE of {title_id} changed (version {entry.version if entry else None} -> {new_entry.version})')
+        idbe = IDBE(title_id).load_bytes(raw, self.server._config.type_load_config)
+        self.__get_path(title_id, 'idbe').write_bytes(raw)
+        with self.__get_path(title_id, 'pickle').open('wb') as f:
+            pickle.dump((idbe.key_index, idbe.data), f, pickle.HIGHEST_PROTOCOL)
+
+        self._parsed[title_id] = idbe
+        self.entries[title_id] = new_entry
+        return idbe
+
+    def __get_path(self, title_id: ids.TitleID, ext: str) -> Path:
+        return self._directory / f'{title_id}.{ext}'
+
+    def save(self) -> None:
+        # write to temporary file first to avoid corrupting the index if interrupted
+        tmp_path = self._index_path.with_name(self._index_path.name + '.tmp')
+        with tmp_path.open('wb') as f:
+            pickle.dump((self._INDEX_VERSION, self.entries), f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._index_path)
+
+    def __load(self) -> Dict[ids.TitleID, IDBECacheEntry]:
+        if not self._index_path.exists():
+            return {}
+        with self._index_path.open('rb') as f:
+            index_version, entries = pickle.load(f)
+        if index_version != self._INDEX_VERSION:
+            raise RuntimeError(f'unsupported index version {index_version} (expected {self._INDEX_VERSION})')
+        return entries
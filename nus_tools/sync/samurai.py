@@ -0,0 +1,125 @@
+import os
+import pickle
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Tuple
+from reqcli.utils.typing import RequestDict
+
+from .. import ids
+from ..sources import Samurai
+from ..types.samurai.title import SamuraiTitleElement
+from ..types.samurai.title_list import SamuraiListTitle
+
+
+_logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SamuraiCatalogueEntry:
+    list_title: SamuraiListTitle
+    title: SamuraiTitleElement
+
+
+@dataclass
+class SamuraiCatalogueDiff:
+    added: Dict[ids.ContentID, SamuraiTitleElement] = field(default_factory=dict)
+    removed: Dict[ids.ContentID, SamuraiTitleElement] = field(default_factory=dict)
+    # (old, new)
+    changed: Dict[ids.ContentID, Tuple[SamuraiTitleElement, SamuraiTitleElement]] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+class SamuraiCatalogueSync:
+    '''
+    Keeps a local snapshot of all titles of a shop, keyed by content ID.
+
+    Each sync only walks the (cheap) title list pages and refetches detail pages
+    of titles that are new, changed their list entry, or are flagged as new by the server.
+
+    The snapshot is saved every `save_interval` refetched titles and when a sync fails,
+    so an interrupted sync continues with the remaining titles next time
+    (titles refetched before the interruption are then no longer part of the returned diff)
+    '''
+
+    _SNAPSHOT_VERSION = 1
+
+    def __init__(self, samurai: Samurai, snapshot_path: str, *, refetch_new: bool = True, save_interval: int = 100, other_params: RequestDict = {}):
+        self.samurai = samurai
+        self.refetch_new = refetch_new
+        self.save_interval = save_interval
+        self.other_params = other_params
+        self._snapshot_path = Path(snapshot_path)
+        self.entries = self.__load()
+
+    def sync(self, max_page_size: int = 200, **kwargs: Any) -> SamuraiCatalogueDiff:
+        '''
+        Fetches all list pages, refetches changed titles and updates the snapshot on disk.
+
+        Returns the differences between the previous and the current state
+        '''
+
+        listed = {}  # type: Dict[ids.ContentID, SamuraiListTitle]
+        total = 0
+        for page in self.samurai.get_all_title_lists(max_page_size, self.other_params, **kwargs):
+            total = page.total
+            for list_title in page.titles:
+                listed[list_title.content_id] = list_title
+
+        diff = SamuraiCatalogueDiff()
+
+        # titles may move between pages while paginating, only treat missing titles as removed if the listing is complete
+        if len(listed) == total:
+            for content_id in self.entries.keys() - listed.keys():
+                diff.removed[content_id] = self.entries.pop(content_id).title
+        else:
+            _logger.warning(f'incomplete title listing ({len(listed)} of {total} titles), skipping removal detection')
+
+        fetched = 0
+        try:
+            for content_id, list_title in listed.items():
+                old = self.entries.get(content_id)
+                if old is not None and not self._needs_refetch(old, list_title):
+                    continue
+
+                _logger.debug(f'fetching title {content_id}')
+                title = self.samurai.get_title(content_id, **kwargs).title
+                self.entries[content_id] = SamuraiCatalogueEntry(list_title, title)
+
+                if old is None:
+                    diff.added[content_id] = title
+                elif old.title != title:
+                    diff.changed[content_id] = (old.title, title)
+
+                fetched += 1
+                if fetched % self.save_interval == 0:
+                    self.save()
+        finally:
+            # also keep the progress of failed/interrupted syncs
+            self.save()
+
+        _logger.info(f'sync done: {len(diff.added)} added, {len(diff.removed)} removed, {len(diff.changed)} changed')
+        return diff
+
+    def _needs_refetch(self, entry: SamuraiCatalogueEntry, list_title: SamuraiListTitle) -> bool:
+        if self.refetch_new and list_title.is_new:
+            return True
+        return entry.list_title != list_title
+
+    def save(self) -> None:
+        # write to temporary file first to avoid corrupting the snapshot if interrupted
+        tmp_path = self._snapshot_path.with_name(self._snapshot_path.name + '.tmp')
+        with tmp_path.open('wb') as f:
+            pickle.dump((self._SNAPSHOT_VERSION, self.entries), f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._snapshot_path)
+
+    def __load(self) -> Dict[ids.ContentID, SamuraiCatalogueEntry]:
+        if not self._snapshot_path.exists():
+            return {}
+        with self._snapshot_path.open('rb') as f:
+            version, entries = pickle.load(f)
+        if version != self._SNAPSHOT_VERSION:
+            raise RuntimeError(f'unsupported snapshot version {version} (expected {self._SNAPSHOT_VERSION})')
+        return entries
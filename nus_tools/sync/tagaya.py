@@ -0,0 +1,103 @@
+import os
+import pickle
+import logging
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .. import ids
+from ..sources.tagaya import _TagayaBase
+from ..types.tagaya import UpdateList
+
+
+_logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TitleVersionUpdate:
+    title_id: ids.TitleID
+    # `None` if the title was not listed before
+    old_version: Optional[int]
+    new_version: int
+    # version of the update list the change first appeared in
+    list_version: int
+
+
+class UpdateListTracker:
+    '''
+    Tracks title versions across update lists.
+
+    Stores the last processed list version and a title ID -> version index on disk;
+    each sync only fetches lists newer than the last processed one (concurrently)
+    and returns the titles whose versions changed
+    '''
+
+    _STATE_VERSION = 1
+
+    def __init__(self, tagaya: _TagayaBase, state_path: str, *, max_workers: int = 8):
+        self.tagaya = tagaya
+        self.max_workers = max_workers
+        self._state_path = Path(state_path)
+        self.list_version, self.versions = self.__load()
+
+    def sync(self, **kwargs: Any) -> List[TitleVersionUpdate]:
+        latest = self.tagaya.get_latest_updatelist_version(**kwargs).latest
+        if self.list_version is None:
+            # initial sync, only the latest list is relevant
+            list_versions = [latest]
+        else:
+            list_versions = list(range(self.list_version + 1, latest + 1))
+
+        if not list_versions:
+            return []
+        _logger.info(f'fetching {len(list_versions)} update lists ({list_versions[0]} - {list_versions[-1]})')
+
+        updates = []  # type: List[TitleVersionUpdate]
+        with ThreadPoolExecutor(self.max_workers) as executor:
+            # lists have to be applied in order, `map` preserves order while fetching concurrently
+            for list_version, updatelist in zip(list_versions, executor.map(lambda v: self._fetch(v, **kwargs), list_versions)):
+                if updatelist is not None:
+                    updates.extend(self._apply(list_version, updatelist))
+
+        self.list_version = latest
+        _logger.info(f'sync done: {len(updates)} updated titles')
+        self.save()
+        return updates
+
+    def _apply(self, list_version: int, updatelist: UpdateList) -> List[TitleVersionUpdate]:
+        versions = self.versions
+        updates = []
+        for title_id, version in updatelist.updates:
+            old = versions.get(title_id)
+            if old is not None and old >= version:
+                continue
+            versions[title_id] = version
+            updates.append(TitleVersionUpdate(title_id, old, version, list_version))
+        return updates
+
+    def _fetch(self, list_version: int, **kwargs: Any) -> Optional[UpdateList]:
+        try:
+            return self.tagaya.get_updatelist(list_version, **kwargs)
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                _logger.warning(f'update list {list_version} does not exist, skipping')
+                return None
+            raise
+
+    def save(self) -> None:
+        # write to temporary file first to avoid corrupting the state if interrupted
+        tmp_path = self._state_path.with_name(self._state_path.name + '.tmp')
+        with tmp_path.open('wb') as f:
+            pickle.dump((self._STATE_VERSION, self.list_version, self.versions), f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._state_path)
+
+    def __load(self) -> Tuple[Optional[int], Dict[ids.TitleID, int]]:
+        if not self._state_path.exists():
+            return None, {}
+        with self._state_path.open('rb') as f:
+            state_version, list_version, versions = pickle.load(f)
+        if state_version != self._STATE_VERSION:
+            raise RuntimeError(f'unsupported state version {state_version} (expected {self._STATE_VERSION})')
+        return list_version, versions
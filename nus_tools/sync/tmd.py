@@ -0,0 +1,152 @@
+import json
+import logging
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple, cast
+from reqcli.source import UnloadableType
+
+from .. import ids
+from ..sources.contentcdn import _ContentServerBase
+from ..types.contentcdn import TMDView
+from ..types.tagaya import UpdateList
+
+
+_logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TMDVersionHistory:
+    title_id: ids.TitleID
+    # all known versions, including previously stored ones
+    versions: List[int] = field(default_factory=list)
+    # versions found during the last crawl
+    new_versions: List[int] = field(default_factory=list)
+
+
+class TMDVersionCrawler:
+    '''
+    Discovers and stores all available `tmd.<version>` files of titles.
+
+    Candidate versions are derived from the latest TMD's `title_version` (stepping down in
+    platform-specific increments) and from externally known versions (e.g. from an `UpdateList`).
+    Probes are run concurrently, found TMDs are stored as `<directory>/<title id>/tmd.<version>`,
+    and missing versions are cached so they are never probed twice
+    '''
+
+    _MISSING_FILE = 'missing.json'
+
+    # title versions are usually multiples of these values;
+    #  3DS versions are `major << 10 | minor << 4 | micro`, with micro usually being 0
+    default_version_steps = {
+        ids.TitlePlatform.WIIU: 16,
+        ids.TitlePlatform._3DS: 16
+    }
+
+    def __init__(self, ccs: _ContentServerBase, directory: str, *, max_workers: int = 8, version_steps: Optional[Mapping[ids.TitlePlatform, int]] = None):
+        self.ccs = ccs
+        self.max_workers = max_workers
+        self.version_steps = {**self.default_version_steps, **(version_steps or {})}
+        self._directory = Path(directory)
+
+    # storage
+
+    def _title_dir(self, title_id: ids.TitleID) -> Path:
+        return self._directory / str(title_id)
+
+    def get_stored_versions(self, title_id: ids.TTitleIDInput) -> List[int]:
+        title_dir = self._title_dir(ids.TitleID.get_inst(title_id))
+        if not title_dir.is_dir():
+            return []
+        return sorted(int(p.suffix[1:]) for p in title_dir.glob('tmd.*'))
+
+    def load_tmd(self, title_id: ids.TTitleIDInput, version: int) -> TMDView:
+        return TMDView((self._title_dir(ids.TitleID.get_inst(title_id)) / f'tmd.{version}').read_bytes())
+
+    def _store_tmd(self, title_id: ids.TitleID, version: int, data: bytes) -> None:
+        title_dir = self._title_dir(title_id)
+        title_dir.mkdir(parents=True, exist_ok=True)
+        (title_dir / f'tmd.{version}').write_bytes(data)
+
+    def _load_missing(self, title_id: ids.TitleID) -> Set[int]:
+        path = self._title_dir(title_id) / self._MISSING_FILE
+        if not path.exists():
+            return set()
+        return set(json.loads(path.read_text()))
+
+    def _store_missing(self, title_id: ids.TitleID, missing: Set[int]) -> None:
+        title_dir = self._title_dir(title_id)
+        title_dir.mkdir(parents=True, exist_ok=True)
+        (title_dir / self._MISSING_FILE).write_text(json.dumps(sorted(missing)))
+
+    # crawling
+
+    def crawl(self, title_id: ids.TTitleIDInput, known_versions: Iterable[int] = (), **kwargs: Any) -> TMDVersionHistory:
+        return self.crawl_many({ids.TitleID.get_inst(title_id): known_versions}, **kwargs)[0]
+
+    def crawl_updatelist(self, updatelist: UpdateList, **kwargs: Any) -> List[TMDVersionHistory]:
+        known = {}  # type: Dict[ids.TitleID, List[int]]
+        for title_id, version in updatelist.updates:
+            known.setdefault(title_id, []).append(version)
+        return self.crawl_many(known, **kwargs)
+
+    def crawl_many(self, titles: Mapping[ids.TitleID, Iterable[int]], **kwargs: Any) -> List[TMDVersionHistory]:
+        histories = {title_id: TMDVersionHistory(title_id) for title_id in titles}
+        stored = {title_id: set(self.get_stored_versions(title_id)) for title_id in titles}
+        missing = {title_id: self._load_missing(title_id) for title_id in titles}
+
+        try:
+            with ThreadPoolExecutor(self.max_workers) as executor:
+                # first pass: fetch latest TMDs to determine upper bound of versions
+                latest = dict(zip(titles, executor.map(lambda t: self._fetch(t, None, **kwargs), titles)))
+
+                probes = []  # type: List[Tuple[ids.TitleID, int]]
+                for title_id, known_versions in titles.items():
+                    candidates = set(known_versions)
+
+                    data = latest[title_id]
+                    if data is not None:
+                        version = TMDView(data).title_version
+                        if version not in stored[title_id]:
+                            self._store_tmd(title_id, version, data)
+                            stored[title_id].add(version)
+                            histories[title_id].new_versions.append(version)
+                        candidates.add(version)
+
+                    if candidates:
+                        step = self.version_steps[title_id.type.platform]
+                        candidates.update(range(0, max(candidates) + 1, step))
+
+                    probes.extend((title_id, v) for v in sorted(candidates - stored[title_id] - missing[title_id]))
+
+                _logger.info(f'probing {len(probes)} versions of {len(titles)} titles')
+
+                # second pass: probe all candidates concurrently
+                results = executor.map(lambda p: self._fetch(p[0], p[1], **kwargs), probes)
+                for (title_id, version), data in zip(probes, results):
+                    if data is None:
+                        missing[title_id].add(version)
+                        continue
+                    self._store_tmd(title_id, version, data)
+                    stored[title_id].add(version)
+                    histories[title_id].new_versions.append(version)
+        finally:
+            # keep negative results of completed probes even if the crawl was interrupted
+            for title_id, history in histories.items():
+                history.versions = sorted(stored[title_id])
+                history.new_versions.sort()
+                if missing[title_id]:
+                    self._store_missing(title_id, missing[title_id])
+        return list(histories.values())
+
+    def _fetch(self, title_id: ids.TitleID, version: Optional[int], **kwargs: Any) -> Optional[bytes]:
+        try:
+            with cast(UnloadableType, self.ccs.get_tmd(title_id, version, force_unloadable=True, **kwargs)).get_reader() as reader:
+                return reader.read()
+        except requests.HTTPError as e:
+            # only cache definite misses, other errors are re-raised
+            if e.response is not None and e.response.status_code in (403, 404):
+                _logger.debug(f'no TMD for {title_id}, version {version}')
+                return None
+            raise
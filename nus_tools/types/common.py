@@ -1,5 +1,5 @@
 import logging
-from typing import Any, List
+from typing import Any, Iterable, List, Optional
 
 from .config import NUSTypeLoadConfig
 from .. import utils
@@ -34,3 +34,34 @@ class SignatureHandler:
                 _logger.warning(str(e) + ' - skipping signature verification')
             else:
                 raise
+
+    @classmethod
+    def verify_many(cls, config: NUSTypeLoadConfig, items: Iterable[utils.crypto.VerifyItem], *, max_workers: Optional[int] = None) -> List[Optional[Exception]]:
+        '''
+        Batch version of `maybe_verify`, verifies all items in parallel using multiple processes.
+
+        Returns a list containing the verification error for each item, or `None` if the signature is valid (or verification was skipped)
+        '''
+
+        items = list(items)
+        verify = config.verify_signatures
+        if verify is False:
+            return [None] * len(items)
+
+        root_key = Configuration.root_key_struct
+        if root_key is None:
+            msg = 'no root key set, can\'t verify signatures'
+            if verify is None:
+                _logger.warning(msg)
+                return [None] * len(items)
+            else:
+                raise RuntimeError(msg)
+
+        results = utils.crypto.verify_chain_many(items, root_key, max_workers=max_workers)
+        if verify is None:
+            # only print warnings for missing certificates, same as `maybe_verify`
+            for i, e in enumerate(results):
+                if isinstance(e, utils.crypto.MissingCertError):
+                    _logger.warning(str(e) + ' - skipping signature verification')
+                    results[i] = None
+        return results
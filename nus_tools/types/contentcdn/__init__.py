@@ -1 +1,2 @@
 from .all import Ticket, TMD
+from .view import TMDView, TMDContentRecord, TMDContentInfo, TMDContentType
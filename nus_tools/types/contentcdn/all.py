@@ -3,7 +3,7 @@ from typing import Optional, Union, overload
 from reqcli.type import BaseTypeLoadableConstruct
 
 from .. import common
-from ... import structs, ids
+from ... import structs, ids, utils
 
 
 class Ticket(BaseTypeLoadableConstruct):
@@ -29,6 +29,11 @@ class Ticket(BaseTypeLoadableConstruct):
             self.data.certificates
         )
 
+    # for use with `SignatureHandler.verify_many`
+    @property
+    def signature_item(self) -> utils.crypto.VerifyItem:
+        return utils.crypto.VerifyItem(self.data.__raw_signed__, self.data.issuer, self.data.signature, self.data.certificates)
+
 
 class TMD(BaseTypeLoadableConstruct):
     data: Container
@@ -71,3 +76,8 @@ class TMD(BaseTypeLoadableConstruct):
             self.data.signature,
             self.data.certificates
         )
+
+    # for use with `SignatureHandler.verify_many`
+    @property
+    def signature_item(self) -> utils.crypto.VerifyItem:
+        return utils.crypto.VerifyItem(self.data.__raw_header_signed__, self.data.issuer, self.data.signature, self.data.certificates)
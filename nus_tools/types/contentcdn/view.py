@@ -0,0 +1,254 @@
+import enum
+import struct
+import hashlib
+from typing import Any, Iterator, List, NamedTuple, Optional, Sequence, Union, overload
+from constructutils.checksum import ChecksumVerifyError
+
+from .. import common
+from ..config import NUSTypeLoadConfig
+from ... import structs, ids, utils
+from ...structs.common import SignatureType
+
+
+# lazy, zero-copy alternative to `TMD` for bulk scanning;
+#  fields are decoded from the underlying buffer on access instead of parsing the entire structure upfront.
+#  offsets/layout are the same as in `structs.tmd`
+
+_HEADER_SIZE = 0xc4
+_CONTENT_INFO_COUNT = 64
+_CONTENT_INFO_SIZE = 0x24
+_CONTENT_RECORD_SIZE = 0x30
+
+_header_struct = struct.Struct('>BBB1x8sQ4s2s62x4sHHH2x32s')  # everything after the issuer
+_content_info_struct = struct.Struct('>HH32s')
+_content_record_struct = struct.Struct('>IHHQ')
+
+
+class TMDContentType(enum.IntFlag):
+    ENCRYPTED = 0x0001
+    HASHED = 0x0002
+    CFM = 0x0004
+    UNK1 = 0x2000
+    UNK2 = 0x4000
+    UNK3 = 0x8000
+
+    # attribute names matching the construct `FlagsEnum` container
+
+    @property
+    def encrypted(self) -> bool:
+        return bool(self & TMDContentType.ENCRYPTED)
+
+    @property
+    def hashed(self) -> bool:
+        return bool(self & TMDContentType.HASHED)
+
+    @property
+    def cfm(self) -> bool:
+        return bool(self & TMDContentType.CFM)
+
+
+class TMDContentInfo(NamedTuple):
+    content_index: int
+    content_count: int
+    contents_sha256: bytes
+
+
+class TMDContentRecord(NamedTuple):
+    id: int
+    index: int
+    type: TMDContentType
+    size: int
+    hash: bytes  # sha1 on Wii U, sha256 on 3DS
+
+    @property
+    def sha1(self) -> bytes:
+        if len(self.hash) != 20:
+            raise AttributeError('content record does not contain a SHA1 hash')
+        return self.hash
+
+    @property
+    def sha256(self) -> bytes:
+        if len(self.hash) != 32:
+            raise AttributeError('content record does not contain a SHA256 hash')
+        return self.hash
+
+
+class _TMDContents(Sequence[TMDContentRecord]):
+    def __init__(self, view: 'TMDView'):
+        self._view = view
+
+    def __len__(self) -> int:
+        return self._view.content_count
+
+    @overload
+    def __getitem__(self, index: int) -> TMDContentRecord:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[TMDContentRecord]:
+        ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._view.get_content(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('content index out of range')
+        return self._view.get_content(index)
+
+    def __iter__(self) -> Iterator[TMDContentRecord]:
+        return (self._view.get_content(i) for i in range(len(self)))
+
+
+class TMDView:
+    '''
+    Read-only view over raw TMD data.
+
+    Header fields and content records are decoded on access using `struct.unpack_from`;
+    checksums and signatures are only verified when explicitly requested
+    '''
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview], platform: Optional[ids.AnyPlatform] = None):
+        self._data = memoryview(data).cast('B')
+
+        sig_type = SignatureType(int.from_bytes(self._data[:4], 'big'))
+        # signature is aligned to 0x40 bytes
+        self._header_offset = (4 + sig_type.signature_alg.mod_size + 0x3f) & ~0x3f
+        self._signature_type = sig_type
+
+        if len(self._data) < self._contents_offset:
+            raise ValueError(f'TMD data too short ({len(self._data)} bytes)')
+
+        (
+            self.format_version,
+            self.ca_crl_version,
+            self.signer_crl_version,
+            self.system_version,
+            self._title_id,
+            self.title_type,
+            self.group_id,
+            self.access_rights,
+            self.title_version,
+            self.content_count,
+            self.boot_index,
+            self.content_info_sha256
+        ) = _header_struct.unpack_from(self._data, self._header_offset + 0x40)
+
+        if len(self._data) < self._certificates_offset:
+            raise ValueError(f'TMD data too short for {self.content_count} contents ({len(self._data)} bytes)')
+
+        self._platform = platform
+        if platform is None:
+            platform = ids.TitleType(self._title_id >> 32).platform
+        self._is_wiiu = platform in (ids.TitlePlatform.WIIU, ids.ContentPlatform.WIIU)
+
+    @property
+    def _content_info_offset(self) -> int:
+        return self._header_offset + _HEADER_SIZE
+
+    @property
+    def _contents_offset(self) -> int:
+        return self._content_info_offset + _CONTENT_INFO_COUNT * _CONTENT_INFO_SIZE
+
+    @property
+    def _certificates_offset(self) -> int:
+        return self._contents_offset + self.content_count * _CONTENT_RECORD_SIZE
+
+    # header
+
+    @property
+    def signature_type(self) -> SignatureType:
+        return self._signature_type
+
+    @property
+    def signature_data(self) -> memoryview:
+        return self._data[4:4 + self._signature_type.signature_alg.mod_size]
+
+    @property
+    def raw_header_signed(self) -> memoryview:
+        return self._data[self._header_offset:self._content_info_offset]
+
+    @property
+    def issuer(self) -> str:
+        return bytes(self._data[self._header_offset:self._header_offset + 0x40]).rstrip(b'\0').decode('ascii')
+
+    @property
+    def title_id(self) -> ids.TitleID:
+        return ids.TitleID(self._title_id)
+
+    @property
+    def app_type(self) -> Optional[bytes]:
+        if not self._is_wiiu:
+            return None
+        offset = self._header_offset + 0x5a
+        return bytes(self._data[offset:offset + 4])
+
+    # content info/records
+
+    def get_content_info(self, index: int) -> TMDContentInfo:
+        if not 0 <= index < _CONTENT_INFO_COUNT:
+            raise IndexError('content info index out of range')
+        return TMDContentInfo._make(_content_info_struct.unpack_from(
+            self._data, self._content_info_offset + index * _CONTENT_INFO_SIZE
+        ))
+
+    @property
+    def content_info(self) -> List[TMDContentInfo]:
+        return [
+            TMDContentInfo._make(t)
+            for t in _content_info_struct.iter_unpack(self._data[self._content_info_offset:self._contents_offset])
+        ]
+
+    def get_content(self, index: int) -> TMDContentRecord:
+        offset = self._contents_offset + index * _CONTENT_RECORD_SIZE
+        id, content_index, type, size = _content_record_struct.unpack_from(self._data, offset)
+        hash_offset = offset + _content_record_struct.size
+        hash = bytes(self._data[hash_offset:hash_offset + (20 if self._is_wiiu else 32)])
+        return TMDContentRecord(id, content_index, TMDContentType(type), size, hash)
+
+    @property
+    def contents(self) -> Sequence[TMDContentRecord]:
+        return _TMDContents(self)
+
+    @property
+    def raw_certificates(self) -> memoryview:
+        return self._data[self._certificates_offset:]
+
+    # verification
+
+    def verify_checksums(self) -> None:
+        info_data = self._data[self._content_info_offset:self._contents_offset]
+        digest = hashlib.sha256(info_data).digest()
+        if digest != self.content_info_sha256:
+            raise ChecksumVerifyError('content info hash mismatch', self.content_info_sha256, digest)
+
+        for info in self.content_info:
+            if info.content_count == 0:
+                continue
+            start = self._contents_offset + info.content_index * _CONTENT_RECORD_SIZE
+            end = start + info.content_count * _CONTENT_RECORD_SIZE
+            if end > self._certificates_offset:
+                raise ValueError(f'content info references missing content records {info.content_index}-{info.content_index + info.content_count - 1}')
+            digest = hashlib.sha256(self._data[start:end]).digest()
+            if digest != info.contents_sha256:
+                raise ChecksumVerifyError('content records hash mismatch', info.contents_sha256, digest)
+
+    @property
+    def signature_item(self) -> utils.crypto.VerifyItem:
+        # only the (small) signature/certificate structures are parsed using construct
+        return utils.crypto.VerifyItem(
+            bytes(self.raw_header_signed),
+            self.issuer,
+            structs.common.signature.parse(bytes(self._data[:self._header_offset])),
+            structs.common.certificates.parse(bytes(self.raw_certificates))
+        )
+
+    def verify_signature(self, config: NUSTypeLoadConfig) -> None:
+        common.SignatureHandler.maybe_verify(config, *self.signature_item)
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}[{self.title_id}, v{self.title_version}, {self.content_count} contents]'
+
+    def __reduce__(self) -> Any:
+        return (type(self), (bytes(self._data), self._platform))
@@ -1 +1,2 @@
 from .all import IDBE
+from .view import IDBEView, IDBETitleInfo
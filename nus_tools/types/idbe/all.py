@@ -13,6 +13,14 @@ class IDBE(BaseTypeLoadableConstruct):
         self.__title_id = ids.TitleID.get_inst(title_id)
         super().__init__(structs.idbe.get(self.__title_id.type.platform))
 
+    @classmethod
+    def _from_parsed(cls, title_id: ids.TTitleIDInput, key_index: int, data: Container) -> 'IDBE':
+        # for data that was already decrypted/parsed elsewhere (e.g. loaded from a cache)
+        inst = cls(title_id)
+        inst.key_index = key_index
+        inst.data = data
+        return inst
+
     def _read(self, reader, config):
         raw_data = reader.read()
 
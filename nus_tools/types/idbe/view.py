@@ -0,0 +1,134 @@
+import struct
+import hashlib
+from typing import Dict, NamedTuple, Optional, Union
+from constructutils.checksum import ChecksumVerifyError
+
+from ... import ids, utils
+from ...config import Configuration
+from ...structs.idbe import languages
+
+
+# lazy alternative to `IDBE` for name-only scans;
+#  only the parts of the file that are accessed get decrypted/decoded.
+#  offsets/layout are the same as in `structs.idbe`
+
+_CHECKSUM_SIZE = 0x20
+_TITLE_INFO_OFFSET = 0x50
+_TITLE_INFO_SIZE = 0x200
+_ICON_OFFSET = _TITLE_INFO_OFFSET + len(languages) * _TITLE_INFO_SIZE
+
+# title_id, version, _unk1, regions
+_header_struct = {
+    True: struct.Struct('>QI4xI'),
+    False: struct.Struct('<QI4xI')
+}
+_icon_size = {
+    True: 0x2c + 128 * 128 * 4,  # tga
+    False: (24 * 24 + 48 * 48) * 2  # raw RGB565, 24x24 followed by 48x48
+}
+
+
+class IDBETitleInfo(NamedTuple):
+    short_name: str
+    long_name: str
+    publisher: str
+
+
+class IDBEView:
+    '''
+    Read-only view over raw (encrypted) IDBE data.
+
+    Since the data is encrypted using CBC, any range can be decrypted independently
+    using the preceding ciphertext block as IV, without decrypting the entire file
+    '''
+
+    def __init__(self, raw: Union[bytes, bytearray, memoryview], platform: ids.AnyPlatform):
+        raw = memoryview(raw).cast('B')
+        assert raw[0] == 0
+        self.key_index = raw[1]
+        self._encrypted = raw[2:]
+        self._is_wiiu = platform in (ids.TitlePlatform.WIIU, ids.ContentPlatform.WIIU)
+        self._encoding = 'utf-16-be' if self._is_wiiu else 'utf-16-le'
+
+        self.__header = self._decrypt(0, _TITLE_INFO_OFFSET)
+        self.__icon = None  # type: Optional[bytes]
+
+    def _decrypt(self, start: int, end: int) -> bytes:
+        # align to AES blocks
+        start_aligned = start & ~0xf
+        end_aligned = (end + 0xf) & ~0xf
+        if start_aligned == 0:
+            iv = Configuration.keys.idbe_iv
+        else:
+            iv = bytes(self._encrypted[start_aligned - 16:start_aligned])
+
+        decryptor = utils.crypto.CBCDecryptor(Configuration.keys.idbe_keys[self.key_index], iv)
+        plain = decryptor.decrypt(bytes(self._encrypted[start_aligned:end_aligned]))
+        return plain[start - start_aligned:end - start_aligned]
+
+    # header
+
+    @property
+    def checksum(self) -> bytes:
+        return self.__header[:_CHECKSUM_SIZE]
+
+    def __unpack_header(self):
+        return _header_struct[self._is_wiiu].unpack_from(self.__header, _CHECKSUM_SIZE)
+
+    @property
+    def title_id(self) -> ids.TitleID:
+        return ids.TitleID(self.__unpack_header()[0])
+
+    @property
+    def version(self) -> int:
+        return self.__unpack_header()[1]
+
+    @property
+    def regions(self) -> int:
+        return self.__unpack_header()[2]
+
+    # title info
+
+    def get_title_info(self, language: Union[str, int]) -> IDBETitleInfo:
+        index = languages.index(language) if isinstance(language, str) else language
+        if not 0 <= index < len(languages):
+            raise IndexError('language index out of range')
+
+        offset = _TITLE_INFO_OFFSET + index * _TITLE_INFO_SIZE
+        data = self._decrypt(offset, offset + _TITLE_INFO_SIZE)
+        return IDBETitleInfo(
+            self.__decode_string(data[:0x80]),
+            self.__decode_string(data[0x80:0x180]),
+            self.__decode_string(data[0x180:0x200])
+        )
+
+    @property
+    def title_info(self) -> Dict[str, IDBETitleInfo]:
+        return {lang: self.get_title_info(i) for i, lang in enumerate(languages)}
+
+    def __decode_string(self, data: bytes) -> str:
+        # same as construct's `PaddedString`, which strips trailing null characters
+        return data.decode(self._encoding).rstrip('\0')
+
+    # icon
+
+    @property
+    def icon_data(self) -> memoryview:
+        '''
+        TGA file on Wii U, raw RGB565 data (24x24 followed by 48x48) on 3DS
+        '''
+
+        if self.__icon is None:
+            self.__icon = self._decrypt(_ICON_OFFSET, _ICON_OFFSET + _icon_size[self._is_wiiu])
+        return memoryview(self.__icon)
+
+    # verification
+
+    def verify_checksum(self) -> None:
+        decrypted = self._decrypt(0, len(self._encrypted))
+        digest = hashlib.sha256(memoryview(decrypted)[_CHECKSUM_SIZE:]).digest()
+        if digest != self.checksum:
+            raise ChecksumVerifyError('hash mismatch', self.checksum, digest)
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}[{self.title_id}, v{self.version}]'
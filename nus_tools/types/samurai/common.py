@@ -1,9 +1,14 @@
 import abc
+import lxml.etree
+import lxml.objectify
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Any, AsyncIterator, BinaryIO, Callable, Dict, Generic, Iterator, List, Optional, TypeVar
 
 import reqcli.utils.xml as xmlutils
-from reqcli.type import BaseTypeLoadable, XmlBaseType
+from reqcli.type import BaseTypeLoadable
+
+from . import parsing
+from ... import utils
 
 
 class SamuraiListBaseType(BaseTypeLoadable, abc.ABC):
@@ -12,7 +17,12 @@ class SamuraiListBaseType(BaseTypeLoadable, abc.ABC):
     total: int
 
     def _read(self, reader, config):
-        el = xmlutils.load_root(reader)
+        root = lxml.etree.parse(reader, parsing.create_parser()).getroot()
+        # responses are wrapped in an `<eshop>` element
+        el = root if root.tag == 'contents' else root.find('contents')
+        if el is None:
+            raise ValueError(f'unexpected root element: {root.tag}')
+
         self.length = int(el.get('length'))
         self.offset = int(el.get('offset'))
         self.total = int(el.get('total'))
@@ -23,13 +33,110 @@ class SamuraiListBaseType(BaseTypeLoadable, abc.ABC):
     def _read_list(self, xml):
         pass
 
+    # parses a single `<content>` element of the list
+    @staticmethod
+    @abc.abstractmethod
+    def _parse_content(content: lxml.objectify.ObjectifiedElement) -> Any:
+        pass
+
 
+_TItem = TypeVar('_TItem')
+
+
+class SamuraiListStream(Generic[_TItem]):
+    '''
+    Incrementally parses a list response, yielding items as soon as their `<content>` element is complete.
+    Processed elements are removed from the tree afterwards, so memory usage does not depend on the list size.
+
+    `length`/`offset`/`total` are available once the first item (or the end of an empty list) was parsed
+    '''
+
+    length: Optional[int] = None
+    offset: Optional[int] = None
+    total: Optional[int] = None
+
+    def __init__(self, reader: BinaryIO, parse_content: Callable[[lxml.objectify.ObjectifiedElement], _TItem], chunk_size: int = 0x4000):
+        self._reader = reader
+        self._parse_content = parse_content
+        self._chunk_size = chunk_size
+
+    def __iter__(self) -> Iterator[_TItem]:
+        parser = self._create_parser()
+        while True:
+            data = self._reader.read(self._chunk_size)
+            yield from self._feed(parser, data)
+            if not data:
+                break
+
+    @staticmethod
+    def _create_parser() -> lxml.etree.XMLPullParser:
+        # same settings as `parsing.create_parser`
+        parser = lxml.etree.XMLPullParser(events=('end',), tag=('content', 'contents'), remove_blank_text=True)
+        parser.set_element_class_lookup(parsing.ELEMENT_LOOKUP)
+        return parser
+
+    def _feed(self, parser: lxml.etree.XMLPullParser, data: bytes) -> Iterator[_TItem]:
+        # empty data signals the end of the response
+        if data:
+            parser.feed(data)
+        else:
+            parser.close()
+
+        for _, el in parser.read_events():
+            if el.tag == 'contents':
+                self._read_attributes(el)
+                continue
+            parent = el.getparent()
+            if parent is None or parent.tag != 'contents':
+                continue
+
+            if self.total is None:
+                self._read_attributes(parent)
+            item = self._parse_content(el)
+            # drop processed element
+            el.clear()
+            parent.remove(el)
+            yield item
+
+    def _read_attributes(self, contents: lxml.objectify.ObjectifiedElement) -> None:
+        self.length = int(contents.get('length'))
+        self.offset = int(contents.get('offset'))
+        self.total = int(contents.get('total'))
+
+
+class AsyncSamuraiListStream(SamuraiListStream[_TItem]):
+    '''
+    Same as `SamuraiListStream`, for readers with an async `read(n)` method (e.g. `aiohttp.StreamReader`)
+    '''
+
+    def __iter__(self) -> Iterator[_TItem]:
+        raise TypeError(f'use `async for` to iterate over {type(self).__name__}')
+
+    async def __aiter__(self) -> AsyncIterator[_TItem]:
+        parser = self._create_parser()
+        while True:
+            data = await self._reader.read(self._chunk_size)  # type: ignore
+            for item in self._feed(parser, data):
+                yield item
+            if not data:
+                break
+
+
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class IDName:
     id: int
     name: str
 
+    # publishers/genres/etc. are shared between many titles, reuse instances;
+    #  bounded, since long-running processes may see arbitrarily many distinct values
+    @classmethod
+    @utils.misc.bounded_cache(1024)
+    def _get(cls, id: int, name: str) -> 'IDName':
+        return cls(id, utils.misc.intern_str(name))
+
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiIcon:
     url: str
@@ -39,14 +146,18 @@ class SamuraiIcon:
     def _parse(cls, xml):
         assert set(xml.attrib.keys()) == {'url', 'type'}
         assert not xml.text
-        return cls(
-            xml.get('url'),
-            xml.get('type')
-        )
+        return cls._get(xml.get('url'), xml.get('type'))
+
+    # icons are shared between many titles, reuse instances
+    @classmethod
+    @utils.misc.bounded_cache(1024)
+    def _get(cls, url: str, type: str) -> 'SamuraiIcon':
+        return cls(utils.misc.intern_str(url), utils.misc.intern_str(type))
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
-class SamuraiRating(XmlBaseType):
+class SamuraiRating(parsing.XmlRecord):
     system: IDName
     id: int
     icons: List[SamuraiIcon]
@@ -63,20 +174,22 @@ class SamuraiRating(XmlBaseType):
     @classmethod
     def _parse_internal(cls, xml):
         return {
-            'system': IDName(int(xml.rating_system.get('id')), xml.rating_system.name.text),
+            'system': IDName._get(int(xml.rating_system.get('id')), xml.rating_system.name.text),
             'id': int(xml.rating.get('id')),
             'icons': [SamuraiIcon._parse(icon) for icon in xml.rating.icons.icon],
-            'name': xml.rating.name.text,
-            'age': xml.rating.age.text
+            'name': utils.misc.intern_str(xml.rating.name.text),
+            'age': utils.misc.intern_str(xml.rating.age.text)
         }
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiRatingDescriptor:
     name: Optional[str] = None
     icons: Optional[List[SamuraiIcon]] = None
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiRatingDetailed(SamuraiRating):
     descriptors: List[SamuraiRatingDescriptor]
@@ -92,7 +205,7 @@ class SamuraiRatingDetailed(SamuraiRating):
         if hasattr(xml, 'descriptors') and hasattr(xml.descriptors, 'descriptor'):
             for d in xml.descriptors.descriptor:
                 descriptors.append(SamuraiRatingDescriptor(
-                    xmlutils.get_text(d, 'name'),
+                    utils.misc.intern_str(xmlutils.get_text(d, 'name')),
                     [SamuraiIcon._parse(icon) for icon in d.icons.icon] if hasattr(d, 'icons') else None
                 ))
 
@@ -102,8 +215,9 @@ class SamuraiRatingDetailed(SamuraiRating):
         }
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
-class SamuraiPlatform(XmlBaseType):
+class SamuraiPlatform(parsing.XmlRecord):
     id: int
     device: str
     category: str
@@ -118,15 +232,16 @@ class SamuraiPlatform(XmlBaseType):
     def _parse_internal(cls, xml):
         return {
             'id': int(xml.get('id')),
-            'device': xml.get('device'),
-            'category': xml.get('category'),
-            'name': xml.name.text,
-            'icon_url': xmlutils.get_text(xml, 'icon_url')
+            'device': utils.misc.intern_str(xml.get('device')),
+            'category': utils.misc.intern_str(xml.get('category')),
+            'name': utils.misc.intern_str(xml.name.text),
+            'icon_url': utils.misc.intern_str(xmlutils.get_text(xml, 'icon_url'))
         }
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
-class SamuraiStars(XmlBaseType):
+class SamuraiStars(parsing.XmlRecord):
     score: float
     total_votes: int
     stars: Dict[int, int]
@@ -144,12 +259,14 @@ class SamuraiStars(XmlBaseType):
         }
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiPrice:
     amount: Optional[float]
     currency: str
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiScreenshotUrl:
     url: str
@@ -161,13 +278,14 @@ class SamuraiScreenshotUrl:
         assert set(xml.attrib.keys()) <= {'type', 'index'}
         return cls(
             xml.text,
-            xml.get('type'),
+            utils.misc.intern_str(xml.get('type')),
             int(xml.get('index')) if 'index' in xml.attrib else None
         )
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
-class SamuraiScreenshot(XmlBaseType):
+class SamuraiScreenshot(parsing.XmlRecord):
     image_urls: List[SamuraiScreenshotUrl]
 
     @classmethod
@@ -181,6 +299,7 @@ class SamuraiScreenshot(XmlBaseType):
         }
 
 
+@utils.misc.add_slots
 @dataclass
 class SamuraiThumbnail:
     url: str
@@ -193,7 +312,7 @@ class SamuraiThumbnail:
         assert set(xml.attrib.keys()) == {'url', 'height', 'width', 'type'}
         return cls(
             xml.get('url'),
-            xml.get('type'),
+            utils.misc.intern_str(xml.get('type')),
             int(xml.get('width')),
             int(xml.get('height'))
         )
@@ -1,4 +1,5 @@
-from typing import List
+import lxml.objectify
+from typing import List, Union
 
 from . import movie_list, title_list
 from .common import SamuraiListBaseType
@@ -13,9 +14,17 @@ class SamuraiContentsList(SamuraiListBaseType):
         self.titles = []
         self.movies = []
         for content in xml.content:
-            if hasattr(content, 'title'):
-                self.titles.append(title_list.SamuraiListTitle._parse(content.title))
-            elif hasattr(content, 'movie'):
-                self.movies.append(movie_list.SamuraiListMovie._parse(content.movie))
+            item = self._parse_content(content)
+            if isinstance(item, title_list.SamuraiListTitle):
+                self.titles.append(item)
             else:
-                raise ValueError(content.getchildren()[0].tag)
+                self.movies.append(item)
+
+    @staticmethod
+    def _parse_content(content: lxml.objectify.ObjectifiedElement) -> Union[title_list.SamuraiListTitle, movie_list.SamuraiListMovie]:
+        if hasattr(content, 'title'):
+            return title_list.SamuraiListTitle._parse(content.title)
+        elif hasattr(content, 'movie'):
+            return movie_list.SamuraiListMovie._parse(content.movie)
+        else:
+            raise ValueError(content.getchildren()[0].tag)
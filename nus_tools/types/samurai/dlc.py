@@ -1,12 +1,12 @@
 import abc
 import lxml.objectify
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Generic, TypeVar
+from typing import ClassVar, Dict, List, Optional, Generic, TypeVar
 
 import reqcli.utils.xml as xmlutils
 from reqcli.type import BaseTypeLoadable
 
-from . import common
+from . import common, parsing
 from ... import utils, ids
 
 
@@ -47,12 +47,33 @@ class SamuraiTitleDlcsBase(SamuraiDlcsBase[_TDlc]):
 # WiiU
 #####
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiDlcContentIndexes:
     variation: str
     indexes: List[int]
 
 
+def _parse_dlc_screenshots(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
+    vals['screenshots'] = [common.SamuraiScreenshot._parse(screenshot) for screenshot in child.screenshot]
+
+
+def _parse_dlc_promotion_images(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
+    vals['promotion_image_urls'] = []
+    for image in child.promotion_image:
+        assert set(image.attrib.keys()) == {'index', 'url'}
+        vals['promotion_image_urls'].append(image.get('url'))
+
+
+def _parse_dlc_content_indexes(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
+    xmlutils.validate_schema(child, {'content_index': None}, False)
+    vals['content_indexes'] = SamuraiDlcContentIndexes(
+        child.get('variation'),
+        [int(i.text) for i in child.content_index]
+    )
+
+
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiDlcWiiU:
     is_new: bool
@@ -68,43 +89,26 @@ class SamuraiDlcWiiU:
     promotion_image_urls: Optional[List[str]] = None
     promotion_video_url: Optional[str] = None
 
+    _tags: ClassVar[parsing.TagDispatchTable] = parsing.TagDispatchTable({
+        'name': parsing.text_value('name'),
+        'item_new_since': parsing.text_value('release_date'),
+        'icon_url': parsing.text_value('icon_url'),
+        'screenshots': _parse_dlc_screenshots,
+        'promotion_images': _parse_dlc_promotion_images,
+        'promotion_movie_url': parsing.text_value('promotion_video_url'),
+        'content_indexes': _parse_dlc_content_indexes,
+        'description': parsing.text_value('description'),
+        'disclaimer': parsing.text_value('disclaimer'),
+        'allow_overlap': parsing.bool_value('allow_overlap')
+    })
+
     @classmethod
     def _parse(cls, xml: lxml.objectify.ObjectifiedElement) -> 'SamuraiDlcWiiU':
-        vals = utils.misc.dotdict()
-        vals.is_new = utils.misc.get_bool(xml.get('new'))
-        vals.content_id = ids.ContentID(xml.get('id'))
-
-        for child, tag, text in xmlutils.iter_children(xml):
-            if tag == 'name':
-                vals.name = text
-            elif tag == 'item_new_since':
-                vals.release_date = text
-            elif tag == 'icon_url':
-                vals.icon_url = text
-            elif tag == 'screenshots':
-                vals.screenshots = [common.SamuraiScreenshot._parse(screenshot) for screenshot in child.screenshot]
-            elif tag == 'promotion_images':
-                vals.promotion_image_urls = []
-                for image in child.promotion_image:
-                    assert set(image.attrib.keys()) == {'index', 'url'}
-                    vals.promotion_image_urls.append(image.get('url'))
-            elif tag == 'promotion_movie_url':
-                vals.promotion_video_url = text
-            elif tag == 'content_indexes':
-                xmlutils.validate_schema(child, {'content_index': None}, False)
-                vals.content_indexes = SamuraiDlcContentIndexes(
-                    child.get('variation'),
-                    [int(i.text) for i in child.content_index]
-                )
-            elif tag == 'description':
-                vals.description = text
-            elif tag == 'disclaimer':
-                vals.disclaimer = text
-            elif tag == 'allow_overlap':
-                vals.allow_overlap = utils.misc.get_bool(text)
-            else:
-                raise ValueError(f'unknown tag: {tag}')
-
+        vals = {
+            'is_new': utils.misc.get_bool(xml.get('new')),
+            'content_id': ids.ContentID(xml.get('id'))
+        }  # type: parsing.TValues
+        cls._tags.parse_children(vals, xml)
         return cls(**vals)
 
 
@@ -130,6 +134,7 @@ class SamuraiDlcSizes(BaseTypeLoadable):
         self.sizes = {ids.ContentID(aoc.get('id')): int(aoc.data_size.text) for aoc in aocs.aoc}
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiDlcPrice:
     eshop_status: str
@@ -176,27 +181,29 @@ class SamuraiTitleDlcsWiiU(SamuraiTitleDlcsBase[SamuraiDlcWiiU], SamuraiDlcsWiiU
 # 3DS
 #####
 
+def _parse_dlc_price(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
+    xmlutils.validate_schema(child, {'regular_price': {'amount': None, 'currency': None}}, False)
+    vals['price'] = common.SamuraiPrice(
+        float(child.regular_price.amount.text),
+        child.regular_price.currency.text
+    )
+
+
+@utils.misc.add_slots
 @dataclass
 class SamuraiDlc3DS:
     name: str
     price: common.SamuraiPrice
 
+    _tags: ClassVar[parsing.TagDispatchTable] = parsing.TagDispatchTable({
+        'name': parsing.text_value('name'),
+        'price': _parse_dlc_price
+    })
+
     @classmethod
     def _parse(cls, xml: lxml.objectify.ObjectifiedElement) -> 'SamuraiDlc3DS':
-        vals = utils.misc.dotdict()
-
-        for child, tag, text in xmlutils.iter_children(xml):
-            if tag == 'name':
-                vals.name = text
-            elif tag == 'price':
-                xmlutils.validate_schema(child, {'regular_price': {'amount': None, 'currency': None}}, False)
-                vals.price = common.SamuraiPrice(
-                    float(child.regular_price.amount.text),
-                    child.regular_price.currency.text
-                )
-            else:
-                raise ValueError(f'unknown tag: {tag}')
-
+        vals = {}  # type: parsing.TValues
+        cls._tags.parse_children(vals, xml)
         return cls(**vals)
 
 
@@ -4,7 +4,10 @@ from typing import List
 import reqcli.utils.xml as xmlutils
 from reqcli.type import BaseTypeLoadable
 
+from ... import utils
 
+
+@utils.misc.add_slots
 @dataclass
 class SamuraiNewsImage:
     url: str
@@ -14,6 +17,7 @@ class SamuraiNewsImage:
     height: int
 
 
+@utils.misc.add_slots
 @dataclass
 class SamuraiNewsEntry:
     headline: str
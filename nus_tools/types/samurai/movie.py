@@ -1,53 +1,48 @@
 import lxml.objectify
 from dataclasses import dataclass
-from typing import Optional
+from typing import ClassVar, Optional
 
 import reqcli.utils.xml as xmlutils
 from reqcli.type import BaseTypeLoadable
 
-from . import common, movie_list
+from . import common, movie_list, parsing
 from ... import utils
 
 
 @dataclass(frozen=True)
 class _SamuraiMovieBaseMixin(movie_list._SamuraiListMovieBaseMixin):
-    @classmethod
-    def _try_parse_value(cls, vals: utils.misc.dotdict, child: lxml.objectify.ObjectifiedElement, tag: str, text: str, custom_types: movie_list.CustomTypes) -> bool:
-        return super()._try_parse_value(vals, child, tag, text, custom_types)
+    __slots__ = ()
 
 
 @dataclass(frozen=True)
 class _SamuraiMovieOptionalMixin(movie_list._SamuraiListMovieOptionalMixin[common.SamuraiRatingDetailed]):
+    __slots__ = ()
+
     rating_info_alternate_image_url: Optional[str] = None
 
     @classmethod
-    def _try_parse_value(cls, vals: utils.misc.dotdict, child: lxml.objectify.ObjectifiedElement, tag: str, text: str, custom_types: movie_list.CustomTypes) -> bool:
-        if tag == 'alternate_rating_image_url':
-            vals.rating_info_alternate_image_url = text
-        else:
-            return super()._try_parse_value(vals, child, tag, text, custom_types)
-        return True
+    def _get_tag_handlers(cls, custom_types: movie_list.CustomTypes) -> parsing.TTagHandlers:
+        return {
+            **super()._get_tag_handlers(custom_types),
+            'alternate_rating_image_url': parsing.text_value('rating_info_alternate_image_url')
+        }
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiMovieElement(_SamuraiMovieOptionalMixin, _SamuraiMovieBaseMixin):
+    _tags: ClassVar[parsing.TagDispatchTable] = parsing.TagDispatchTable(
+        _SamuraiMovieBaseMixin._get_tag_handlers({}),
+        _SamuraiMovieOptionalMixin._get_tag_handlers({
+            'rating_info': common.SamuraiRatingDetailed
+        })
+    )
+
     @classmethod
     def _parse(cls, xml: lxml.objectify.ObjectifiedElement) -> 'SamuraiMovieElement':
-        vals = utils.misc.dotdict()
-
-        for child, tag, text in xmlutils.iter_children(xml):
-            if _SamuraiMovieBaseMixin._try_parse_value(vals, child, tag, text, {}):
-                pass
-            elif _SamuraiMovieOptionalMixin._try_parse_value(
-                vals, child, tag, text,
-                {
-                    'rating_info': common.SamuraiRatingDetailed
-                }
-            ):
-                pass
-            else:
-                raise ValueError(f'unknown tag: {tag}')
-
+        vals = {}  # type: parsing.TValues
+        cls._parse_attributes(vals, xml)
+        cls._tags.parse_children(vals, xml)
         return cls(**vals)
 
 
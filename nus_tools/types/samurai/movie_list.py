@@ -1,11 +1,11 @@
 import lxml.objectify
 from dataclasses import dataclass
-from typing import List, Optional, Type, TypeVar, Generic
+from typing import ClassVar, List, Optional, Type, TypeVar, Generic
 from typing_extensions import TypedDict
 
 import reqcli.utils.xml as xmlutils
 
-from . import common
+from . import common, parsing
 from ... import utils, ids
 
 
@@ -18,6 +18,7 @@ CustomTypes = TypedDict(
 )
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiMovieFile:
     quality: str
@@ -28,30 +29,23 @@ class SamuraiMovieFile:
     dimension: str
     seconds: int
 
+    _tags: ClassVar[parsing.TagDispatchTable] = parsing.TagDispatchTable({
+        'format': parsing.text_value('format', intern=True),
+        'movie_url': parsing.text_value('url'),
+        'width': parsing.int_value('width'),
+        'height': parsing.int_value('height'),
+        'dimension': parsing.text_value('dimension', intern=True),
+        'play_time_sec': parsing.int_value('seconds')
+    })
+
     @classmethod
     def _parse(cls, xml: lxml.objectify.ObjectifiedElement) -> 'SamuraiMovieFile':
-        vals = utils.misc.dotdict()
-        vals.quality = xml.get('quality')
-
-        for child, tag, text in xmlutils.iter_children(xml):
-            if tag == 'format':
-                vals.format = text
-            elif tag == 'movie_url':
-                vals.url = text
-            elif tag == 'width':
-                vals.width = int(text)
-            elif tag == 'height':
-                vals.height = int(text)
-            elif tag == 'dimension':
-                vals.dimension = text
-            elif tag == 'play_time_sec':
-                vals.seconds = int(text)
-            else:
-                raise ValueError(f'unknown tag: {tag}')
-
+        vals = {'quality': utils.misc.intern_str(xml.get('quality'))}  # type: parsing.TValues
+        cls._tags.parse_children(vals, xml)
         return cls(**vals)
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiMovieLinkedTitle:
     id: ids.ContentID
@@ -63,25 +57,27 @@ class SamuraiMovieLinkedTitle:
 
 @dataclass(frozen=True)
 class _SamuraiListMovieBaseMixin:
+    __slots__ = ()
+
     is_new: bool
     content_id: ids.ContentID
     name: str
     files: List[SamuraiMovieFile]
 
     @classmethod
-    def _try_parse_value(cls, vals: utils.misc.dotdict, child: lxml.objectify.ObjectifiedElement, tag: str, text: str, custom_types: CustomTypes) -> bool:
-        if 'is_new' not in vals:
-            xml = child.getparent()
-            vals.is_new = utils.misc.get_bool(xml.get('new'))
-            vals.content_id = ids.ContentID(xml.get('id'))
+    def _parse_attributes(cls, vals: parsing.TValues, xml: lxml.objectify.ObjectifiedElement) -> None:
+        vals['is_new'] = utils.misc.get_bool(xml.get('new'))
+        vals['content_id'] = ids.ContentID(xml.get('id'))
+
+    @classmethod
+    def _get_tag_handlers(cls, custom_types: CustomTypes) -> parsing.TTagHandlers:
+        def files(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
+            vals['files'] = [SamuraiMovieFile._parse(el) for el in getattr(child, 'file', [])]
 
-        if tag == 'name':
-            vals.name = text
-        elif tag == 'files':
-            vals.files = [SamuraiMovieFile._parse(el) for el in getattr(child, 'file', [])]
-        else:
-            return False
-        return True
+        return {
+            'name': parsing.text_value('name'),
+            'files': files
+        }
 
 
 _TRating = TypeVar('_TRating', bound=common.SamuraiRating)
@@ -89,6 +85,8 @@ _TRating = TypeVar('_TRating', bound=common.SamuraiRating)
 
 @dataclass(frozen=True)
 class _SamuraiListMovieOptionalMixin(Generic[_TRating]):
+    __slots__ = ()
+
     icon_url: Optional[str] = None
     banner_url: Optional[str] = None
     thumbnail_url: Optional[str] = None  # shop ID 1 only (?)
@@ -96,52 +94,45 @@ class _SamuraiListMovieOptionalMixin(Generic[_TRating]):
     rating_info: Optional[_TRating] = None
 
     @classmethod
-    def _try_parse_value(cls, vals: utils.misc.dotdict, child: lxml.objectify.ObjectifiedElement, tag: str, text: str, custom_types: CustomTypes) -> bool:
-        if tag == 'icon_url':
-            vals.icon_url = text
-        elif tag == 'banner_url':
-            vals.banner_url = text
-        elif tag == 'thumbnail_url':
-            vals.thumbnail_url = text
-        elif tag == 'title':
+    def _get_tag_handlers(cls, custom_types: CustomTypes) -> parsing.TTagHandlers:
+        def title(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
             xmlutils.validate_schema(child, {'name': None, 'icon_url': None, 'banner_url': None, 'thumbnails': {'thumbnail': None}}, True)
             if hasattr(child, 'thumbnails'):
                 thumbnails = [common.SamuraiThumbnail._parse(t) for t in child.thumbnails.thumbnail]
             else:
                 thumbnails = []
-            vals.title = SamuraiMovieLinkedTitle(
+            vals['title'] = SamuraiMovieLinkedTitle(
                 ids.ContentID(child.get('id')),
                 child.name.text,
                 xmlutils.get_text(child, 'icon_url'),
                 xmlutils.get_text(child, 'banner_url'),
                 thumbnails
             )
-        elif tag == 'rating_info':
-            vals.rating_info = custom_types['rating_info']._parse(child)
-        else:
-            return False
-        return True
+
+        return {
+            'icon_url': parsing.text_value('icon_url'),
+            'banner_url': parsing.text_value('banner_url'),
+            'thumbnail_url': parsing.text_value('thumbnail_url'),
+            'title': title,
+            'rating_info': parsing.cached_element_value('rating_info', custom_types['rating_info']._parse)
+        }
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiListMovie(_SamuraiListMovieOptionalMixin[common.SamuraiRating], _SamuraiListMovieBaseMixin):
+    _tags: ClassVar[parsing.TagDispatchTable] = parsing.TagDispatchTable(
+        _SamuraiListMovieBaseMixin._get_tag_handlers({}),
+        _SamuraiListMovieOptionalMixin._get_tag_handlers({
+            'rating_info': common.SamuraiRating
+        })
+    )
+
     @classmethod
     def _parse(cls, xml: lxml.objectify.ObjectifiedElement) -> 'SamuraiListMovie':
-        vals = utils.misc.dotdict()
-
-        for child, tag, text in xmlutils.iter_children(xml):
-            if _SamuraiListMovieBaseMixin._try_parse_value(vals, child, tag, text, {}):
-                pass
-            elif _SamuraiListMovieOptionalMixin._try_parse_value(
-                vals, child, tag, text,
-                {
-                    'rating_info': common.SamuraiRating
-                }
-            ):
-                pass
-            else:
-                raise ValueError(f'unknown tag: {tag}')
-
+        vals = {}  # type: parsing.TValues
+        cls._parse_attributes(vals, xml)
+        cls._tags.parse_children(vals, xml)
         return cls(**vals)
 
 
@@ -150,4 +141,8 @@ class SamuraiMoviesList(common.SamuraiListBaseType):
 
     def _read_list(self, xml):
         assert xml.tag == 'contents'
-        self.movies = [SamuraiListMovie._parse(content.movie) for content in xml.content]
+        self.movies = [self._parse_content(content) for content in xml.content]
+
+    @staticmethod
+    def _parse_content(content: lxml.objectify.ObjectifiedElement) -> SamuraiListMovie:
+        return SamuraiListMovie._parse(content.movie)
@@ -0,0 +1,127 @@
+import lxml.etree
+import lxml.objectify
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple, Type, TypeVar
+
+import reqcli.utils.xml as xmlutils
+
+from ... import utils
+
+
+# values are collected in a plain dict and passed to the dataclass constructor afterwards;
+#  a slots-based positional builder was measured to save <0.5% of the per-item parse time
+#  (see benchmarks/samurai_parsing.py), not worth the extra per-class code
+TValues = Dict[str, Any]
+TTagHandler = Callable[[TValues, lxml.objectify.ObjectifiedElement, Optional[str]], None]
+TTagHandlers = Dict[str, TTagHandler]
+
+
+# list pages are parsed into plain `ObjectifiedElement`s instead of using the default objectify lookup,
+#  which guesses the data type of every leaf element (`StringElement`, `IntElement`, ...) when creating it;
+#  that made up more than half of the per-item parse time, while the parsers only ever use `.text`
+ELEMENT_LOOKUP = lxml.etree.ElementDefaultClassLookup(element=lxml.objectify.ObjectifiedElement)
+
+
+def create_parser() -> lxml.etree.XMLParser:
+    parser = lxml.etree.XMLParser(remove_blank_text=True)
+    parser.set_element_class_lookup(ELEMENT_LOOKUP)
+    return parser
+
+
+_TXmlRecord = TypeVar('_TXmlRecord', bound='XmlRecord')
+
+
+class XmlRecord:
+    '''
+    Same interface as reqcli's `XmlBaseType` (schema validation, `_parse_internal` returning the constructor arguments),
+    but with empty `__slots__`; `XmlBaseType` doesn't define any, which would give every slotted record a `__dict__` again
+    '''
+
+    __slots__ = ()
+
+    @classmethod
+    def _get_schema(cls) -> Tuple[Dict[str, Any], bool]:
+        raise NotImplementedError
+
+    @classmethod
+    def _parse_internal(cls, xml: lxml.objectify.ObjectifiedElement) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    @classmethod
+    def _parse(cls: Type[_TXmlRecord], xml: lxml.objectify.ObjectifiedElement) -> _TXmlRecord:
+        schema, superset = cls._get_schema()
+        xmlutils.validate_schema(xml, schema, superset)
+        return cls(**cls._parse_internal(xml))  # type: ignore
+
+
+class TagDispatchTable:
+    '''
+    Precompiled mapping of child tag -> handler, used for parsing elements in
+    a single dict lookup per child instead of walking if/elif chains through several classes
+    '''
+
+    def __init__(self, *handlers: Mapping[str, TTagHandler]):
+        self._handlers = {}  # type: TTagHandlers
+        for h in handlers:
+            duplicates = self._handlers.keys() & h.keys()
+            if duplicates:
+                raise RuntimeError(f'duplicate tag handlers: {duplicates}')
+            self._handlers.update(h)
+
+    def parse_children(self, vals: TValues, xml: lxml.objectify.ObjectifiedElement) -> TValues:
+        handlers = self._handlers
+        for child, tag, text in xmlutils.iter_children(xml):
+            handler = handlers.get(tag)
+            if handler is None:
+                raise ValueError(f'unknown tag: {tag}')
+            handler(vals, child, text)
+        return vals
+
+
+# handler factories for common cases
+
+def text_value(field: str, intern: bool = False) -> TTagHandler:
+    def handler(vals: TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
+        vals[field] = text
+
+    # for values repeated across many elements
+    def handler_intern(vals: TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
+        vals[field] = utils.misc.intern_str(text)
+
+    return handler_intern if intern else handler
+
+
+def bool_value(field: str) -> TTagHandler:
+    def handler(vals: TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
+        vals[field] = utils.misc.get_bool(text)  # type: ignore
+    return handler
+
+
+def int_value(field: str) -> TTagHandler:
+    def handler(vals: TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
+        vals[field] = int(text)  # type: ignore
+    return handler
+
+
+def element_value(field: str, parse: Callable[[lxml.objectify.ObjectifiedElement], Any]) -> TTagHandler:
+    def handler(vals: TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
+        vals[field] = parse(child)
+    return handler
+
+
+def cached_element_value(field: str, parse: Callable[[lxml.objectify.ObjectifiedElement], Any], maxsize: int = 1024) -> TTagHandler:
+    '''
+    Same as `element_value`, for elements that are repeated across many items (e.g. ratings and platforms).
+    Identical elements map to the same (shared) parsed value, which is only parsed and validated once
+    '''
+
+    @utils.misc.bounded_cache(maxsize)
+    def parse_serialized(data: bytes) -> Any:
+        return parse(lxml.etree.fromstring(data, create_parser()))
+
+    def handler(vals: TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
+        vals[field] = parse_serialized(lxml.etree.tostring(child, with_tail=False))
+    return handler
+
+
+def ignore_value(vals: TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
+    pass
@@ -1,15 +1,16 @@
 import re
 import lxml.objectify
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import ClassVar, List, Optional, Tuple
 
 import reqcli.utils.xml as xmlutils
-from reqcli.type import BaseTypeLoadable, XmlBaseType
+from reqcli.type import BaseTypeLoadable
 
-from . import common, movie_list, title_list
+from . import common, movie_list, parsing, title_list
 from ... import utils, ids
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiTitleStars(common.SamuraiStars):
     @classmethod
@@ -23,8 +24,9 @@ class SamuraiTitleStars(common.SamuraiStars):
         return super()._parse_internal(xml)
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
-class SamuraiTitleFeature(XmlBaseType):
+class SamuraiTitleFeature(parsing.XmlRecord):
     required: bool
     type: int
     id: int
@@ -50,12 +52,14 @@ class SamuraiTitleFeature(XmlBaseType):
         }
 
 
+@utils.misc.add_slots
 @dataclass
 class SamuraiTitleLanguage:
     iso_code: str
     name: str
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiTitleController:
     required: bool
@@ -65,6 +69,7 @@ class SamuraiTitleController:
     icons: Optional[List[common.SamuraiIcon]]
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiTitlePlayStyle:
     type: str
@@ -72,24 +77,28 @@ class SamuraiTitlePlayStyle:
     features: List[SamuraiTitleFeature]
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiTitlePreferenceTarget:
     everyone: int
     gamers: int
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiTitlePreferenceStyle:
     casual: int
     intense: int
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiTitlePreference:
     target_player: SamuraiTitlePreferenceTarget
     play_style: SamuraiTitlePreferenceStyle
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiTitleWebsite:
     name: str
@@ -97,6 +106,7 @@ class SamuraiTitleWebsite:
     official: bool
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiTitleLinkedDemo:
     content_id: ids.ContentID
@@ -104,6 +114,7 @@ class SamuraiTitleLinkedDemo:
     icon_url: Optional[str]
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiTitleScreenshot(common.SamuraiScreenshot):
     thumbnail_url: Optional[common.SamuraiScreenshotUrl] = None
@@ -121,8 +132,9 @@ class SamuraiTitleScreenshot(common.SamuraiScreenshot):
         }
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
-class SamuraiSharedMovie(XmlBaseType):
+class SamuraiSharedMovie(parsing.XmlRecord):
     name: str
     url: str  # not a real url, at least not with `shared_site = 'youtube'` (in which case it's actually the video ID)
     official: bool
@@ -142,6 +154,7 @@ class SamuraiSharedMovie(XmlBaseType):
         }
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiTitleNotice:
     type: str
@@ -150,26 +163,35 @@ class SamuraiTitleNotice:
     description: str
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiDigitalManual:
     name: str
     url: str
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiDownloadCardSales:
     available: bool
     image_url: Optional[str]
 
 
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiTitleCopyright:
     text: str
     image_url: str
 
 
+_num_players_regex = re.compile(r'(\d+)(?:\s*-\s*(\d+))?')
+_cjk_regex = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f]')
+
+
 @dataclass(frozen=True)
 class _SamuraiTitleBaseMixin(title_list._SamuraiListTitleBaseMixin):
+    __slots__ = ()
+
     is_public: bool
     formal_name: str
     genres: List[common.IDName]
@@ -179,37 +201,43 @@ class _SamuraiTitleBaseMixin(title_list._SamuraiListTitleBaseMixin):
     sales_download_card: SamuraiDownloadCardSales
 
     @classmethod
-    def _try_parse_value(cls, vals: utils.misc.dotdict, child: lxml.objectify.ObjectifiedElement, tag: str, text: str, custom_types: title_list.CustomTypes) -> bool:
-        if 'is_public' not in vals:
-            xml = child.getparent()
-            vals.is_public = utils.misc.get_bool(xml.get('public'))
-
-        if tag == 'formal_name':
-            vals.formal_name = text
-        elif tag == 'genres':
-            vals.genres = []
+    def _parse_attributes(cls, vals: parsing.TValues, xml: lxml.objectify.ObjectifiedElement) -> None:
+        super()._parse_attributes(vals, xml)
+        vals['is_public'] = utils.misc.get_bool(xml.get('public'))
+
+    @classmethod
+    def _get_tag_handlers(cls, custom_types: title_list.CustomTypes) -> parsing.TTagHandlers:
+        def genres(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
+            vals['genres'] = []
             for genre in child.genre:
                 xmlutils.validate_schema(genre, {'name': None}, False)
-                vals.genres.append(common.IDName(int(genre.get('id')), genre.name.text))
-        elif tag == 'keywords':
-            vals.keywords = [keyword.text for keyword in getattr(child, 'keyword', [])]
-        elif tag == 'ticket_available':
-            vals.has_ticket = utils.misc.get_bool(text)
-        elif tag == 'download_code_sales':
-            vals.sales_download_code = utils.misc.get_bool(text)
-        elif tag == 'download_card_sales':
+                vals['genres'].append(common.IDName._get(int(genre.get('id')), genre.name.text))
+
+        def keywords(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
+            vals['keywords'] = [keyword.text for keyword in getattr(child, 'keyword', [])]
+
+        def download_card_sales(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
             xmlutils.validate_schema(child, {'image_url': None}, True)
-            vals.sales_download_card = SamuraiDownloadCardSales(
+            vals['sales_download_card'] = SamuraiDownloadCardSales(
                 utils.misc.get_bool(child.get('available')),
                 xmlutils.get_text(child, 'image_url')
             )
-        else:
-            return super()._try_parse_value(vals, child, tag, text, custom_types)
-        return True
+
+        return {
+            **super()._get_tag_handlers(custom_types),
+            'formal_name': parsing.text_value('formal_name'),
+            'genres': genres,
+            'keywords': keywords,
+            'ticket_available': parsing.bool_value('has_ticket'),
+            'download_code_sales': parsing.bool_value('sales_download_code'),
+            'download_card_sales': download_card_sales
+        }
 
 
 @dataclass(frozen=True)
 class _SamuraiTitleOptionalMixin(title_list._SamuraiListTitleOptionalMixin[common.SamuraiRatingDetailed, SamuraiTitleStars]):
+    __slots__ = ()
+
     package_url: Optional[str] = None
     thumbnails: Optional[List[common.SamuraiThumbnail]] = None  # shop ID 1 only (?)
     hero_banner_url: Optional[str] = None
@@ -246,31 +274,24 @@ class _SamuraiTitleOptionalMixin(title_list._SamuraiListTitleOptionalMixin[commo
     aoc_infos: Optional[str] = None
 
     @classmethod
-    def _try_parse_value(cls, vals: utils.misc.dotdict, child: lxml.objectify.ObjectifiedElement, tag: str, text: str, custom_types: title_list.CustomTypes) -> bool:
-        if tag == 'package_url':
-            vals.package_url = text
-        elif tag == 'thumbnails':
-            vals.thumbnails = [common.SamuraiThumbnail._parse(t) for t in child.thumbnail]
-        elif tag == 'hero_banner_url':
-            vals.hero_banner_url = text
-        elif tag == 'web_sales':
-            vals.sales_web = utils.misc.get_bool(text)
-        elif tag == 'top_image':
+    def _get_tag_handlers(cls, custom_types: title_list.CustomTypes) -> parsing.TTagHandlers:
+        def thumbnails(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
+            vals['thumbnails'] = [common.SamuraiThumbnail._parse(t) for t in child.thumbnail]
+
+        def top_image(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
             xmlutils.validate_schema(child, {'type': None, 'url': None}, False)
-            vals.top_image_type = child.type.text
-            vals.top_image_url = child.url.text
-        elif tag == 'description':
-            vals.description = text
-        elif tag == 'price_description':
-            vals.price_description = text
-        elif tag == 'features':
-            vals.features = [SamuraiTitleFeature._parse(feature) for feature in child.feature]
-        elif tag == 'play_styles':
+            vals['top_image_type'] = child.type.text
+            vals['top_image_url'] = child.url.text
+
+        def features(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
+            vals['features'] = [SamuraiTitleFeature._parse(feature) for feature in child.feature]
+
+        def play_styles(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
             xmlutils.validate_schema(child, {'play_style': {
                 'controllers': {'controller': {'id': None, 'name': None, 'icons': {'icon': None}}},
                 'features': {'feature': SamuraiTitleFeature._get_schema()[0]}}
             }, True)
-            vals.play_styles = []
+            vals['play_styles'] = []
             for play_style in child.play_style:
                 if hasattr(play_style, 'controllers'):
                     controllers = [
@@ -278,7 +299,7 @@ class _SamuraiTitleOptionalMixin(title_list._SamuraiListTitleOptionalMixin[commo
                             utils.misc.get_bool(controller.get('required')),
                             int(controller.get('type')),
                             int(controller.id.text),
-                            controller.name.text,
+                            utils.misc.intern_str(controller.name.text),
                             [common.SamuraiIcon._parse(icon) for icon in controller.icons.icon] if hasattr(controller, 'icons') else None
                         )
                         for controller in play_style.controllers.controller
@@ -289,54 +310,62 @@ class _SamuraiTitleOptionalMixin(title_list._SamuraiListTitleOptionalMixin[commo
                     features = [SamuraiTitleFeature._parse(feature) for feature in play_style.features.feature]
                 else:
                     features = []
-                vals.play_styles.append(SamuraiTitlePlayStyle(play_style.get('type'), controllers, features))
-        elif tag == 'languages':
-            vals.languages = []
+                vals['play_styles'].append(SamuraiTitlePlayStyle(play_style.get('type'), controllers, features))
+
+        def languages(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
+            vals['languages'] = []
             for language in child.language:
                 xmlutils.validate_schema(language, {'iso_code': None, 'name': None}, False)
-                vals.languages.append(SamuraiTitleLanguage(language.iso_code.text, language.name.text))
-        elif tag == 'number_of_players':
+                vals['languages'].append(SamuraiTitleLanguage(utils.misc.intern_str(language.iso_code.text), utils.misc.intern_str(language.name.text)))
+
+        def number_of_players(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
+            assert text is not None
             # sometimes this field contains additional text in a second line, discard it for now and use the first non-empty line
             cleaned_text = next(line for line in text.replace('<br>', '\n').split('\n') if line)
-            matches = re.search(r'(\d+)(?:\s*-\s*(\d+))?', cleaned_text)
+            matches = _num_players_regex.search(cleaned_text)
             if matches:
-                vals.num_players = (int(matches[1]), int(matches[2] or matches[1]))
+                vals['num_players'] = (int(matches[1]), int(matches[2] or matches[1]))
             elif cleaned_text.startswith('*'):  # disclaimer instead of specific player numbers (example: 50010000037675)
-                vals.num_players = None
-            elif re.search(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f]', cleaned_text):  # ignore errors if text contains japanese/chinese/korean characters
-                vals.num_players = None
+                vals['num_players'] = None
+            elif _cjk_regex.search(cleaned_text):  # ignore errors if text contains japanese/chinese/korean characters
+                vals['num_players'] = None
             else:
                 raise RuntimeError(f'Could not parse player details: {text}')
-            vals.num_players_raw = text
-        elif tag == 'disclaimer':
-            vals.disclaimer = text
-        elif tag == 'copyright':
+            vals['num_players_raw'] = text
+
+        def copyright(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
             xmlutils.validate_schema(child, {'text': None, 'image_url': None}, True)
-            vals.copyright = SamuraiTitleCopyright(child.find('text').text, xmlutils.get_text(child, 'image_url'))
-        elif tag == 'screenshots':
-            vals.screenshots = [SamuraiTitleScreenshot._parse(screenshot) for screenshot in child.screenshot]
-        elif tag == 'main_images':
-            vals.main_images = [SamuraiTitleScreenshot._parse(image) for image in child.image]
-        elif tag == 'preference':
+            vals['copyright'] = SamuraiTitleCopyright(child.find('text').text, xmlutils.get_text(child, 'image_url'))
+
+        def screenshots(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
+            vals['screenshots'] = [SamuraiTitleScreenshot._parse(screenshot) for screenshot in child.screenshot]
+
+        def main_images(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
+            vals['main_images'] = [SamuraiTitleScreenshot._parse(image) for image in child.image]
+
+        def preference(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
             target = child.find('target_player')
             style = child.find('play_style')
-            vals.preferences = SamuraiTitlePreference(
+            vals['preferences'] = SamuraiTitlePreference(
                 SamuraiTitlePreferenceTarget(int(target.everyone.text), int(target.gamers.text)),
                 SamuraiTitlePreferenceStyle(int(style.casual.text), int(style.intense.text))
             )
-        elif tag == 'web_sites':
-            vals.websites = []
+
+        def web_sites(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
+            vals['websites'] = []
             for website in child.web_site:
                 xmlutils.validate_schema(website, {'name': None, 'url': None, 'official': None}, False)
-                vals.websites.append(SamuraiTitleWebsite(
+                vals['websites'].append(SamuraiTitleWebsite(
                     website.name.text,
                     website.url.text,
                     utils.misc.get_bool(website.official.text)
                 ))
-        elif tag == 'movies':
-            vals.movies = [movie_list.SamuraiListMovie._parse(m) for m in child.movie]
-        elif tag == 'demo_titles':
-            vals.demos = [
+
+        def movies(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
+            vals['movies'] = [movie_list.SamuraiListMovie._parse(m) for m in child.movie]
+
+        def demo_titles(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
+            vals['demos'] = [
                 SamuraiTitleLinkedDemo(
                     ids.ContentID(demo.get('id')),
                     demo.name.text,
@@ -344,27 +373,13 @@ class _SamuraiTitleOptionalMixin(title_list._SamuraiListTitleOptionalMixin[commo
                 )
                 for demo in child.demo_title
             ]
-        elif tag == 'peripheral_description':
-            vals.peripheral_description = text
-        elif tag == 'network_feature_description':
-            vals.network_feature_description = text
-        elif tag == 'spec_description':
-            vals.spec_description = text
-        elif tag == 'data_size':
-            vals.size = int(text)
-        elif tag == 'alternate_rating_image_url':
-            vals.rating_info_alternate_image_url = text
-        elif tag == 'save_data_count':
-            vals.save_data_count = text
-        elif tag == 'save_data_volume':
-            vals.save_data_volume = text
-        elif tag == 'catch_copy':
-            vals.catch_copy = text
-        elif tag == 'shared_movies':
-            vals.shared_movies = [SamuraiSharedMovie._parse(movie) for movie in child.shared_movie]
-        elif tag == 'title_notices':
+
+        def shared_movies(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
+            vals['shared_movies'] = [SamuraiSharedMovie._parse(movie) for movie in child.shared_movie]
+
+        def title_notices(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
             xmlutils.validate_schema(child, {'title_notice': {'url': None, 'display_name': None, 'description': None}}, False)
-            vals.title_notices = [
+            vals['title_notices'] = [
                 SamuraiTitleNotice(
                     notice.get('type'),
                     notice.url.text,
@@ -373,40 +388,69 @@ class _SamuraiTitleOptionalMixin(title_list._SamuraiListTitleOptionalMixin[commo
                 )
                 for notice in child.title_notice
             ]
-        elif tag == 'title_metas':
+
+        def title_metas(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
             xmlutils.validate_schema(child, {'title_meta': {'value': None}}, False)
-            vals.title_metas = [(m.get('type'), m.value.text) for m in child.title_meta]
-        elif tag == 'digital_manuals':
+            vals['title_metas'] = [(m.get('type'), m.value.text) for m in child.title_meta]
+
+        def digital_manuals(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
             xmlutils.validate_schema(child, {'digital_manual': {'name': None, 'url': None}}, False)
-            vals.digital_manuals = [SamuraiDigitalManual(manual.name.text, manual.url.text) for manual in child.digital_manual]
-        elif tag == 'aoc_infos':
-            vals.aoc_infos = text
-        else:
-            return super()._try_parse_value(vals, child, tag, text, custom_types)
-        return True
+            vals['digital_manuals'] = [SamuraiDigitalManual(manual.name.text, manual.url.text) for manual in child.digital_manual]
+
+        return {
+            **super()._get_tag_handlers(custom_types),
+            'package_url': parsing.text_value('package_url'),
+            'thumbnails': thumbnails,
+            'hero_banner_url': parsing.text_value('hero_banner_url'),
+            'web_sales': parsing.bool_value('sales_web'),
+            'top_image': top_image,
+            'description': parsing.text_value('description'),
+            'price_description': parsing.text_value('price_description'),
+            'features': features,
+            'play_styles': play_styles,
+            'languages': languages,
+            'number_of_players': number_of_players,
+            'disclaimer': parsing.text_value('disclaimer'),
+            'copyright': copyright,
+            'screenshots': screenshots,
+            'main_images': main_images,
+            'preference': preference,
+            'web_sites': web_sites,
+            'movies': movies,
+            'demo_titles': demo_titles,
+            'peripheral_description': parsing.text_value('peripheral_description'),
+            'network_feature_description': parsing.text_value('network_feature_description'),
+            'spec_description': parsing.text_value('spec_description'),
+            'data_size': parsing.int_value('size'),
+            'alternate_rating_image_url': parsing.text_value('rating_info_alternate_image_url'),
+            'save_data_count': parsing.text_value('save_data_count'),
+            'save_data_volume': parsing.text_value('save_data_volume'),
+            'catch_copy': parsing.text_value('catch_copy'),
+            'shared_movies': shared_movies,
+            'title_notices': title_notices,
+            'title_metas': title_metas,
+            'digital_manuals': digital_manuals,
+            'aoc_infos': parsing.text_value('aoc_infos')
+        }
 
 
 # TODO: DRY (title.py, movie.py)
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiTitleElement(_SamuraiTitleOptionalMixin, _SamuraiTitleBaseMixin):
+    _tags: ClassVar[parsing.TagDispatchTable] = parsing.TagDispatchTable(
+        _SamuraiTitleBaseMixin._get_tag_handlers({}),
+        _SamuraiTitleOptionalMixin._get_tag_handlers({
+            'rating_info': common.SamuraiRatingDetailed,
+            'rating_stars': SamuraiTitleStars
+        })
+    )
+
     @classmethod
     def _parse(cls, xml: lxml.objectify.ObjectifiedElement) -> 'SamuraiTitleElement':
-        vals = utils.misc.dotdict()
-
-        for child, tag, text in xmlutils.iter_children(xml):
-            if _SamuraiTitleBaseMixin._try_parse_value(vals, child, tag, text, {}):
-                pass
-            elif _SamuraiTitleOptionalMixin._try_parse_value(
-                vals, child, tag, text,
-                {
-                    'rating_info': common.SamuraiRatingDetailed,
-                    'rating_stars': SamuraiTitleStars
-                }
-            ):
-                pass
-            else:
-                raise ValueError(f'unknown tag: {tag}')
-
+        vals = {}  # type: parsing.TValues
+        cls._parse_attributes(vals, xml)
+        cls._tags.parse_children(vals, xml)
         return cls(**vals)
 
 
@@ -1,11 +1,11 @@
 import lxml.objectify
 from dataclasses import dataclass
-from typing import Generic, List, Optional, Type, TypeVar
+from typing import ClassVar, Generic, List, Optional, Type, TypeVar
 from typing_extensions import TypedDict
 
 import reqcli.utils.xml as xmlutils
 
-from . import common
+from . import common, parsing
 from ... import utils, ids
 
 
@@ -21,6 +21,8 @@ CustomTypes = TypedDict(
 
 @dataclass(frozen=True)
 class _SamuraiListTitleBaseMixin:
+    __slots__ = ()
+
     is_new: bool
     content_id: ids.ContentID
     product_code: str
@@ -36,43 +38,31 @@ class _SamuraiListTitleBaseMixin:
     has_iap__inaccurate: bool
 
     @classmethod
-    def _try_parse_value(cls, vals: utils.misc.dotdict, child: lxml.objectify.ObjectifiedElement, tag: str, text: str, custom_types: CustomTypes) -> bool:
-        # kind of hacky, but it works
-        if 'is_new' not in vals:
-            xml = child.getparent()
-            vals.is_new = utils.misc.get_bool(xml.get('new'))
-            vals.content_id = ids.ContentID(xml.get('id'))
-
-        if tag == 'product_code':
-            vals.product_code = text
-        elif tag == 'name':
-            vals.name = text
-        elif tag == 'platform':
-            vals.platform = common.SamuraiPlatform._parse(child)
-        elif tag == 'publisher':
+    def _parse_attributes(cls, vals: parsing.TValues, xml: lxml.objectify.ObjectifiedElement) -> None:
+        vals['is_new'] = utils.misc.get_bool(xml.get('new'))
+        vals['content_id'] = ids.ContentID(xml.get('id'))
+
+    @classmethod
+    def _get_tag_handlers(cls, custom_types: CustomTypes) -> parsing.TTagHandlers:
+        def publisher(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
             xmlutils.validate_schema(child, {'name': None}, False)
-            vals.publisher = common.IDName(int(child.get('id')), child.name.text)
-        elif tag == 'display_genre':
-            vals.genre = text
-        elif tag == 'retail_sales':
-            vals.sales_retail = utils.misc.get_bool(text)
-        elif tag == 'eshop_sales':
-            vals.sales_eshop = utils.misc.get_bool(text)
-        elif tag == 'demo_available':
-            vals.has_demo = utils.misc.get_bool(text)
-        elif tag == 'aoc_available':
-            vals.has_dlc__inaccurate = utils.misc.get_bool(text)
-        elif tag == 'in_app_purchase':
-            vals.has_iap__inaccurate = utils.misc.get_bool(text)
-        elif tag == 'release_date_on_original':
-            pass  # unused
-        elif tag == 'price_on_retail':
-            pass  # unused
-        elif tag == 'tentative_price_on_eshop':
-            pass  # unused
-        else:
-            return False
-        return True
+            vals['publisher'] = common.IDName._get(int(child.get('id')), child.name.text)
+
+        return {
+            'product_code': parsing.text_value('product_code'),
+            'name': parsing.text_value('name'),
+            'platform': parsing.cached_element_value('platform', common.SamuraiPlatform._parse),
+            'publisher': publisher,
+            'display_genre': parsing.text_value('genre', intern=True),
+            'retail_sales': parsing.bool_value('sales_retail'),
+            'eshop_sales': parsing.bool_value('sales_eshop'),
+            'demo_available': parsing.bool_value('has_demo'),
+            'aoc_available': parsing.bool_value('has_dlc__inaccurate'),
+            'in_app_purchase': parsing.bool_value('has_iap__inaccurate'),
+            'release_date_on_original': parsing.ignore_value,  # unused
+            'price_on_retail': parsing.ignore_value,  # unused
+            'tentative_price_on_eshop': parsing.ignore_value  # unused
+        }
 
 
 _TRating = TypeVar('_TRating', bound=common.SamuraiRating)
@@ -81,6 +71,8 @@ _TStars = TypeVar('_TStars', bound=common.SamuraiStars)
 
 @dataclass(frozen=True)
 class _SamuraiListTitleOptionalMixin(Generic[_TRating, _TStars]):
+    __slots__ = ()
+
     icon_url: Optional[str] = None
     banner_url: Optional[str] = None
     rating_info: Optional[_TRating] = None
@@ -92,50 +84,41 @@ class _SamuraiListTitleOptionalMixin(Generic[_TRating, _TStars]):
     # have to specify generic parameters twice: in base class definition and in custom_types parameter;
     # classmethods don't have access to the generic parameters of their classes for some reason, see https://github.com/python/typing/issues/629
     @classmethod
-    def _try_parse_value(cls, vals: utils.misc.dotdict, child: lxml.objectify.ObjectifiedElement, tag: str, text: str, custom_types: CustomTypes) -> bool:
-        if tag == 'icon_url':
-            vals.icon_url = text
-        elif tag == 'banner_url':
-            vals.banner_url = text
-        elif tag == 'rating_info':
-            vals.rating_info = custom_types['rating_info']._parse(child)
-        elif tag == 'star_rating_info':
-            vals.rating_stars = custom_types['rating_stars']._parse(child)
-        elif tag == 'release_date_on_eshop':
-            vals.release_date_eshop = text
-        elif tag == 'release_date_on_retail':
-            vals.release_date_retail = text
-        elif tag == 'price_on_retail_detail':
+    def _get_tag_handlers(cls, custom_types: CustomTypes) -> parsing.TTagHandlers:
+        def price_retail(vals: parsing.TValues, child: lxml.objectify.ObjectifiedElement, text: Optional[str]) -> None:
             xmlutils.validate_schema(child, {'amount': None, 'currency': None, 'raw_value': None}, True)
-            vals.price_retail = common.SamuraiPrice(
+            vals['price_retail'] = common.SamuraiPrice(
                 float(child.raw_value.text) if hasattr(child, 'raw_value') else None,
-                child.currency
+                child.currency.text
             )
-        else:
-            return False
-        return True
 
+        return {
+            'icon_url': parsing.text_value('icon_url'),
+            'banner_url': parsing.text_value('banner_url'),
+            'rating_info': parsing.cached_element_value('rating_info', custom_types['rating_info']._parse),
+            'star_rating_info': parsing.element_value('rating_stars', custom_types['rating_stars']._parse),
+            'release_date_on_eshop': parsing.text_value('release_date_eshop'),
+            'release_date_on_retail': parsing.text_value('release_date_retail'),
+            'price_on_retail_detail': price_retail
+        }
 
+
+@utils.misc.add_slots
 @dataclass(frozen=True)
 class SamuraiListTitle(_SamuraiListTitleOptionalMixin[common.SamuraiRating, common.SamuraiStars], _SamuraiListTitleBaseMixin):
+    _tags: ClassVar[parsing.TagDispatchTable] = parsing.TagDispatchTable(
+        _SamuraiListTitleBaseMixin._get_tag_handlers({}),
+        _SamuraiListTitleOptionalMixin._get_tag_handlers({
+            'rating_info': common.SamuraiRating,
+            'rating_stars': common.SamuraiStars
+        })
+    )
+
     @classmethod
     def _parse(cls, xml: lxml.objectify.ObjectifiedElement) -> 'SamuraiListTitle':
-        vals = utils.misc.dotdict()
-
-        for child, tag, text in xmlutils.iter_children(xml):
-            if _SamuraiListTitleBaseMixin._try_parse_value(vals, child, tag, text, {}):
-                pass
-            elif _SamuraiListTitleOptionalMixin._try_parse_value(
-                vals, child, tag, text,
-                {
-                    'rating_info': common.SamuraiRating,
-                    'rating_stars': common.SamuraiStars
-                }
-            ):
-                pass
-            else:
-                raise ValueError(f'unknown tag: {tag}')
-
+        vals = {}  # type: parsing.TValues
+        cls._parse_attributes(vals, xml)
+        cls._tags.parse_children(vals, xml)
         return cls(**vals)
 
 
@@ -144,4 +127,8 @@ class SamuraiTitlesList(common.SamuraiListBaseType):
 
     def _read_list(self, xml):
         assert xml.tag == 'contents'
-        self.titles = [SamuraiListTitle._parse(content.title) for content in xml.content]
+        self.titles = [self._parse_content(content) for content in xml.content]
+
+    @staticmethod
+    def _parse_content(content: lxml.objectify.ObjectifiedElement) -> SamuraiListTitle:
+        return SamuraiListTitle._parse(content.title)
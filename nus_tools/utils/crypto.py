@@ -1,15 +1,21 @@
+import os
 import logging
 import hashlib
-from typing import Any, Callable, List, Optional, Union, cast
+import functools
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple, Union, cast
 from constructutils.checksum import ChecksumVerifyError
 
 from Crypto.Cipher import AES as _AES
 from Crypto.Cipher._mode_cbc import CbcMode
+from Crypto.Cipher._mode_ecb import EcbMode
+from Crypto.Util.strxor import strxor
 
 from Crypto.PublicKey import RSA as _RSA
 from Crypto.Signature import pkcs1_15
 from Crypto.Hash import SHA1, SHA256
 
+from . import misc
 from .. import ids
 from ..config import Configuration
 from ..structs.common import SignatureAlgorithm
@@ -23,22 +29,75 @@ class AES:
     def cbc(cls, key: bytes, iv: bytes) -> CbcMode:
         return cls.__get_inst(key, _AES.MODE_CBC, iv)
 
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def ecb(key: bytes) -> EcbMode:
+        # ECB objects are stateless, so they (and their expanded keys) can be shared
+        return _AES.new(key=key, mode=_AES.MODE_ECB)
+
     @staticmethod
     def __get_inst(key: bytes, mode: int, iv: Optional[bytes] = None) -> Any:
         return _AES.new(key=key, mode=mode, iv=cast(bytes, iv))
 
 
+class CBCDecryptor:
+    '''
+    CBC decryption on top of a cached ECB cipher.
+
+    Unlike `CbcMode` objects, the IV can be reset without running the key expansion again,
+    which matters when changing IVs for every (small) block
+    '''
+
+    def __init__(self, key: bytes, iv: bytes = bytes(16)):
+        self._ecb = AES.ecb(key)
+        self._iv = iv
+
+    def reset(self, iv: bytes) -> None:
+        self._iv = iv
+
+    def decrypt(self, data: bytes) -> bytes:
+        if not data:
+            return b''
+        # P_i = D(C_i) ^ C_(i-1)
+        plain = strxor(self._ecb.decrypt(data), self._iv + memoryview(data)[:-16])
+        self._iv = data[-16:]
+        return plain
+
+
 class TitleKey:
     @classmethod
     def decrypt(cls, title_key: bytes, title_id: ids.TTitleIDInput) -> bytes:
-        return cls.__get_aes(title_id).decrypt(title_key)
+        return strxor(cls.__get_ecb(title_id).decrypt(title_key), cls.__get_iv(title_id))
 
     @classmethod
     def encrypt(cls, title_key: bytes, title_id: ids.TTitleIDInput) -> bytes:
-        return cls.__get_aes(title_id).encrypt(title_key)
+        return cls.__get_ecb(title_id).encrypt(strxor(title_key, cls.__get_iv(title_id)))
+
+    @classmethod
+    def decrypt_many(cls, items: Iterable[Tuple[bytes, ids.TTitleIDInput]]) -> List[bytes]:
+        '''
+        Decrypts many title keys at once, using a single ECB pass per common key
+        '''
+
+        title_items = [(key, ids.TitleID.get_inst(title_id)) for key, title_id in items]
+        results = [b''] * len(title_items)
+        # group by platform, i.e. common key
+        for _, group_it in misc.groupby_sorted(enumerate(title_items), key=lambda x: x[1][1].type.platform):
+            group = list(group_it)
+            ecb = cls.__get_ecb(group[0][1][1])
+            keys = b''.join(key for _, (key, _) in group)
+            ivs = b''.join(cls.__get_iv(title_id) for _, (_, title_id) in group)
+            plain = strxor(ecb.decrypt(keys), ivs)
+            for n, (i, _) in enumerate(group):
+                results[i] = plain[n * 16:(n + 1) * 16]
+        return results
 
     @staticmethod
-    def __get_aes(title_id: ids.TTitleIDInput) -> CbcMode:
+    def __get_iv(title_id: ids.TTitleIDInput) -> bytes:
+        return bytes(ids.TitleID.get_inst(title_id)) + bytes(8)
+
+    @staticmethod
+    def __get_ecb(title_id: ids.TTitleIDInput) -> EcbMode:
         title_id = ids.TitleID.get_inst(title_id)
         if title_id.type.platform == ids.TitlePlatform.WIIU:
             common_key = Configuration.keys.common_wiiu
@@ -46,7 +105,7 @@ class TitleKey:
             raise NotImplementedError
         else:
             assert False
-        return AES.cbc(common_key, bytes(title_id) + bytes(8))
+        return AES.ecb(common_key)
 
 
 #####
@@ -59,6 +118,35 @@ def verify_sha1(data: bytes, expected_hash: bytes) -> None:
         raise ChecksumVerifyError('hash mismatch', expected_hash, digest)
 
 
+# hashlib releases the GIL for larger inputs, so hashing multiple blocks can run in parallel;
+#  below this total size the thread overhead outweighs the gain
+_SHA1_PARALLEL_MIN_SIZE = 0x40000
+
+
+@misc.cache
+def _get_hash_executor() -> Optional[ThreadPoolExecutor]:
+    workers = min(os.cpu_count() or 1, 8)
+    return ThreadPoolExecutor(workers, thread_name_prefix='sha1') if workers > 1 else None
+
+
+def _sha1(data: bytes) -> bytes:
+    return hashlib.sha1(data).digest()
+
+
+def sha1_many(blocks: Sequence[bytes]) -> List[bytes]:
+    executor = _get_hash_executor()
+    if executor is None or sum(map(len, blocks)) < _SHA1_PARALLEL_MIN_SIZE:
+        return [_sha1(b) for b in blocks]
+    return list(executor.map(_sha1, blocks))
+
+
+def verify_sha1_many(blocks: Sequence[bytes], expected_hashes: Sequence[bytes]) -> None:
+    assert len(blocks) == len(expected_hashes)
+    for i, (digest, expected_hash) in enumerate(zip(sha1_many(blocks), expected_hashes)):
+        if digest != expected_hash:
+            raise ChecksumVerifyError(f'hash mismatch (block {i})', expected_hash, digest)
+
+
 #####
 # cert stuff
 #####
@@ -71,16 +159,70 @@ class MissingCertError(Exception):
     pass
 
 
+@misc.cache
+def _get_rsa_verifier(modulus: bytes, exponent: int) -> Any:
+    # reconstructing keys is relatively expensive, and there are only a handful of distinct keys
+    return pkcs1_15.new(_RSA.construct((
+        int.from_bytes(modulus, byteorder='big'),
+        exponent
+    )))
+
+
+class _VerificationCache:
+    '''
+    Keeps track of certificates whose signatures were already verified (up to the root key),
+    so subsequent chains containing the same certificates only require verifying the signature of the data itself
+    '''
+
+    def __init__(self):
+        self.enabled = True
+        self.cert_hits = 0
+        self.cert_misses = 0
+        self.__verified = set()  # type: Set[Tuple[bytes, bytes, bytes, int]]
+
+    @staticmethod
+    def _get_key(cert: Any, issuer_key: Any) -> Tuple[bytes, bytes, bytes, int]:
+        return (bytes(cert.__raw_cert__), bytes(cert.signature.data), bytes(issuer_key.modulus), issuer_key.exponent)
+
+    def is_verified(self, cert: Any, issuer_key: Any) -> bool:
+        if not self.enabled:
+            return False
+        if self._get_key(cert, issuer_key) in self.__verified:
+            self.cert_hits += 1
+            return True
+        self.cert_misses += 1
+        return False
+
+    def add_verified(self, cert: Any, issuer_key: Any) -> None:
+        if self.enabled:
+            self.__verified.add(self._get_key(cert, issuer_key))
+
+    def clear(self) -> None:
+        self.__verified.clear()
+        _get_rsa_verifier.cache_clear()  # type: ignore
+        self.cert_hits = self.cert_misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        key_info = _get_rsa_verifier.cache_info()  # type: ignore
+        return {
+            'cert_hits': self.cert_hits,
+            'cert_misses': self.cert_misses,
+            'cached_certs': len(self.__verified),
+            'key_hits': key_info.hits,
+            'key_misses': key_info.misses
+        }
+
+
+verification_cache = _VerificationCache()
+
+
 def verify_signature(data: bytes, signature_struct: Any, key_struct: Any) -> bool:
     # TODO: ecdsa
     if signature_struct.type.signature_alg not in (SignatureAlgorithm.RSA4096, SignatureAlgorithm.RSA2048):
         raise NotImplementedError('currently only 2048/4096-bit RSA is implemented')
 
     # create signer from public key
-    signer = pkcs1_15.new(_RSA.construct((
-        int.from_bytes(key_struct.modulus, byteorder='big'),
-        key_struct.exponent
-    )))
+    signer = _get_rsa_verifier(bytes(key_struct.modulus), key_struct.exponent)
 
     # calculate data hash
     hash_algorithm = signature_struct.type.hash_alg
@@ -118,7 +260,11 @@ def verify_chain(data: bytes, issuer: str, signature_struct: Any, certificate_st
         if part not in certificates:
             raise MissingCertError(f'missing certificate: {part!r}')
 
+    # certificates verified in this chain, only added to the cache once the entire chain is known to be valid
+    pending = []  # type: List[Tuple[Any, Any]]
+
     # iterate chain
+    cert = None
     while True:
         issuer_part = issuer_parts[-1]
         if issuer_part == 'Root':
@@ -131,20 +277,72 @@ def verify_chain(data: bytes, issuer: str, signature_struct: Any, certificate_st
             if issuer_cert.issuer.split('-') != issuer_parts[:-1]:
                 raise RuntimeError(f'issuer of intermediate certificate {issuer_cert.name} does not match issuer of initial data')
 
+        # if the current certificate was already verified using the same issuer key, the rest of the chain is valid as well
+        if cert is not None and verification_cache.is_verified(cert, issuer_key):
+            _logger.debug(f'Signature of {cert.name} by {issuer_part} is cached')
+            break
+
         # do the thing
         if not verify_signature(data, signature_struct, issuer_key):
             raise SignatureError(f'invalid signature for data {data[:32]!r}[...] by {issuer_part}')
         _logger.debug(f'Valid {signature_struct.type.name} signature for data {data[:32]!r}[...] by {issuer_part}')
+        if cert is not None:
+            pending.append((cert, issuer_key))
 
         # if issuer is 'Root' and the signature is valid, we're done
         if issuer_part == 'Root':
-            _logger.debug('Successfully verified signatures')
             break
 
         # otherwise, check signature of current certificate:
         # remove last part from issuer, just checked that one
         issuer_parts = issuer_parts[:-1]
         # data to be verified is the raw data of the certificate that was just used
-        data = issuer_cert.__raw_cert__
+        cert = issuer_cert
+        data = cert.__raw_cert__
         # signature of new data
-        signature_struct = issuer_cert.signature
+        signature_struct = cert.signature
+
+    for cert, issuer_key in pending:
+        verification_cache.add_verified(cert, issuer_key)
+    _logger.debug('Successfully verified signatures')
+
+
+#####
+# batch verification
+#####
+
+class VerifyItem(NamedTuple):
+    data: bytes
+    issuer: str
+    signature: Any
+    certificates: List[Any]
+
+
+def _init_verify_worker(root_key: Any, certificate_structs: Dict[str, Any]) -> None:
+    # worker processes don't share the configuration of the parent process
+    Configuration.root_key_struct = root_key
+    Configuration.certificate_structs = certificate_structs
+
+
+def _verify_chain_worker(item: VerifyItem) -> Optional[Exception]:
+    try:
+        verify_chain(item.data, item.issuer, item.signature, item.certificates, Configuration.root_key_struct)
+        return None
+    except (SignatureError, MissingCertError, NotImplementedError, RuntimeError) as e:
+        return e
+
+
+def verify_chain_many(items: Iterable[VerifyItem], root_key: Any, *, max_workers: Optional[int] = None, chunksize: int = 16) -> List[Optional[Exception]]:
+    '''
+    Verifies signature chains of many items on a process pool.
+
+    Returns the exception raised for each item, or `None` if the signature is valid.
+    Each worker has its own verification cache, so intermediate certificates are verified once per process
+    '''
+
+    with ProcessPoolExecutor(
+        max_workers,
+        initializer=_init_verify_worker,
+        initargs=(root_key, dict(Configuration.certificate_structs))
+    ) as executor:
+        return list(executor.map(_verify_chain_worker, items, chunksize=chunksize))
@@ -1,6 +1,8 @@
+import sys
 import functools
 import itertools
-from typing import Callable, Iterable, Iterator, List, Dict, Any, Tuple, TypeVar, TYPE_CHECKING
+import dataclasses
+from typing import Callable, Iterable, Iterator, List, Dict, Any, Optional, Tuple, Type, TypeVar, TYPE_CHECKING
 
 from .typing import TFuncAny
 
@@ -47,7 +49,68 @@ def cache(func: TFuncAny) -> TFuncAny:
     return functools.lru_cache(maxsize=None)(func)  # type: ignore
 
 
+def bounded_cache(maxsize: int) -> Callable[[TFuncAny], TFuncAny]:
+    return functools.lru_cache(maxsize=maxsize)  # type: ignore
+
+
 cachedproperty = lambda func: property(cache(func))  # noqa: E731
 # make the type checker believe that `cachedproperty` is a type alias of `property`, which fixes IDE type hints and autocompletion
 if TYPE_CHECKING:
     cachedproperty = property
+
+
+def intern_str(text: Optional[str]) -> Optional[str]:
+    return sys.intern(text) if text is not None else None
+
+
+_TSlots = TypeVar('_TSlots', bound=Type[Any])
+
+
+def add_slots(cls: _TSlots) -> _TSlots:
+    '''
+    Recreates a dataclass with `__slots__` for its fields, similar to `dataclass(slots=True)` in python >= 3.10.
+
+    Base classes should define empty `__slots__` (or be slotted dataclasses themselves),
+    otherwise instances still get a `__dict__`
+    '''
+
+    field_names = tuple(f.name for f in dataclasses.fields(cls))
+    inherited_slots = set()
+    for base in cls.__mro__[1:]:
+        base_slots = base.__dict__.get('__slots__', ())
+        inherited_slots.update((base_slots,) if isinstance(base_slots, str) else base_slots)
+
+    cls_dict = dict(cls.__dict__)
+    cls_dict['__slots__'] = tuple(name for name in field_names if name not in inherited_slots)
+    # default values are stored in the generated `__init__`, and would conflict with the slot descriptors
+    for name in field_names:
+        cls_dict.pop(name, None)
+    cls_dict.pop('__dict__', None)
+    cls_dict.pop('__weakref__', None)
+
+    new_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    new_cls.__qualname__ = cls.__qualname__
+
+    # `super()` and the generated `__setattr__` of frozen dataclasses reference the original class through closure cells
+    for value in cls_dict.values():
+        func = getattr(value, '__func__', value)
+        for cell in getattr(func, '__closure__', None) or ():
+            try:
+                if cell.cell_contents is cls:
+                    cell.cell_contents = new_cls
+            except ValueError:  # empty cell
+                pass
+
+    # default pickle implementation uses `setattr` for slots, which fails for frozen dataclasses
+    if '__getstate__' not in cls_dict:
+        def __getstate__(self: Any) -> List[Any]:
+            return [getattr(self, name) for name in field_names]
+
+        def __setstate__(self: Any, state: List[Any]) -> None:
+            for name, value in zip(field_names, state):
+                object.__setattr__(self, name, value)
+
+        new_cls.__getstate__ = __getstate__
+        new_cls.__setstate__ = __setstate__
+
+    return new_cls
@@ -19,6 +19,11 @@ setup(
     license='Apache 2.0',
     packages=find_packages(),
     install_requires=read('requirements.txt').splitlines(),
+    extras_require={
+        'numpy': ['numpy'],
+        'arrow': ['pyarrow'],
+        'aio': ['aiohttp']
+    },
     python_requires='>=3.7',
     classifiers=[
         'Development Status :: 4 - Beta',
@@ -0,0 +1,277 @@
+import os
+import ssl
+import asyncio
+import hashlib
+import contextlib
+
+import pytest
+from reqcli.source import BaseSource, ReqData
+
+aiohttp = pytest.importorskip('aiohttp')
+from aiohttp import web  # noqa: E402
+
+from nus_tools import sources  # noqa: E402
+from nus_tools.sources import aio  # noqa: E402
+from nus_tools.sources.aio.base import AsyncBaseSource  # noqa: E402
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+CERT = (os.path.join(FIXTURES, 'localhost.crt'), os.path.join(FIXTURES, 'localhost.key'))
+
+TITLE_WIIU = '20010000007686'
+TITLE_3DS = '50010000023235'
+DLC_WIIU = '20050000012345'
+TITLE_ID = '0005000E101C9500'
+
+
+def _fingerprint(data: bytes) -> str:
+    return ':'.join(f'{b:02X}' for b in hashlib.sha256(data).digest())
+
+
+with open(CERT[0]) as f:
+    CERT_FINGERPRINT = _fingerprint(ssl.PEM_cert_to_DER_cert(f.read()))
+
+
+# parity with sync sources
+
+# (sync type, async type, constructor args, [(method, args, kwargs)])
+SOURCES = [
+    (sources.Samurai, aio.AsyncSamurai, ('US', 3), {'lang': 'en'}, [
+        ('get_title', (TITLE_WIIU,), {}),
+        ('get_movie', ('20040000001275',), {}),
+        ('get_content_list', (0, 50), {}),
+        ('get_title_list', (200, 200, {'sort': 'new'}), {}),
+        ('get_movie_list', (10,), {}),
+        ('get_dlcs_wiiu', (DLC_WIIU, '20050000012346'), {}),
+        ('get_dlcs_for_title', (TITLE_WIIU,), {}),
+        ('get_dlcs_for_title', (TITLE_3DS,), {}),
+        ('get_dlc_sizes', (DLC_WIIU,), {}),
+        ('get_dlc_prices', (DLC_WIIU,), {}),
+        ('get_demo', ('20030000001234',), {}),
+        ('get_news', (), {}),
+        ('get_telops', (), {})
+    ]),
+    (sources.Samurai, aio.AsyncSamurai, ('JP', 1), {'cdn': True}, [
+        ('get_title', (TITLE_3DS,), {})
+    ]),
+    (sources.Ninja, aio.AsyncNinja, ('US', CERT), {}, [
+        ('get_ec_info', (TITLE_WIIU,), {}),
+        ('get_id_pair', (), {'content_id': TITLE_WIIU}),
+        ('get_id_pair', (), {'title_id': TITLE_ID})
+    ]),
+    *[
+        (sync_type, async_type, args, {}, [
+            ('get_cetk', (TITLE_ID,), {}),
+            ('get_tmd', (TITLE_ID,), {}),
+            ('get_tmd', (TITLE_ID, 208), {}),
+            ('get_tmd_special', (TITLE_ID, 0xfffe0000), {}),
+            ('get_app', (TITLE_ID, 1), {}),
+            ('get_app_range', (TITLE_ID, 1, 0x8000), {}),
+            ('get_app_range', (TITLE_ID, 1, 0x8000, 0x10000), {}),
+            ('get_h3', (TITLE_ID, 1), {})
+        ])
+        for sync_type, async_type, args in [
+            (sources.ContentServerWiiUCDN, aio.AsyncContentServerWiiUCDN, ()),
+            (sources.ContentServerWiiUNoCDN, aio.AsyncContentServerWiiUNoCDN, ()),
+            (sources.ContentServer3DSCDN, aio.AsyncContentServer3DSCDN, ()),
+            (sources.ContentServer3DSNoCDN, aio.AsyncContentServer3DSNoCDN, (CERT,))
+        ]
+    ],
+    (sources.IDBEServer, aio.AsyncIDBEServer, ('wup',), {}, [
+        ('get_idbe', (TITLE_ID,), {}),
+        ('get_idbe', (TITLE_ID, 3), {})
+    ]),
+    *[
+        (sync_type, async_type, (), {}, [
+            ('get_latest_updatelist_version', (), {}),
+            ('get_updatelist', (12,), {})
+        ])
+        for sync_type, async_type in [
+            (sources.TagayaCDN, aio.AsyncTagayaCDN),
+            (sources.TagayaNoCDN, aio.AsyncTagayaNoCDN)
+        ]
+    ]
+]
+
+
+def _request_info(base: ReqData, data: ReqData):
+    return (
+        base.path + data.path,
+        {**(base.params or {}), **(data.params or {})},
+        {**(base.headers or {}), **(data.headers or {})},
+        data.cert if data.cert is not None else base.cert
+    )
+
+
+@pytest.mark.parametrize('sync_type, async_type, args, kwargs, calls', SOURCES, ids=[f'{s[1].__name__}-{i}' for i, s in enumerate(SOURCES)])
+def test_request_parity(monkeypatch, sync_type, async_type, args, kwargs, calls):
+    # requests are recorded at the lowest level shared by all endpoints, nothing is actually sent
+    sync_requests = []
+    async_requests = []
+
+    def sync_create_type(self, data, loadable=None, **kw):
+        sync_requests.append(_request_info(self._NUSBaseSource__base_data, data))
+        return loadable
+
+    async def async_create_type(self, data, loadable, **kw):
+        async_requests.append(_request_info(self._base_data, data))
+        return loadable
+
+    def async_create_unloadable(self, data, **kw):
+        async_requests.append(_request_info(self._base_data, data))
+
+    monkeypatch.setattr(BaseSource, '_create_type', sync_create_type)
+    monkeypatch.setattr(AsyncBaseSource, '_create_type', async_create_type)
+    monkeypatch.setattr(AsyncBaseSource, '_create_unloadable', async_create_unloadable)
+
+    sync_source = sync_type(*args, **kwargs)
+    async_source = async_type(*args, **kwargs)
+
+    async def run_async():
+        for name, call_args, call_kwargs in calls:
+            result = getattr(async_source, name)(*call_args, **call_kwargs)
+            if asyncio.iscoroutine(result):
+                await result
+        await async_source.close()
+
+    for name, call_args, call_kwargs in calls:
+        getattr(sync_source, name)(*call_args, **call_kwargs)
+    asyncio.run(run_async())
+
+    assert len(sync_requests) == len(calls)
+    assert async_requests == sync_requests
+
+
+# local test server
+
+class _Server:
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handler(self, request):
+        self.requests.append((request.path, dict(request.query)))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return web.Response(body=request.path.encode())
+        finally:
+            self.in_flight -= 1
+
+    @contextlib.asynccontextmanager
+    async def run(self):
+        app = web.Application()
+        app.router.add_get('/{tail:.*}', self.handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(*CERT)
+        site = web.TCPSite(runner, '127.0.0.1', 0, ssl_context=context)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            yield f'https://127.0.0.1:{port}/base/'
+        finally:
+            await runner.cleanup()
+
+
+def _create_source(url, client, fingerprint=CERT_FINGERPRINT):
+    return AsyncBaseSource(ReqData(path=url, params={'shop_id': 1}), verify_tls=False, require_fingerprint=fingerprint, client=client)
+
+
+def _get(source, path, **params):
+    return source._create_unloadable(ReqData(path=path, params=params)).read()
+
+
+def test_requests():
+    server = _Server()
+
+    async def run():
+        async with server.run() as url, aio.AsyncClient() as client:
+            source = _create_source(url, client)
+            assert await _get(source, 'a/b', offset=10) == b'/base/a/b'
+
+    asyncio.run(run())
+    assert server.requests == [('/base/a/b', {'shop_id': '1', 'offset': '10'})]
+
+
+def test_keepalive():
+    server = _Server()
+
+    async def run():
+        async with server.run() as url, aio.AsyncClient() as client:
+            source = _create_source(url, client)
+            for i in range(10):
+                await _get(source, f'{i}')
+            # other sources using the same client share the connection pool
+            await _get(_create_source(url, client), 'other')
+            return client.stats
+
+    stats = asyncio.run(run())
+    assert stats.requests == 11
+    assert stats.connections_created == 1
+    assert stats.connections_reused == 10
+    assert stats.tls_handshakes == 1
+    assert stats.fingerprint_checks == 1
+
+
+@pytest.mark.parametrize('max_concurrency', [1, 4])
+def test_max_concurrency(max_concurrency):
+    server = _Server(delay=0.02)
+
+    async def run():
+        async with server.run() as url, aio.AsyncClient(max_concurrency=max_concurrency) as client:
+            source = _create_source(url, client)
+            await asyncio.gather(*(_get(source, f'{i}') for i in range(20)))
+
+    asyncio.run(run())
+    assert len(server.requests) == 20
+    assert server.max_in_flight == max_concurrency
+
+
+def test_fingerprint_mismatch():
+    server = _Server()
+    wrong_fingerprint = _fingerprint(b'not the certificate')
+
+    async def run():
+        async with server.run() as url, aio.AsyncClient() as client:
+            with pytest.raises(aiohttp.ClientSSLError) as exc_info:
+                await _get(_create_source(url, client, wrong_fingerprint), 'x')
+            # same client, correct fingerprint
+            assert await _get(_create_source(url, client), 'x') == b'/base/x'
+            return exc_info
+
+    exc_info = asyncio.run(run())
+    assert isinstance(exc_info.value.__cause__ or exc_info.value.os_error, aio.FingerprintMismatchError)
+    assert server.requests == [('/base/x', {'shop_id': '1'})]
+
+
+def test_list_lookahead():
+    started = []
+    yielded = []
+
+    class _Page:
+        def __init__(self, offset):
+            self.offset = offset
+            self.total = 100
+
+    async def get_list(offset, limit, other_params, **kwargs):
+        started.append(offset)
+        await asyncio.sleep(0.001)
+        return _Page(offset)
+
+    async def run():
+        async with aio.AsyncSamurai('US', 1, client=aio.AsyncClient(max_concurrency=3)) as source:
+            async for page in source._get_all_lists(get_list, 10, {}):
+                # pages are yielded in order, at most `max_concurrency` pages are requested ahead
+                yielded.append(page.offset)
+                assert len(started) - len(yielded) <= 3
+                await asyncio.sleep(0.005)
+
+    asyncio.run(run())
+    assert yielded == list(range(0, 100, 10))
+    assert sorted(started) == yielded
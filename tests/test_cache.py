@@ -0,0 +1,135 @@
+import io
+import time
+import asyncio
+import threading
+import contextlib
+
+import pytest
+from reqcli.source import BaseSource
+
+from nus_tools.sources import Samurai, ResponseCache, IMMUTABLE
+from nus_tools.sources.cache import get_ttl
+from nus_tools.sources.samurai import _CACHE_TTLS as _SAMURAI_TTLS
+
+
+def test_memory():
+    cache = ResponseCache()
+    cache.put('a', b'data', 10)
+    assert cache.get('a') == b'data'
+    assert cache.get('b') is None
+    assert (cache.stats.memory_hits, cache.stats.misses) == (1, 1)
+
+
+def test_expired():
+    cache = ResponseCache()
+    cache.put('a', b'data', 0.01)
+    time.sleep(0.02)
+    assert cache.get('a') is None
+    assert (cache.stats.expired, cache.stats.misses) == (1, 1)
+
+
+def test_memory_eviction():
+    cache = ResponseCache(memory_size=100)
+    for i in range(10):
+        cache.put(str(i), bytes(20), IMMUTABLE)
+    assert cache.get('0') is None
+    assert cache.get('9') is not None
+    assert cache._memory_total <= 100
+
+
+def test_disk(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.put('a', b'compressible' * 100, IMMUTABLE)
+    cache.put('b', bytes(range(256)), 10)
+
+    # new instance, memory tier is empty
+    cache = ResponseCache(str(tmp_path))
+    assert cache.get('a') == b'compressible' * 100
+    assert cache.get('b') == bytes(range(256))
+    assert cache.stats.disk_hits == 2
+    # promoted to memory
+    assert cache.get('a') is not None
+    assert cache.stats.memory_hits == 1
+
+
+def test_disk_eviction(tmp_path):
+    cache = ResponseCache(str(tmp_path), disk_size=1000, compression_level=0)
+    for i in range(10):
+        cache.put(str(i), bytes(300), IMMUTABLE)
+    assert cache._disk_total <= 1000
+    assert len(list(tmp_path.glob('*.cache'))) == len(cache._disk)
+
+
+def test_async(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    loop_thread = []
+    disk_threads = set()
+
+    orig_open = type(tmp_path).open
+
+    # disk I/O must not run on the event loop thread
+    def tracking_open(self, *args, **kwargs):
+        disk_threads.add(threading.get_ident())
+        return orig_open(self, *args, **kwargs)
+
+    async def run():
+        loop_thread.append(threading.get_ident())
+        await cache.put_async('a', b'data', 10)
+        # memory tier
+        assert await cache.get_async('a') == b'data'
+        # disk tier
+        cache._memory.clear()
+        cache._memory_total = 0
+        assert await cache.get_async('a') == b'data'
+        assert await cache.get_async('b') is None
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(type(tmp_path), 'open', tracking_open)
+        asyncio.run(run())
+
+    assert disk_threads and loop_thread[0] not in disk_threads
+    assert (cache.stats.memory_hits, cache.stats.disk_hits, cache.stats.misses) == (1, 1, 1)
+
+
+@pytest.mark.parametrize('path, cached', [
+    ('title/20010000007686', True),
+    ('movie/20040000001275', True),
+    ('demo/20030000001234', True),
+    ('title/20010000007686/aocs', True),
+    ('aocs', True),
+    ('aocs/size', True),
+    ('aocs/prices', True),
+    ('news', True),
+    ('telops', True),
+    ('titles', True),
+    ('unknown', False),
+    ('title/20010000007686/unknown', False)
+])
+def test_samurai_ttls(path, cached):
+    assert (get_ttl(_SAMURAI_TTLS, path) is not None) == cached
+
+
+def test_samurai_stream_not_cached(monkeypatch):
+    requests = []
+
+    class _Unloadable:
+        def __init__(self, data):
+            self._data = data
+
+        @contextlib.contextmanager
+        def get_reader(self):
+            yield io.BytesIO(self._data)
+
+    def create_type(self, data, loadable=None, **kwargs):
+        requests.append((data.path, kwargs))
+        return _Unloadable(b'<eshop><contents length="0" offset="0" total="0"/></eshop>')
+
+    monkeypatch.setattr(BaseSource, '_create_type', create_type)
+    source = Samurai('US', 1)
+    monkeypatch.setattr(source, 'cache', ResponseCache())
+
+    with source.stream_title_list(0) as stream:
+        assert list(stream) == []
+    # streamed responses are not buffered for the cache
+    assert source.cache._memory_total == 0
+    assert requests == [('titles', {'skip_cache': True})]
@@ -0,0 +1,316 @@
+import io
+import os
+import hashlib
+import threading
+import contextlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from Crypto.Cipher import AES
+from constructutils.checksum import ChecksumVerifyError
+from reqcli.source import ReqData
+
+from nus_tools.content.app import AppDecryptor
+from nus_tools.content.download import SegmentedDownloader, RangeNotSupportedError, split_segments
+from nus_tools.sources.contentcdn import _ContentServerBase
+from nus_tools.types.contentcdn import TMDContentRecord, TMDContentType
+
+
+TITLE_ID = '0005000010101A00'
+TITLEKEY = bytes(range(16))
+INDEX = 3
+
+_DATA_SIZE = 0xfc00
+_SEGMENT_SIZE = 16 * 0x10000
+
+
+def _table(hashes):
+    return b''.join(hashes).ljust(20 * 16, b'\0')
+
+
+def _build_hashed(num_blocks):
+    # returns (encrypted content, h3 table)
+    datas = [os.urandom(_DATA_SIZE) for _ in range(num_blocks)]
+    h0 = [hashlib.sha1(d).digest() for d in datas]
+    h0_tables = [_table(h0[i:i + 16]) for i in range(0, num_blocks, 16)]
+    h1 = [hashlib.sha1(t).digest() for t in h0_tables]
+    h1_tables = [_table(h1[i:i + 16]) for i in range(0, len(h1), 16)]
+    h2_table = _table([hashlib.sha1(t).digest() for t in h1_tables])
+    h3 = hashlib.sha1(h2_table).digest()
+
+    blocks = []
+    for i, data in enumerate(datas):
+        tables = (h0_tables[i >> 4] + h1_tables[i >> 8] + h2_table).ljust(0x400, b'\0')
+        blocks.append(AES.new(TITLEKEY, AES.MODE_CBC, bytes(16)).encrypt(tables))
+        blocks.append(AES.new(TITLEKEY, AES.MODE_CBC, h0[i][:16]).encrypt(data))
+    return b''.join(blocks), h3
+
+
+def _build_unhashed(size):
+    # returns (encrypted content, sha1 of decrypted content)
+    data = os.urandom(size)
+    padded = data + bytes(-len(data) % 16)
+    return AES.new(TITLEKEY, AES.MODE_CBC, INDEX.to_bytes(2, 'big') + bytes(14)).encrypt(padded), hashlib.sha1(data).digest()
+
+
+class _Server:
+    '''
+    Local content server, supporting range requests.
+    Failures can be injected for the first response(s) of a content
+    '''
+
+    def __init__(self):
+        self.files = {}
+        self.requests = []
+        self.ignore_range = False
+        self.drop = 0  # close connection after sending half of the body
+        self.corrupt = 0  # flip a byte in the body
+        self.status = None  # respond with this status instead
+        self._lock = threading.Lock()
+
+    def _take(self, name):
+        with self._lock:
+            value = getattr(self, name)
+            if value:
+                setattr(self, name, value - 1)
+            return bool(value)
+
+    @contextlib.contextmanager
+    def run(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                name = self.path.rsplit('/', 1)[1]
+                range_header = self.headers.get('Range')
+                server.requests.append((name, range_header))
+
+                if server.status is not None:
+                    self.send_response(server.status)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                data = server.files[name]
+                if range_header and not server.ignore_range:
+                    start, end = range_header[len('bytes='):].split('-')
+                    start, end = int(start), int(end) if end else len(data) - 1
+                    body = data[start:end + 1]
+                    self.send_response(206)
+                    self.send_header('Content-Range', f'bytes {start}-{end}/{len(data)}')
+                else:
+                    body = data
+                    self.send_response(200)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+
+                if name.endswith('.h3'):
+                    self.wfile.write(body)
+                elif server._take('drop'):
+                    self.wfile.write(body[:len(body) // 2])
+                    self.close_connection = True
+                elif server._take('corrupt'):
+                    self.wfile.write(body[:0x8000] + bytes([body[0x8000] ^ 1]) + body[0x8001:])
+                else:
+                    self.wfile.write(body)
+
+        httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield f'http://127.0.0.1:{httpd.server_port}/'
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+
+
+class _LocalContentServer(_ContentServerBase):
+    def __init__(self, url):
+        super().__init__(ReqData(path=url))
+
+
+@pytest.fixture
+def server():
+    server = _Server()
+    with server.run() as url:
+        server.ccs = _LocalContentServer(url)
+        yield server
+
+
+@pytest.fixture
+def hashed(server):
+    data, h3 = _build_hashed(16 * 3 + 5)
+    server.files['00000001'] = data
+    server.files['00000001.h3'] = h3
+    entry = TMDContentRecord(1, INDEX, TMDContentType(0x2003), len(data), hashlib.sha1(h3).digest())
+    return data, entry
+
+
+@pytest.fixture
+def unhashed(server):
+    data, sha1 = _build_unhashed(3 * _SEGMENT_SIZE + 12345)
+    server.files['00000002'] = data
+    entry = TMDContentRecord(2, INDEX, TMDContentType(0x2001), 3 * _SEGMENT_SIZE + 12345, sha1)
+    return data, entry
+
+
+class _Progress:
+    def __init__(self):
+        self.total = 0
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, n):
+        with self._lock:
+            self.total += n
+            self.calls.append(n)
+
+
+def _download(server, entry, path, **kwargs):
+    downloader = SegmentedDownloader(server.ccs, segments=4, min_segment_size=1, max_retries=2, retry_delay=0)
+    return downloader.download(TITLE_ID, entry, str(path), titlekey=TITLEKEY, **kwargs)
+
+
+def _app_requests(server):
+    return [r for name, r in server.requests if not name.endswith('.h3')]
+
+
+def test_split_segments():
+    assert split_segments(100, 8, 16 << 20) == [(0, None)]
+    segments = split_segments(4 * _SEGMENT_SIZE + 1, 4, 1)
+    assert [s.start for s in segments] == [0, 2 * _SEGMENT_SIZE, 4 * _SEGMENT_SIZE]
+    assert segments[-1].end is None
+
+
+def test_block_reader_current_block():
+    data, h3 = _build_hashed(40)
+    reader = AppDecryptor(TITLEKEY, INDEX, h3, io.BytesIO(data), hashlib.sha1(h3).digest(), len(data), len(data))
+    assert reader.current_block == 0
+    reader.load_block(5)
+    assert reader.current_block == 6
+    # groups end at multiples of 16 blocks
+    assert len(reader.load_next_group()) == 10 and reader.current_block == 16
+    reader.load_next_group()
+    assert len(reader.load_next_group()) == 8 and reader.current_block == reader.num_blocks == 40
+
+
+def test_hashed(server, hashed, tmp_path):
+    data, entry = hashed
+    progress = _Progress()
+
+    assert _download(server, entry, tmp_path / 'app', progress=progress) == len(data)
+    assert (tmp_path / 'app').read_bytes() == data
+    assert progress.total == len(data)
+    # h3 was requested and used for verification, content was requested in multiple ranges
+    assert ('00000001.h3', None) in server.requests
+    assert sorted(_app_requests(server)) == [
+        f'bytes={0}-{_SEGMENT_SIZE - 1}',
+        f'bytes={_SEGMENT_SIZE}-{2 * _SEGMENT_SIZE - 1}',
+        f'bytes={2 * _SEGMENT_SIZE}-{3 * _SEGMENT_SIZE - 1}',
+        f'bytes={3 * _SEGMENT_SIZE}-'
+    ]
+
+
+def test_unhashed(server, unhashed, tmp_path):
+    data, entry = unhashed
+
+    assert _download(server, entry, tmp_path / 'app') == len(data)
+    assert (tmp_path / 'app').read_bytes() == data
+    assert len(_app_requests(server)) == 4
+
+
+def test_unhashed_mismatch(server, unhashed, tmp_path):
+    _, entry = unhashed
+
+    with pytest.raises(ChecksumVerifyError):
+        _download(server, entry._replace(hash=bytes(20)), tmp_path / 'app')
+
+
+def test_resume(server, hashed, tmp_path):
+    data, entry = hashed
+    progress = _Progress()
+    server.drop = 1
+
+    assert _download(server, entry, tmp_path / 'app', progress=progress) == len(data)
+    assert (tmp_path / 'app').read_bytes() == data
+    assert progress.total == len(data)
+    # the failed segment was resumed where it stopped, not from the start
+    requests = _app_requests(server)
+    assert len(requests) == 5
+    resumed = [r for r in requests if int(r[len('bytes='):].split('-')[0]) % _SEGMENT_SIZE != 0]
+    assert len(resumed) == 1
+
+
+def test_corrupted_segment(server, hashed, tmp_path):
+    data, entry = hashed
+    progress = _Progress()
+    server.corrupt = 1
+
+    assert _download(server, entry, tmp_path / 'app', progress=progress) == len(data)
+    assert (tmp_path / 'app').read_bytes() == data
+    # discarded bytes are subtracted again
+    assert progress.total == len(data)
+    assert any(n < 0 for n in progress.calls)
+    assert len(_app_requests(server)) == 5
+
+
+def test_wrong_titlekey(server, hashed, tmp_path):
+    _, entry = hashed
+    downloader = SegmentedDownloader(server.ccs, segments=1, max_retries=5, retry_delay=0)
+
+    with pytest.raises(ChecksumVerifyError):
+        downloader.download(TITLE_ID, entry, str(tmp_path / 'app'), titlekey=bytes(16))
+    # redownloaded only once
+    assert len(_app_requests(server)) == 2
+
+
+def test_range_ignored(server, hashed, tmp_path):
+    _, entry = hashed
+    server.ignore_range = True
+
+    with pytest.raises(RangeNotSupportedError):
+        _download(server, entry, tmp_path / 'app')
+
+
+@pytest.mark.parametrize('status', [403, 404, 416])
+def test_client_error_not_retried(server, unhashed, tmp_path, status):
+    _, entry = unhashed
+    server.status = status
+    downloader = SegmentedDownloader(server.ccs, segments=1, max_retries=3, retry_delay=0)
+
+    with pytest.raises(requests.HTTPError):
+        downloader.download(TITLE_ID, entry, str(tmp_path / 'app'), titlekey=TITLEKEY)
+    assert len(server.requests) == 1
+
+
+def test_server_error_retried(server, unhashed, tmp_path):
+    _, entry = unhashed
+    server.status = 503
+    downloader = SegmentedDownloader(server.ccs, segments=1, max_retries=3, retry_delay=0)
+
+    with pytest.raises(requests.HTTPError):
+        downloader.download(TITLE_ID, entry, str(tmp_path / 'app'), titlekey=TITLEKEY)
+    assert len(server.requests) == 4
+
+
+def test_local_error_not_retried(server, unhashed, tmp_path, monkeypatch):
+    _, entry = unhashed
+    calls = []
+
+    def pwrite(fd, data, offset):
+        calls.append(offset)
+        raise OSError(28, 'No space left on device')
+
+    monkeypatch.setattr('nus_tools.content.download._pwrite', pwrite)
+    downloader = SegmentedDownloader(server.ccs, segments=1, max_retries=3, retry_delay=0)
+
+    with pytest.raises(OSError):
+        downloader.download(TITLE_ID, entry, str(tmp_path / 'app'), titlekey=TITLEKEY)
+    assert len(calls) == 1
+    assert len(server.requests) == 1
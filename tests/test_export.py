@@ -0,0 +1,55 @@
+import csv
+
+import pytest
+
+from nus_tools import ids
+from nus_tools.export.samurai import SamuraiCatalogueColumns
+from nus_tools.types.samurai.common import SamuraiPrice
+from nus_tools.types.samurai.dlc import SamuraiDlc3DS, SamuraiDlcContentIndexes, SamuraiDlcWiiU
+
+
+def _dlc_wiiu(content_id):
+    return SamuraiDlcWiiU(
+        False, ids.ContentID(content_id), 'Costume Pack', 'https://example.com/icon.jpg',
+        SamuraiDlcContentIndexes('all', [1, 2]), 'description', False, release_date='2015-03-05'
+    )
+
+
+@pytest.fixture
+def columns():
+    columns = SamuraiCatalogueColumns()
+    columns.add_dlcs('20010000007686', [_dlc_wiiu('20050000012345')])
+    columns.add_dlcs('50010000023235', [
+        SamuraiDlc3DS('Extra Stages', SamuraiPrice(4.99, 'EUR')),
+        SamuraiDlc3DS('Soundtrack', SamuraiPrice(1.99, 'EUR'))
+    ])
+    return columns
+
+
+def test_dlcs(columns):
+    dlcs = columns.to_columns()['dlcs']
+    assert dlcs['content_id'] == ['20050000012345', None, None]
+    assert dlcs['title_content_id'] == ['20010000007686', '50010000023235', '50010000023235']
+    assert dlcs['name'] == ['Costume Pack', 'Extra Stages', 'Soundtrack']
+    assert dlcs['is_new'] == [False, None, None]
+    assert dlcs['release_date'] == ['2015-03-05', None, None]
+
+    # 3DS DLC prices are part of the DLC list
+    prices = columns.to_columns()['prices']
+    assert prices['content_id'] == ['50010000023235', '50010000023235']
+    assert prices['kind'] == ['dlc', 'dlc']
+    assert prices['dlc_name'] == ['Extra Stages', 'Soundtrack']
+    assert prices['amount'] == [4.99, 1.99]
+    assert prices['currency'] == ['EUR', 'EUR']
+
+
+def test_exports(columns, tmp_path):
+    columns.write_csv(str(tmp_path))
+    with (tmp_path / 'dlcs.csv').open(newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert [r['content_id'] for r in rows] == ['20050000012345', '', '']
+
+    numpy = pytest.importorskip('numpy')
+    arr = columns.to_numpy()['prices']
+    assert arr.dtype['amount'] == numpy.float64
+    assert list(arr['dlc_name']) == ['Extra Stages', 'Soundtrack']
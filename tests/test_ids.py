@@ -0,0 +1,49 @@
+import copy
+import pickle
+
+import pytest
+
+from nus_tools import ids
+
+
+def test_title_id():
+    title_id = ids.TitleID('0005000010101A00')
+    assert title_id is ids.TitleID(0x0005000010101A00) is ids.TitleID(bytes.fromhex('0005000010101A00'))
+    assert title_id is ids.TitleID(ids.TitleType.GAME_WIIU, 0x10101A00)
+    assert title_id.type == ids.TitleType.GAME_WIIU and title_id.uid == 0x10101A00
+    assert title_id.update == ids.TitleID('0005000E10101A00')
+    assert bytes(title_id) == bytes.fromhex('0005000010101A00')
+    assert ids.TitleID.from_bytes_array(bytes(title_id) * 2) == [title_id, title_id]
+    assert pickle.loads(pickle.dumps(title_id)) is title_id
+    assert copy.deepcopy(title_id) is title_id
+
+
+@pytest.mark.parametrize('uid', [-1, 0x1_0000_0000, 0xE_1010_1A00])
+def test_title_id_uid_range(uid):
+    with pytest.raises(ValueError):
+        ids.TitleID(ids.TitleType.GAME_WIIU, uid)
+
+
+def test_title_id_invalid_type():
+    with pytest.raises(ValueError):
+        ids.TitleID('0005000F10101A00')
+
+
+@pytest.mark.parametrize('uid', [-1, 10 ** 10])
+def test_content_id_uid_range(uid):
+    with pytest.raises(ValueError):
+        ids.ContentID(ids.ContentType.TITLE_WIIU, uid)
+
+
+@pytest.mark.parametrize('inst', [ids.TitleID('0005000010101A00'), ids.ContentID('20010000007686')])
+def test_immutable(inst):
+    value = int(inst)
+    with pytest.raises(AttributeError):
+        inst._value = 0
+    with pytest.raises(AttributeError):
+        del inst._value
+    with pytest.raises(AttributeError):
+        inst.other = 0
+    # the interned instance is unchanged
+    assert int(inst) == value
+    assert type(inst)(str(inst)) is inst
@@ -0,0 +1,85 @@
+import ssl
+import time
+import asyncio
+import threading
+
+import pytest
+import requests
+
+from nus_tools.sources.aio.pool import FingerprintMismatchError
+from nus_tools.sources.limits import RequestLimiter, is_overload_error
+
+
+def _http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(response=response)
+
+
+@pytest.mark.parametrize('error, expected', [
+    (_http_error(503), True),
+    (_http_error(429), True),
+    (_http_error(404), False),
+    (_http_error(403), False),
+    (requests.ConnectionError(), True),
+    (requests.ConnectTimeout(), True),
+    (requests.ReadTimeout(), True),
+    (asyncio.TimeoutError(), True),
+    # `RequestException` is an `IOError`, but not every request error indicates overload
+    (requests.TooManyRedirects(), False),
+    (requests.exceptions.InvalidURL(), False),
+    (requests.exceptions.SSLError(), False),
+    (ssl.SSLError(), False),
+    (FingerprintMismatchError('mismatch'), False),
+    (OSError(28, 'No space left on device'), False),
+    (ValueError(), False)
+])
+def test_is_overload_error(error, expected):
+    assert is_overload_error(error) == expected
+
+
+def test_is_overload_error_aiohttp():
+    aiohttp = pytest.importorskip('aiohttp')
+    assert is_overload_error(aiohttp.ServerDisconnectedError())
+    assert is_overload_error(aiohttp.ServerTimeoutError())
+    assert not is_overload_error(aiohttp.ClientConnectorSSLError(None, FingerprintMismatchError('mismatch')))
+
+
+def test_slot_before_token():
+    # one slot, plenty of tokens: waiting for the slot must not consume tokens
+    limiter = RequestLimiter(rate=1, burst=2, initial=1, max_limit=1)
+    state = limiter.get_host('host')
+    entered = threading.Event()
+
+    def second():
+        with limiter.limit('host'):
+            entered.set()
+
+    with limiter.limit('host'):
+        thread = threading.Thread(target=second)
+        thread.start()
+        time.sleep(0.05)
+        assert not entered.is_set()
+        # only the token of the request holding the slot was taken
+        assert state.bucket._reserve(0) == 0
+        assert state.bucket._tokens == pytest.approx(1, abs=0.1)
+    thread.join()
+    assert entered.is_set()
+
+
+def test_latency_sample():
+    limiter = RequestLimiter(initial=8, latency_target=0.05)
+    controller = limiter.get_host('host').controller
+
+    async def request(headers_delay, body_delay):
+        async with limiter.limit_async('host') as sample:
+            await asyncio.sleep(headers_delay)
+            sample.done()
+            await asyncio.sleep(body_delay)
+
+    # slow body, fast headers: not counted as overload
+    asyncio.run(request(0, 0.1))
+    assert controller.limit == 8
+    # slow headers
+    asyncio.run(request(0.1, 0))
+    assert controller.limit == 4
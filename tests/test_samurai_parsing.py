@@ -0,0 +1,81 @@
+import io
+import os
+
+import lxml.objectify
+import pytest
+
+from nus_tools import ids
+from nus_tools.types.samurai.common import SamuraiListStream
+from nus_tools.types.samurai.movie_list import SamuraiMoviesList
+from nus_tools.types.samurai.title_list import SamuraiTitlesList
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def _load(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+def test_titles():
+    data = _load('samurai_titles.xml')
+    titles_list = SamuraiTitlesList().load_bytes(data)
+    assert (titles_list.length, titles_list.offset, titles_list.total) == (3, 0, 3)
+
+    first, second, third = titles_list.titles
+    assert first.content_id == ids.ContentID('20010000000026')
+    assert first.name == 'Nintendo Land'
+    assert first.is_new is False and third.is_new is True
+    assert first.platform.name == 'Wii U Retail' and first.platform.id == 124
+    assert first.publisher.name == 'Nintendo'
+    assert first.rating_info.system.name == 'PEGI' and first.rating_info.age == '7'
+    assert [i.type for i in first.rating_info.icons] == ['normal', 'small']
+    assert first.rating_stars.stars == {1: 71, 2: 52, 3: 213, 4: 604, 5: 1274}
+    assert third.rating_info is None and third.rating_stars is None
+    # plain strings, not objectify elements
+    assert type(first.genre) is str and type(first.product_code) is str
+    assert third.price_retail.amount == 59.99
+    assert type(third.price_retail.currency) is str and third.price_retail.currency == 'EUR'
+
+    # identical ratings/platforms are parsed once and shared
+    assert first.rating_info is second.rating_info
+    assert first.platform is third.platform
+    assert first.platform is not second.platform
+
+
+@pytest.mark.parametrize('list_type, name', [
+    (SamuraiTitlesList, 'samurai_titles.xml'),
+    (SamuraiMoviesList, 'samurai_movies.xml')
+])
+def test_stream(list_type, name):
+    data = _load(name)
+    loaded = list_type().load_bytes(data)
+    items = loaded.titles if list_type is SamuraiTitlesList else loaded.movies
+
+    stream = SamuraiListStream(io.BytesIO(data), list_type._parse_content, chunk_size=256)
+    assert list(stream) == items
+    assert (stream.length, stream.offset, stream.total) == (loaded.length, loaded.offset, loaded.total)
+
+
+def test_objectify_elements():
+    # the parsers also accept elements created by the default objectify parser (e.g. detail pages)
+    data = _load('samurai_titles.xml')
+    root = lxml.objectify.fromstring(data)
+    titles = [SamuraiTitlesList._parse_content(c) for c in root.contents.content]
+    assert titles == SamuraiTitlesList().load_bytes(data).titles
+
+
+def test_movies():
+    movies = SamuraiMoviesList().load_bytes(_load('samurai_movies.xml')).movies
+    assert [m.name for m in movies] == ['Shovel Knight - Trailer', 'Nintendo Direct 2015.4.1']
+    assert [(f.quality, f.width, f.seconds) for f in movies[0].files] == [('high', 1280, 94), ('low', 640, 94)]
+    assert movies[0].title.id == ids.ContentID('20010000007686')
+    assert movies[0].rating_info.name == 'PEGI 7'
+    assert movies[1].rating_info is None and movies[1].title is None
+
+
+def test_slots():
+    first = SamuraiTitlesList().load_bytes(_load('samurai_titles.xml')).titles[0]
+    for record in (first, first.platform, first.publisher, first.rating_info, first.rating_info.icons[0], first.rating_stars):
+        assert not hasattr(record, '__dict__'), type(record).__name__
@@ -0,0 +1,73 @@
+from typing import NamedTuple
+
+import pytest
+
+from nus_tools.sync import SamuraiCatalogueSync
+
+
+class _ListTitle(NamedTuple):
+    content_id: str
+    is_new: bool = False
+    version: int = 0
+
+
+class _Page(NamedTuple):
+    total: int
+    titles: list
+
+
+class _Title(NamedTuple):
+    title: str
+
+
+class _Samurai:
+    def __init__(self, titles, fail_at=None):
+        self.titles = titles
+        self.fail_at = fail_at
+        self.fetched = []
+
+    def get_all_title_lists(self, max_page_size, other_params, **kwargs):
+        titles = list(self.titles.values())
+        for i in range(0, len(titles), max_page_size):
+            yield _Page(len(titles), titles[i:i + max_page_size])
+
+    def get_title(self, content_id, **kwargs):
+        if len(self.fetched) == self.fail_at:
+            raise ConnectionError('connection lost')
+        self.fetched.append(content_id)
+        return _Title(f'{content_id}-{self.titles[content_id].version}')
+
+
+def _titles(count, version=0):
+    return {f'{i:014}': _ListTitle(f'{i:014}', version=version) for i in range(count)}
+
+
+def test_sync(tmp_path):
+    path = str(tmp_path / 'snapshot')
+    samurai = _Samurai(_titles(5))
+    diff = SamuraiCatalogueSync(samurai, path).sync(2)
+    assert len(diff.added) == 5 and not diff.removed and not diff.changed
+
+    # only changed list entries are refetched
+    titles = _titles(4)
+    titles['00000000000001'] = _ListTitle('00000000000001', version=1)
+    samurai = _Samurai(titles)
+    diff = SamuraiCatalogueSync(samurai, path).sync(2)
+    assert samurai.fetched == ['00000000000001']
+    assert list(diff.removed) == ['00000000000004']
+    assert diff.changed == {'00000000000001': ('00000000000001-0', '00000000000001-1')}
+
+
+@pytest.mark.parametrize('save_interval', [3, 100])
+def test_interrupted_sync(tmp_path, save_interval):
+    path = str(tmp_path / 'snapshot')
+    samurai = _Samurai(_titles(10), fail_at=7)
+    with pytest.raises(ConnectionError):
+        SamuraiCatalogueSync(samurai, path, save_interval=save_interval).sync()
+
+    # titles fetched before the failure are kept, the next sync continues with the rest
+    sync = SamuraiCatalogueSync(_Samurai(_titles(10)), path)
+    assert len(sync.entries) == 7
+    diff = sync.sync()
+    assert sync.samurai.fetched == [f'{i:014}' for i in range(7, 10)]
+    assert len(diff.added) == 3
@@ -0,0 +1,161 @@
+import os
+import pickle
+
+import pytest
+from constructutils.checksum import ChecksumVerifyError
+
+from nus_tools import ids
+from nus_tools.types.config import NUSTypeLoadConfig
+from nus_tools.types.contentcdn import TMD
+from nus_tools.types.contentcdn.view import TMDView, TMDContentType
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# (fixture, title id, is wiiu)
+TMDS = [
+    ('wiiu.tmd', '0005000E101C9500', True),
+    ('3ds.tmd', '0004000000030800', False)
+]
+
+# records start after signature (0x140), header (0xc4) and content infos (64 * 0x24)
+_CONTENT_INFO_OFFSET = 0x140 + 0xc4
+_CONTENTS_OFFSET = _CONTENT_INFO_OFFSET + 64 * 0x24
+
+_CONFIG = NUSTypeLoadConfig(verify_signatures=False)
+
+
+def _load(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture(params=TMDS, ids=[t[0] for t in TMDS])
+def tmd(request):
+    name, title_id, is_wiiu = request.param
+    data = _load(name)
+    return data, TMD(title_id).load_bytes(data, _CONFIG).data, TMDView(data), is_wiiu
+
+
+def test_header(tmd):
+    _, parsed, view, is_wiiu = tmd
+
+    assert view.signature_type == parsed.signature.type
+    assert bytes(view.signature_data) == parsed.signature.data
+    assert bytes(view.raw_header_signed) == parsed.__raw_header_signed__
+    assert view.issuer == parsed.issuer
+    assert view.format_version == parsed.format_version
+    assert view.ca_crl_version == parsed.ca_crl_version
+    assert view.signer_crl_version == parsed.signer_crl_version
+    assert view.system_version == parsed.system_version
+    assert view.title_id == parsed.title_id
+    assert view.title_type == parsed.title_type
+    assert view.group_id == parsed.group_id
+    assert view.access_rights == parsed.access_rights
+    assert view.title_version == parsed.title_version
+    assert view.content_count == parsed.content_count
+    assert view.boot_index == parsed.boot_index
+    assert view.content_info_sha256 == parsed.content_info_sha256
+    if is_wiiu:
+        assert view.app_type == parsed.app_type
+    else:
+        assert view.app_type is None
+
+
+def test_content_info(tmd):
+    _, parsed, view, _ = tmd
+
+    assert len(view.content_info) == len(parsed.content_info) == 64
+    for i, (v, p) in enumerate(zip(view.content_info, parsed.content_info)):
+        assert view.get_content_info(i) == v
+        assert v.content_index == p.content_index
+        assert v.content_count == p.content_count
+        assert v.contents_sha256 == p.contents_sha256
+
+
+def test_contents(tmd):
+    _, parsed, view, is_wiiu = tmd
+
+    assert len(view.contents) == len(parsed.contents) > 0
+    for v, p in zip(view.contents, parsed.contents):
+        assert v.id == p.id
+        assert v.index == p.index
+        assert v.size == p.size
+        for flag in ('encrypted', 'hashed', 'cfm', 'unk1', 'unk2', 'unk3'):
+            assert bool(v.type & TMDContentType[flag.upper()]) == p.type[flag]
+        if is_wiiu:
+            assert v.sha1 == p.sha1
+            with pytest.raises(AttributeError):
+                v.sha256
+        else:
+            assert v.sha256 == p.sha256
+            with pytest.raises(AttributeError):
+                v.sha1
+
+    assert view.contents[-1] == view.get_content(view.content_count - 1)
+    assert view.contents[:] == list(view.contents)
+    with pytest.raises(IndexError):
+        view.contents[view.content_count]
+
+
+def test_certificates(tmd):
+    data, parsed, view, _ = tmd
+
+    item = view.signature_item
+    assert item.data == parsed.__raw_header_signed__
+    assert item.issuer == parsed.issuer
+    assert [c.name for c in item.certificates] == [c.name for c in parsed.certificates]
+    assert bytes(view.raw_certificates) == data[len(data) - len(view.raw_certificates):]
+
+
+def test_platform(tmd):
+    data, _, view, is_wiiu = tmd
+
+    platform = ids.TitlePlatform.WIIU if is_wiiu else ids.TitlePlatform._3DS
+    assert view.title_id.type.platform == platform
+    assert TMDView(data, platform).app_type == view.app_type
+    assert pickle.loads(pickle.dumps(view)).contents[:] == view.contents[:]
+
+
+def test_verify_checksums(tmd):
+    _, _, view, _ = tmd
+    view.verify_checksums()
+
+
+def test_verify_checksums_record_mismatch(tmd):
+    data, _, _, _ = tmd
+
+    # modify the size of the first content record
+    data = bytearray(data)
+    data[_CONTENTS_OFFSET + 0xf] ^= 1
+    with pytest.raises(ChecksumVerifyError):
+        TMDView(data).verify_checksums()
+
+
+def test_verify_checksums_info_mismatch(tmd):
+    data, _, _, _ = tmd
+
+    # modify the records hash of the first content info
+    data = bytearray(data)
+    data[_CONTENT_INFO_OFFSET + 4] ^= 1
+    with pytest.raises(ChecksumVerifyError):
+        TMDView(data).verify_checksums()
+
+
+def test_verify_checksums_missing_records(tmd):
+    data, _, _, _ = tmd
+
+    # truncate all records but the first one, content info still references all of them
+    data = bytearray(data[:_CONTENTS_OFFSET + 0x30])
+    data[0x140 + 0x9e:0x140 + 0xa0] = (1).to_bytes(2, 'big')
+    with pytest.raises(ValueError):
+        TMDView(data).verify_checksums()
+
+
+def test_too_short(tmd):
+    data, _, _, _ = tmd
+
+    with pytest.raises(ValueError):
+        TMDView(data[:_CONTENTS_OFFSET - 1])
+    with pytest.raises(ValueError):
+        TMDView(data[:_CONTENTS_OFFSET + 0x30])